@@ -0,0 +1,33 @@
+"""add_mood_entries_user_timestamp_index
+
+Revision ID: 2a6c8e0d4b1f
+Revises: 7b3e9d1f2c4a
+Create Date: 2026-10-17 15:21:07.613902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2a6c8e0d4b1f'
+down_revision: Union[str, Sequence[str], None] = '7b3e9d1f2c4a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_mood_entries_user_id_timestamp',
+        'mood_entries',
+        ['user_id', sa.text('timestamp DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_mood_entries_user_id_timestamp', table_name='mood_entries')
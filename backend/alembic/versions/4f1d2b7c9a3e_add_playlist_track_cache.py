@@ -0,0 +1,37 @@
+"""add_playlist_track_cache
+
+Revision ID: 4f1d2b7c9a3e
+Revises: 00e22e14a638
+Create Date: 2026-10-17 10:12:41.508113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f1d2b7c9a3e'
+down_revision: Union[str, Sequence[str], None] = '00e22e14a638'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('playlist_track_cache',
+    sa.Column('playlist_id', sa.String(), nullable=False),
+    sa.Column('snapshot_id', sa.String(), nullable=False),
+    sa.Column('tracks_json', sa.Text(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=True),
+    sa.Column('fetched_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('playlist_id')
+    )
+    op.create_index(op.f('ix_playlist_track_cache_playlist_id'), 'playlist_track_cache', ['playlist_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_playlist_track_cache_playlist_id'), table_name='playlist_track_cache')
+    op.drop_table('playlist_track_cache')
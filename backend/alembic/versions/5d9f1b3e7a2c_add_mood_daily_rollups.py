@@ -0,0 +1,48 @@
+"""add_mood_daily_rollups
+
+Revision ID: 5d9f1b3e7a2c
+Revises: 2a6c8e0d4b1f
+Create Date: 2026-10-17 16:40:52.118734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d9f1b3e7a2c'
+down_revision: Union[str, Sequence[str], None] = '2a6c8e0d4b1f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('mood_daily_rollups',
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('hour', sa.Integer(), nullable=False),
+    sa.Column('mood_name', sa.String(), nullable=False),
+    sa.Column('entry_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'date', 'hour', 'mood_name')
+    )
+
+    # Backfill from the entries that already exist
+    if op.get_bind().dialect.name == 'sqlite':
+        day, hour = "date(timestamp)", "CAST(strftime('%H', timestamp) AS INTEGER)"
+    else:
+        day, hour = "CAST(timestamp AS DATE)", "CAST(EXTRACT(HOUR FROM timestamp) AS INTEGER)"
+    op.execute(
+        "INSERT INTO mood_daily_rollups (user_id, date, hour, mood_name, entry_count) "
+        f"SELECT user_id, {day}, {hour}, mood_name, COUNT(*) FROM mood_entries "
+        "WHERE user_id IS NOT NULL AND mood_name IS NOT NULL AND timestamp IS NOT NULL "
+        f"GROUP BY user_id, {day}, {hour}, mood_name"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('mood_daily_rollups')
@@ -0,0 +1,54 @@
+"""unique_track_feedback_per_user
+
+Revision ID: 7b3e9d1f2c4a
+Revises: 4f1d2b7c9a3e
+Create Date: 2026-10-17 14:03:19.227415
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b3e9d1f2c4a'
+down_revision: Union[str, Sequence[str], None] = '4f1d2b7c9a3e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # track_feedback was only ever created by the create_all() fallback, so databases
+    # migrated from scratch may not have it yet
+    if not sa.inspect(op.get_bind()).has_table('track_feedback'):
+        op.create_table('track_feedback',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=True),
+        sa.Column('track_id', sa.String(), nullable=True),
+        sa.Column('artist_id', sa.String(), nullable=True),
+        sa.Column('is_liked', sa.Boolean(), nullable=True),
+        sa.Column('timestamp', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_track_feedback_id'), 'track_feedback', ['id'], unique=False)
+        op.create_index(op.f('ix_track_feedback_user_id'), 'track_feedback', ['user_id'], unique=False)
+        op.create_index(op.f('ix_track_feedback_track_id'), 'track_feedback', ['track_id'], unique=False)
+        op.create_index(op.f('ix_track_feedback_artist_id'), 'track_feedback', ['artist_id'], unique=False)
+
+    # Racing inserts could leave several rows per (user, track). Keep the oldest: it's the one
+    # the single-event endpoint's SELECT ... first() kept updating afterwards
+    op.execute(
+        "DELETE FROM track_feedback WHERE track_id IS NOT NULL AND id NOT IN ("
+        "SELECT MIN(id) FROM track_feedback WHERE track_id IS NOT NULL GROUP BY user_id, track_id)"
+    )
+    with op.batch_alter_table('track_feedback') as batch_op:
+        batch_op.create_unique_constraint('uq_track_feedback_user_track', ['user_id', 'track_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('track_feedback') as batch_op:
+        batch_op.drop_constraint('uq_track_feedback_user_track', type_='unique')
@@ -0,0 +1,120 @@
+"""normalize_mood_entry_tracks
+
+Revision ID: 8c4a2e6f0b9d
+Revises: 5d9f1b3e7a2c
+Create Date: 2026-10-17 18:05:33.470291
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4a2e6f0b9d'
+down_revision: Union[str, Sequence[str], None] = '5d9f1b3e7a2c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_BATCH = 500
+
+mood_entries = sa.table('mood_entries', sa.column('id', sa.Integer), sa.column('tracks_preview_json', sa.Text))
+tracks = sa.table(
+    'tracks',
+    sa.column('id', sa.String), sa.column('name', sa.String),
+    sa.column('artists_json', sa.Text), sa.column('album_image', sa.String),
+)
+links = sa.table(
+    'mood_entry_tracks',
+    sa.column('entry_id', sa.Integer), sa.column('position', sa.Integer), sa.column('track_id', sa.String),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('tracks',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('artists_json', sa.Text(), nullable=False),
+    sa.Column('album_image', sa.String(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('mood_entry_tracks',
+    sa.Column('entry_id', sa.Integer(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('track_id', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['entry_id'], ['mood_entries.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['track_id'], ['tracks.id'], ),
+    sa.PrimaryKeyConstraint('entry_id', 'position')
+    )
+    op.create_index(op.f('ix_mood_entry_tracks_track_id'), 'mood_entry_tracks', ['track_id'], unique=False)
+
+    # Move the existing JSON previews into the new tables, batch by batch. Entries whose blob
+    # can't be parsed (or has previews without an id) keep it and are still read from it
+    bind = op.get_bind()
+    seen_tracks: set[str] = set()
+    last_id = 0
+    while True:
+        batch = bind.execute(
+            sa.select(mood_entries.c.id, mood_entries.c.tracks_preview_json)
+            .where(mood_entries.c.id > last_id, mood_entries.c.tracks_preview_json.is_not(None))
+            .order_by(mood_entries.c.id).limit(_BATCH)
+        ).all()
+        if not batch:
+            break
+        last_id = batch[-1][0]
+
+        new_tracks, new_links, migrated = [], [], []
+        for entry_id, blob in batch:
+            try:
+                previews = json.loads(blob)
+                if not all(isinstance(p, dict) and p.get("id") for p in previews):
+                    continue
+            except (ValueError, TypeError):
+                continue
+            for position, p in enumerate(previews):
+                if p["id"] not in seen_tracks:
+                    seen_tracks.add(p["id"])
+                    new_tracks.append({
+                        "id": p["id"],
+                        "name": p.get("name") or "",
+                        "artists_json": json.dumps(p.get("artists") or []),
+                        "album_image": p.get("album_image"),
+                    })
+                new_links.append({"entry_id": entry_id, "position": position, "track_id": p["id"]})
+            migrated.append(entry_id)
+
+        if new_tracks:
+            bind.execute(tracks.insert(), new_tracks)
+        if new_links:
+            bind.execute(links.insert(), new_links)
+        if migrated:
+            bind.execute(
+                mood_entries.update().where(mood_entries.c.id.in_(migrated)).values(tracks_preview_json=None)
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Put the previews back into each entry's JSON column before dropping the tables
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(links.c.entry_id, tracks.c.id, tracks.c.name, tracks.c.artists_json, tracks.c.album_image)
+        .join(tracks, tracks.c.id == links.c.track_id)
+        .order_by(links.c.entry_id, links.c.position)
+    )
+    previews: dict[int, list] = {}
+    for entry_id, track_id, name, artists_json, album_image in rows:
+        previews.setdefault(entry_id, []).append(
+            {"id": track_id, "name": name, "artists": json.loads(artists_json), "album_image": album_image}
+        )
+    for entry_id, items in previews.items():
+        bind.execute(
+            mood_entries.update().where(mood_entries.c.id == entry_id).values(tracks_preview_json=json.dumps(items))
+        )
+
+    op.drop_index(op.f('ix_mood_entry_tracks_track_id'), table_name='mood_entry_tracks')
+    op.drop_table('mood_entry_tracks')
+    op.drop_table('tracks')
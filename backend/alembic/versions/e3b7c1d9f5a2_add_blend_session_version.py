@@ -0,0 +1,28 @@
+"""add_blend_session_version
+
+Revision ID: e3b7c1d9f5a2
+Revises: 8c4a2e6f0b9d
+Create Date: 2026-10-17 19:42:18.204517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b7c1d9f5a2'
+down_revision: Union[str, Sequence[str], None] = '8c4a2e6f0b9d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('blend_sessions', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('blend_sessions', 'version')
@@ -0,0 +1,285 @@
+import os
+import time
+import asyncio
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable
+from app.spotify_client import spotify_get
+from app.rate_limit import Priority
+from app.playlist_cache import get_playlist_tracks
+from app.deadline import Deadline
+from app.scoring import EncodedPool, encode_pool
+from app.junk_filter import is_junk_for_mood, mood_junk_pattern
+
+# A pool is served fresh for CANDIDATE_POOL_TTL_SECONDS, then served stale while a background
+# refresh runs, up to CANDIDATE_POOL_MAX_STALE_SECONDS after which callers wait for a rebuild
+CANDIDATE_POOL_TTL_SECONDS = float(os.getenv("CANDIDATE_POOL_TTL_SECONDS", 900))
+CANDIDATE_POOL_MAX_STALE_SECONDS = float(os.getenv("CANDIDATE_POOL_MAX_STALE_SECONDS", 21600))
+
+
+def _build_search_queries(mood_profile: dict) -> list[str]:
+    # Instead of just picking the first keyword [0], we combine the top 2 descriptors and genres
+    # to ensure we capture a wide net of vibes (e.g. 'sensual dark-pop' vs just 'sensual r-n-b')
+    search_queries = []
+    for keyword in mood_profile.get("search_descriptors", [""])[:2]:
+        for genre in mood_profile.get("genres", [""])[:2]:
+            search_queries.append(f"{keyword} {genre}".strip())
+    return search_queries
+
+
+@dataclass
+class CandidatePool:
+    """
+    The user-agnostic half of the Curated Intersect Algorithm for one mood:
+    every junk-filtered, deduplicated track scraped from the mood's curated playlists,
+    plus how many playlists each track appeared in (the consensus signal).
+    """
+    mood: str
+    tracks: list[dict] = field(default_factory=list)
+    occurrences: dict[str, int] = field(default_factory=dict)
+    playlist_ids: list[str] = field(default_factory=list)
+    built_at: float = field(default_factory=time.monotonic)
+    encoded: EncodedPool | None = field(default=None, repr=False)
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.built_at
+
+    def encode(self) -> EncodedPool:
+        """Array form used by the scorer: encoded once for finished pools, on demand for provisional ones."""
+        return self.encoded or encode_pool(self.tracks, self.occurrences)
+
+
+_pools: dict[str, CandidatePool] = {}
+_refresh_tasks: dict[str, asyncio.Task] = {}
+# Callbacks receiving the provisional pool while a mood is being rebuilt
+_progress_listeners: dict[str, list[Callable[[CandidatePool], None]]] = {}
+
+
+async def _search_playlists(access_token: str, mood_profile: dict) -> dict[str, str | None]:
+    """Step 2: Search for human-curated playlists matching the mood. Returns {playlist_id: snapshot_id}."""
+    search_queries = _build_search_queries(mood_profile)
+    banned_terms = mood_profile.get("banned_playlist_terms", [])
+
+    async def _search_spotify_playlists(q: str):
+        try:
+            r = await spotify_get(
+                "https://api.spotify.com/v1/search",
+                access_token,
+                Priority.BULK,
+                shared=True,
+                params={"q": q, "type": "playlist", "limit": 5}
+            )
+            r.raise_for_status()
+
+            scraped = []
+            for p in r.json().get("playlists", {}).get("items", []):
+                if not p or not p.get("id"): continue
+                title = (p.get("name") or "").lower()
+                if any(term in title for term in banned_terms):
+                    continue
+                scraped.append((p["id"], p.get("snapshot_id")))
+            return scraped
+        except Exception:
+            return []
+
+    # Run multiple targeted queries to build a much larger pool of overlapping playlists
+    results = await asyncio.gather(*[_search_spotify_playlists(q) for q in search_queries])
+    # Remove any duplicates
+    playlists = {pid: snapshot_id for res in results for pid, snapshot_id in res}
+    print(f"[AI.pollo] Scraping {len(playlists)} playlists from queries: {search_queries}...")
+    return playlists
+
+
+async def _get_playlist_tracks(access_token: str, pid: str, snapshot_id: str | None) -> list[dict]:
+    """Step 3: Fetch the (snapshot-cached) tracks of a single curated playlist."""
+    try:
+        tracks, _ = await get_playlist_tracks(access_token, pid, snapshot_id, priority=Priority.BULK)
+        return tracks
+    except Exception:
+        return []
+
+
+def _pool_tracks(pool: CandidatePool, track_list: list[dict], seen_keys: set[tuple[str, str]], junk_pattern=None):
+    """Fold one playlist's tracks into the pool, dropping junk and same-song duplicates."""
+    for t in track_list:
+        tid = t.get("id")
+        if not tid or is_junk_for_mood(t, junk_pattern):
+            continue
+
+        track_name = (t.get("name") or "").lower().strip()
+        artists = t.get("artists", [])
+        primary_artist = (artists[0].get("name") or "").lower().strip() if artists else ""
+
+        dedup_key = (track_name, primary_artist)
+        if dedup_key in seen_keys and tid not in pool.occurrences:
+            continue # Skip duplicates (same song under a different release id)
+
+        seen_keys.add(dedup_key)
+        if tid not in pool.occurrences:
+            pool.tracks.append(t)
+            pool.occurrences[tid] = 0
+        pool.occurrences[tid] += 1
+
+
+async def build_candidate_pool(
+    mood: str,
+    mood_profile: dict,
+    access_token: str,
+    on_progress: Callable[[CandidatePool], None] | None = None,
+) -> CandidatePool:
+    """
+    Scrape, junk-filter and dedupe the curated playlists for a mood (Steps 2-3).
+
+    With `on_progress`, a provisional pool is folded together in arrival order and handed over
+    after every playlist that lands. The returned pool is always folded in search order, so
+    which release of a duplicated song survives doesn't depend on network timing.
+    """
+    t_start = time.time()
+    pool = CandidatePool(mood=mood)
+    playlists = {}
+    try:
+        playlists = await _search_playlists(access_token, mood_profile)
+    except Exception as e:
+        print(f"[AI.pollo] Playlist search failed: {e}")
+    pool.playlist_ids = list(playlists)
+    junk_pattern = mood_junk_pattern(mood_profile)
+
+    # Each fetch reads/writes the playlist cache on a short-lived session of its own
+    async def _fetch(pid: str, snapshot_id: str | None) -> tuple[str, list[dict]]:
+        return pid, await _get_playlist_tracks(access_token, pid, snapshot_id)
+
+    fetches = [asyncio.ensure_future(_fetch(pid, snapshot_id)) for pid, snapshot_id in playlists.items()]
+    if on_progress is not None:
+        provisional = CandidatePool(mood=mood)
+        provisional_keys: set[tuple[str, str]] = set()
+        on_progress(provisional)  # Search finished; nothing pooled yet
+        for next_done in asyncio.as_completed(fetches):
+            pid, track_list = await next_done
+            _pool_tracks(provisional, track_list, provisional_keys, junk_pattern)
+            provisional.playlist_ids.append(pid)
+            on_progress(provisional)
+    playlist_track_lists = await asyncio.gather(*fetches)
+    dedup_keys: set[tuple[str, str]] = set()
+    for _, track_list in playlist_track_lists:
+        _pool_tracks(pool, track_list, dedup_keys, junk_pattern)
+    pool.encoded = encode_pool(pool.tracks, pool.occurrences)
+    pool.built_at = time.monotonic()
+
+    print(f"[AI.pollo] Built '{mood}' candidate pool: {len(pool.tracks)} tracks from {len(pool.playlist_ids)} playlists in {time.time() - t_start:.2f}s")
+    return pool
+
+
+async def _refresh(mood: str, mood_profile: dict, access_token: str) -> CandidatePool:
+    def _notify(provisional: CandidatePool):
+        for listener in list(_progress_listeners.get(mood, ())):
+            listener(provisional)
+
+    try:
+        pool = await build_candidate_pool(mood, mood_profile, access_token, _notify)
+        # Never replace a good pool with an empty one (e.g. the refreshing token just expired)
+        if pool.tracks or mood not in _pools:
+            _pools[mood] = pool
+        return _pools[mood]
+    finally:
+        _refresh_tasks.pop(mood, None)
+
+
+def _schedule_refresh(mood: str, mood_profile: dict, access_token: str) -> asyncio.Task:
+    task = _refresh_tasks.get(mood)
+    if task is None:
+        task = asyncio.create_task(_refresh(mood, mood_profile, access_token))
+        _refresh_tasks[mood] = task
+    return task
+
+
+def _servable_pool(mood: str, mood_profile: dict, access_token: str) -> CandidatePool | None:
+    """The cached pool if it may be served right now (kicking off a background refresh when stale)."""
+    pool = _pools.get(mood)
+    if pool and pool.tracks:
+        if pool.age < CANDIDATE_POOL_TTL_SECONDS:
+            return pool
+        if pool.age < CANDIDATE_POOL_MAX_STALE_SECONDS:
+            _schedule_refresh(mood, mood_profile, access_token)
+            return pool
+    return None
+
+
+async def get_candidate_pool(mood: str, mood_profile: dict, access_token: str, deadline: Deadline | None = None) -> CandidatePool:
+    """
+    Return the cached candidate pool for a mood (stale-while-revalidate).
+
+    Fresh pools are returned directly; stale pools are returned immediately while a
+    single background refresh runs; missing or expired pools are rebuilt, with concurrent
+    callers awaiting the same build.
+
+    With a `deadline`, a caller that runs out of budget mid-rebuild takes whatever has been
+    pooled so far. The shared rebuild itself keeps going so the next caller gets the full pool.
+    """
+    if deadline is None or deadline.unlimited:
+        pool = _servable_pool(mood, mood_profile, access_token)
+        if pool:
+            return pool
+        # Shield the shared build so one caller disconnecting doesn't cancel it for the others
+        return await asyncio.shield(_schedule_refresh(mood, mood_profile, access_token))
+
+    latest: CandidatePool | None = None
+
+    async def _follow_build() -> CandidatePool:
+        nonlocal latest
+        async for pool, final in stream_candidate_pool(mood, mood_profile, access_token):
+            latest = pool
+        return latest
+
+    try:
+        return await asyncio.wait_for(_follow_build(), deadline.remaining())
+    except asyncio.TimeoutError:
+        # No progress at all means we were still waiting on the playlist search
+        deadline.truncate("tracks" if latest is not None else "search")
+        return latest or CandidatePool(mood=mood)
+
+
+async def stream_candidate_pool(mood: str, mood_profile: dict, access_token: str) -> AsyncIterator[tuple[CandidatePool, bool]]:
+    """
+    Like get_candidate_pool, but yields (pool, is_final) pairs while a rebuild is in progress.
+
+    A servable cached pool is yielded once as final. Otherwise the provisional pool is yielded
+    each time more playlists have landed, followed by the finished pool.
+    """
+    pool = _servable_pool(mood, mood_profile, access_token)
+    if pool:
+        yield pool, True
+        return
+
+    progress: asyncio.Queue = asyncio.Queue()
+    listeners = _progress_listeners.setdefault(mood, [])
+    listeners.append(progress.put_nowait)
+    try:
+        task = _schedule_refresh(mood, mood_profile, access_token)
+        while not task.done():
+            next_update = asyncio.ensure_future(progress.get())
+            await asyncio.wait({next_update, task}, return_when=asyncio.FIRST_COMPLETED)
+            if not next_update.done():
+                next_update.cancel()
+                break
+            provisional = next_update.result()
+            while not progress.empty():  # Only the latest state matters if we fell behind
+                provisional = progress.get_nowait()
+            if not task.done():
+                yield provisional, False
+        yield await asyncio.shield(task), True
+    finally:
+        listeners.remove(progress.put_nowait)
+        if not listeners:
+            _progress_listeners.pop(mood, None)
+
+
+def get_pool_stats() -> dict:
+    return {
+        mood: {
+            "tracks": len(pool.tracks),
+            "playlists": len(pool.playlist_ids),
+            "age_seconds": round(pool.age, 1),
+            "refreshing": mood in _refresh_tasks,
+        }
+        for mood, pool in _pools.items()
+    }
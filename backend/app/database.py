@@ -1,10 +1,16 @@
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import NullPool
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# app.db_pool reads DB_POOL_* at import, so it comes after .env is loaded
+from app.db_pool import pool_kwargs, instrument
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 if DATABASE_URL and DATABASE_URL.startswith("postgres://"):
@@ -21,18 +27,71 @@ if DATABASE_URL.startswith("sqlite"):
     connect_args["check_same_thread"] = False
 else:
     # Handle Vercel Serverless environment where PostgreSQL connection pools aggressively drop.
-    # pool_pre_ping ensures SQLAlchemy tests the connection before executing the query and reconnects if stale.
-    engine_kwargs["pool_pre_ping"] = True
-    engine_kwargs["pool_recycle"] = 300 # Recycle connections every 5 minutes
+    # DB_POOL_MODE picks how (and whether) each lambda pools connections; see app/db_pool.py
+    engine_kwargs.update(pool_kwargs(is_async=False))
 
 engine = create_engine(DATABASE_URL, connect_args=connect_args, **engine_kwargs)
+instrument("sync", engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _async_url(url: str):
+    """The same database through its asyncio driver (asyncpg / aiosqlite)."""
+    url = make_url(url)
+    if url.drivername.startswith("sqlite"):
+        return url.set(drivername="sqlite+aiosqlite")
+    if url.drivername.startswith("postgresql"):
+        # asyncpg takes `ssl` rather than libpq's `sslmode`, and has no channel binding option
+        query = dict(url.query)
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        query.pop("channel_binding", None)
+        return url.set(drivername="postgresql+asyncpg", query=query)
+    return url
+
+
+# Async twin of `engine` for request handlers: queries await the driver instead of blocking
+# the event loop (and every Spotify fan-out sharing it) while the database responds
+if DATABASE_URL.startswith("sqlite"):
+    # Opening a SQLite file is cheap, and each pooled aiosqlite connection would keep a worker
+    # thread (bound to the event loop that opened it) alive between requests
+    async_engine_kwargs = {"poolclass": NullPool}
+else:
+    async_engine_kwargs = pool_kwargs(is_async=True)
+async_engine = create_async_engine(_async_url(DATABASE_URL), **async_engine_kwargs)
+instrument("async", async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
+def upsert_insert(db):
+    """The dialect's INSERT construct (with .on_conflict_do_*) for Postgres and SQLite, else None."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def run_db(db, fn, *args, **kwargs):
+    """
+    Call `fn(session, *args, **kwargs)`, written against the sync Session API, on either kind of
+    session: an AsyncSession runs it through run_sync, so its I/O still goes through the async
+    driver. An AsyncSession must not be used by two tasks at once; await these one at a time.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return fn(db, *args, **kwargs)
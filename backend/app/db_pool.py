@@ -0,0 +1,155 @@
+"""
+Connection pooling for the Postgres engines, picked with DB_POOL_MODE:
+
+- "queue" (default): SQLAlchemy's QueuePool, pre-pinging every checkout and recycling after 5 minutes.
+- "lifo": a small fixed pool (DB_POOL_SIZE + DB_MAX_OVERFLOW) that hands out the most recently
+  used connection first, so spare connections age out and the warm one skips the pre-ping.
+- "null": no pooling in the process, for DATABASE_URLs pointing at an external PgBouncer-style
+  pooler that owns the connection count. Each checkout opens a fresh connection.
+
+Every pool built here is timed; `get_pool_stats()` backs /api/metrics/db.
+"""
+import os
+import threading
+import time
+from collections import deque
+from uuid import uuid4
+from sqlalchemy import event, exc
+from sqlalchemy.pool import NullPool, QueuePool, AsyncAdaptedQueuePool
+
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "queue").lower()
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 2))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 1))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 300))
+# Pinging pays a round trip per checkout; only the default mode keeps it on unless asked
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true" if DB_POOL_MODE == "queue" else "false").lower() == "true"
+DB_POOL_LATENCY_SAMPLES = int(os.getenv("DB_POOL_LATENCY_SAMPLES", 1024))
+
+POOL_MODES = ("queue", "lifo", "null")
+if DB_POOL_MODE not in POOL_MODES:
+    print(f"[AI.pollo] Unknown DB_POOL_MODE '{DB_POOL_MODE}', falling back to 'queue'")
+    DB_POOL_MODE = "queue"
+
+
+class PoolStats:
+    """Checkout latency and connection counters for one engine's pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=DB_POOL_LATENCY_SAMPLES)
+        self.checkouts = 0
+        self.connects = 0
+        self.overflow_checkouts = 0
+        self.peak_overflow = 0
+        self.timeouts = 0
+        self.max_checkout_ms = 0.0
+
+    def record_checkout(self, seconds: float, pool):
+        ms = seconds * 1000
+        overflow = pool.overflow() if isinstance(pool, QueuePool) else 0
+        with self._lock:
+            self.checkouts += 1
+            self._latencies.append(ms)
+            self.max_checkout_ms = max(self.max_checkout_ms, ms)
+            if overflow > 0:
+                self.overflow_checkouts += 1
+                self.peak_overflow = max(self.peak_overflow, overflow)
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = {
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "overflow_checkouts": self.overflow_checkouts,
+                "peak_overflow": self.peak_overflow,
+                "timeouts": self.timeouts,
+                "max_checkout_ms": round(self.max_checkout_ms, 2),
+            }
+
+        def percentile(p):
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 2) if latencies else 0.0
+
+        stats["checkout_ms"] = {"p50": percentile(0.5), "p95": percentile(0.95), "samples": len(latencies)}
+        if isinstance(pool, QueuePool):
+            stats["pool"] = {"size": pool.size(), "checked_out": pool.checkedout(), "overflow": max(pool.overflow(), 0)}
+        return stats
+
+
+class _TimedPool:
+    """Mixin timing `connect()`, which covers waiting for a free slot, connecting and any pre-ping."""
+    stats: PoolStats
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.record_timeout()
+            raise
+        self.stats.record_checkout(time.perf_counter() - start, self)
+        return connection
+
+
+_engines: dict[str, tuple[PoolStats, object]] = {}
+
+
+def _timed_pool_class(base):
+    # Pools are rebuilt from their class on dispose(), so the stats ride on a per-engine subclass
+    return type(f"Timed{base.__name__}", (_TimedPool, base), {"stats": PoolStats()})
+
+
+def pool_kwargs(is_async: bool) -> dict:
+    """create_engine / create_async_engine arguments for a Postgres engine in DB_POOL_MODE."""
+    if DB_POOL_MODE == "null":
+        kwargs = {"poolclass": _timed_pool_class(NullPool), "pool_pre_ping": DB_POOL_PRE_PING}
+        if is_async:
+            # Transaction-mode poolers hand each transaction to any backend, so asyncpg must not
+            # rely on prepared statements surviving on "its" connection
+            kwargs["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+        return kwargs
+
+    kwargs = {
+        "poolclass": _timed_pool_class(AsyncAdaptedQueuePool if is_async else QueuePool),
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+    if DB_POOL_MODE == "lifo":
+        kwargs.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_use_lifo=True,
+        )
+    return kwargs
+
+
+def instrument(label: str, engine):
+    """Report `engine` (a sync Engine; pass `async_engine.sync_engine`) in get_pool_stats()."""
+    stats = getattr(engine.pool, "stats", None)
+    if stats is None:
+        return
+    event.listen(engine, "connect", lambda _dbapi_connection, _record: stats.record_connect())
+    _engines[label] = (stats, engine)
+
+
+def get_pool_stats() -> dict:
+    """Snapshot of the pool mode and each instrumented engine's checkout metrics."""
+    return {
+        "mode": DB_POOL_MODE,
+        "pre_ping": DB_POOL_PRE_PING,
+        "engines": {label: stats.snapshot(engine.pool) for label, (stats, engine) in _engines.items()},
+    }
@@ -0,0 +1,50 @@
+import time
+import asyncio
+from typing import Awaitable, TypeVar
+
+T = TypeVar("T")
+
+
+class Deadline:
+    """
+    A request-level latency budget shared by every stage of a pipeline.
+
+    Stages run through `run()`; one that doesn't finish in the remaining budget is cancelled,
+    its stage name is recorded in `truncated_stages`, and the pipeline carries on with the
+    stage's fallback value. A budget of None (or <= 0) never expires.
+    """
+
+    def __init__(self, budget_ms: float | None = None):
+        try:
+            budget_ms = float(budget_ms) if budget_ms is not None else None
+        except (TypeError, ValueError):
+            budget_ms = None  # Garbage from a JSON body just means "no budget"
+        self.budget_ms = budget_ms if budget_ms and budget_ms > 0 else None
+        self.expires_at = time.monotonic() + self.budget_ms / 1000 if self.budget_ms else None
+        self.truncated_stages: list[str] = []
+
+    @property
+    def unlimited(self) -> bool:
+        return self.expires_at is None
+
+    def remaining(self) -> float | None:
+        """Seconds left (never negative), or None for an unlimited budget."""
+        if self.expires_at is None:
+            return None
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def truncate(self, stage: str):
+        if stage not in self.truncated_stages:
+            self.truncated_stages.append(stage)
+
+    async def run(self, stage: str, aw: Awaitable[T], fallback: T) -> T:
+        if self.expires_at is None:
+            return await aw
+        try:
+            return await asyncio.wait_for(aw, self.remaining())
+        except asyncio.TimeoutError:
+            self.truncate(stage)
+            return fallback
+
+    def report(self) -> dict:
+        return {"budget_ms": self.budget_ms, "truncated_stages": self.truncated_stages}
@@ -0,0 +1,21 @@
+"""
+Conditional GET: responses carry a strong ETag, and a request whose If-None-Match already names
+it gets an empty 304 instead of the body.
+"""
+from fastapi import Request, Response
+
+# Browsers keep the body but revalidate before every reuse, so polling turns into cheap 304s
+CACHE_CONTROL_REVALIDATE = "private, no-cache"
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match lists `etag` (strong or weak) or is `*`."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = {tag.strip() for tag in header.split(",")}
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL_REVALIDATE})
@@ -0,0 +1,147 @@
+import os
+import itertools
+from dataclasses import dataclass, field
+from sqlalchemy.orm import Session
+from app.cache import TTLCache
+from app.database import upsert_insert
+from app.models import TrackFeedback
+
+# Feedback written through this process patches the cached profile directly; the TTL only
+# bounds how long a write made by another instance (another serverless lambda) goes unseen
+FEEDBACK_PROFILE_TTL_SECONDS = float(os.getenv("FEEDBACK_PROFILE_TTL_SECONDS", 600))
+FEEDBACK_PROFILE_MAX_ENTRIES = int(os.getenv("FEEDBACK_PROFILE_MAX_ENTRIES", 2048))
+# Rows per INSERT ... ON CONFLICT statement (keeps bound parameters under old SQLite's 999 cap)
+FEEDBACK_UPSERT_CHUNK_SIZE = 150
+
+
+@dataclass(frozen=True)
+class FeedbackProfile:
+    """
+    A user's thumbs up/down history reduced to the four id sets scoring reads.
+
+    Profiles are immutable: a patch builds a new one and swaps it into the cache, so a
+    recommendation already holding the old sets never sees them change mid-scoring.
+    """
+    # (track_id, artist_id, is_liked) per track_feedback row, in insertion order
+    rows: tuple[tuple[str | None, str | None, bool], ...] = ()
+    liked_tracks: frozenset = field(default_factory=frozenset)
+    disliked_tracks: frozenset = field(default_factory=frozenset)
+    liked_artists: frozenset = field(default_factory=frozenset)
+    disliked_artists: frozenset = field(default_factory=frozenset)
+
+    @classmethod
+    def from_rows(cls, rows) -> "FeedbackProfile":
+        rows = tuple((track_id, artist_id, bool(is_liked)) for track_id, artist_id, is_liked in rows)
+        sets = {True: (set(), set()), False: (set(), set())}
+        for track_id, artist_id, is_liked in rows:
+            tracks, artists = sets[is_liked]
+            if track_id: tracks.add(track_id)
+            if artist_id: artists.add(artist_id)
+        return cls(
+            rows=rows,
+            liked_tracks=frozenset(sets[True][0]),
+            liked_artists=frozenset(sets[True][1]),
+            disliked_tracks=frozenset(sets[False][0]),
+            disliked_artists=frozenset(sets[False][1]),
+        )
+
+    def with_feedback(self, events: list[tuple[str, str, bool]]) -> "FeedbackProfile":
+        """The profile after upserting (track_id, artist_id, is_liked) events (an existing row keeps its artist)."""
+        rows = list(self.rows)
+        positions = {row[0]: i for i, row in enumerate(rows)}
+        for track_id, artist_id, is_liked in events:
+            i = positions.get(track_id)
+            if i is None:
+                positions[track_id] = len(rows)
+                rows.append((track_id, artist_id, is_liked))
+            else:
+                rows[i] = (rows[i][0], rows[i][1], is_liked)
+        return FeedbackProfile.from_rows(rows)
+
+
+EMPTY_PROFILE = FeedbackProfile()
+
+# user_id -> FeedbackProfile
+feedback_profiles = TTLCache(maxsize=FEEDBACK_PROFILE_MAX_ENTRIES, ttl=FEEDBACK_PROFILE_TTL_SECONDS)
+
+# On an AsyncSession a cache-miss load yields to the event loop while its query runs, so feedback
+# can be committed in between. Every load and write takes a ticket from one counter, and a load
+# only caches its rows if no write for that user has a later ticket (user_id -> last write ticket).
+_tickets = itertools.count()
+_last_writes = TTLCache(maxsize=FEEDBACK_PROFILE_MAX_ENTRIES, ttl=FEEDBACK_PROFILE_TTL_SECONDS)
+
+
+def get_feedback_profile(db: Session | None, user_id: str | None) -> FeedbackProfile:
+    if not user_id or db is None:
+        return EMPTY_PROFILE
+    profile = feedback_profiles.get(user_id)
+    if profile is None:
+        ticket = next(_tickets)
+        # Only the three columns scoring needs, as plain tuples (no ORM object per row)
+        rows = db.query(TrackFeedback.track_id, TrackFeedback.artist_id, TrackFeedback.is_liked).filter(
+            TrackFeedback.user_id == user_id
+        ).order_by(TrackFeedback.id).all()
+        profile = FeedbackProfile.from_rows(rows)
+        if _last_writes.get(user_id, -1) < ticket:
+            feedback_profiles.set(user_id, profile)
+    return profile
+
+
+def _collapse(events) -> list[tuple[str, str, bool]]:
+    """
+    One event per track, as if they had been applied in order: the first one inserts the row
+    (and its artist), later ones only flip is_liked. Postgres refuses an ON CONFLICT statement
+    that touches the same row twice.
+    """
+    merged: dict[str, tuple[str, bool]] = {}
+    for track_id, artist_id, is_liked in events:
+        first_artist = merged[track_id][0] if track_id in merged else artist_id
+        merged[track_id] = (first_artist, is_liked)
+    return [(track_id, artist_id, is_liked) for track_id, (artist_id, is_liked) in merged.items()]
+
+
+def _upsert_rows_one_by_one(db: Session, user_id: str, events):
+    for track_id, artist_id, is_liked in events:
+        existing = db.query(TrackFeedback).filter(
+            TrackFeedback.user_id == user_id,
+            TrackFeedback.track_id == track_id
+        ).first()
+        if existing:
+            existing.is_liked = is_liked
+        else:
+            db.add(TrackFeedback(user_id=user_id, track_id=track_id, artist_id=artist_id, is_liked=is_liked))
+
+
+def save_feedback(db: Session, user_id: str, events) -> list[tuple[str, str, bool]]:
+    """
+    Upsert (track_id, artist_id, is_liked) events for a user, commit, and patch their cached
+    profile. On Postgres and SQLite this is one INSERT ... ON CONFLICT per chunk of events
+    against the (user_id, track_id) unique constraint; other dialects select-then-write.
+    Returns the events actually applied (one per track).
+    """
+    events = _collapse(events)
+    if not events:
+        return events
+
+    insert = upsert_insert(db)
+    if insert is None:
+        _upsert_rows_one_by_one(db, user_id, events)
+    else:
+        for i in range(0, len(events), FEEDBACK_UPSERT_CHUNK_SIZE):
+            stmt = insert(TrackFeedback).values([
+                {"user_id": user_id, "track_id": track_id, "artist_id": artist_id, "is_liked": is_liked}
+                for track_id, artist_id, is_liked in events[i:i + FEEDBACK_UPSERT_CHUNK_SIZE]
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["user_id", "track_id"],
+                set_={"is_liked": stmt.excluded.is_liked},
+            )
+            db.execute(stmt)
+    db.commit()
+    _last_writes.set(user_id, next(_tickets))
+
+    # Write-through; users with no cached profile simply load fresh next time
+    profile = feedback_profiles.get(user_id)
+    if profile is not None:
+        feedback_profiles.set(user_id, profile.with_feedback(events))
+    return events
@@ -0,0 +1,28 @@
+import os
+from app.cache import TTLCache, hash_token
+
+# Spotify access tokens live for an hour, so a few minutes of caching never outlives the token itself
+IDENTITY_CACHE_TTL_SECONDS = float(os.getenv("IDENTITY_CACHE_TTL_SECONDS", 300))
+IDENTITY_CACHE_MAX_ENTRIES = int(os.getenv("IDENTITY_CACHE_MAX_ENTRIES", 2048))
+
+# hash(access_token) -> {"profile": <raw /v1/me payload>, "registered": <users row verified>}
+identity_cache = TTLCache(maxsize=IDENTITY_CACHE_MAX_ENTRIES, ttl=IDENTITY_CACHE_TTL_SECONDS)
+
+
+def get_cached_identity(access_token: str) -> dict | None:
+    return identity_cache.get(hash_token(access_token))
+
+
+def remember_identity(access_token: str, profile: dict, registered: bool = False):
+    identity_cache.set(hash_token(access_token), {"profile": profile, "registered": registered})
+
+
+def mark_registered(access_token: str):
+    cached = get_cached_identity(access_token)
+    if cached:
+        cached["registered"] = True
+
+
+def forget_identity(access_token: str):
+    """Drop a token's identity, e.g. as soon as Spotify rejects it with a 401."""
+    identity_cache.pop(hash_token(access_token))
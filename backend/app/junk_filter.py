@@ -0,0 +1,74 @@
+import os
+import re
+from functools import lru_cache
+from app.cache import TTLCache
+
+# Blocklist tokens for filtering out cover/karaoke/tribute junk from search results.
+# Moods can extend it with a "junk_tokens" list in their MOOD_PROFILES entry.
+JUNK_TOKENS = [
+    "cover", "karaoke", "tribute", "instrumental", "backing track",
+    "in the style of", "originally performed", "made famous",
+    "piano version", "music box", "lullaby version", "8-bit",
+    "8 bit", "ringtone", "midi", "acapella version",
+]
+
+JUNK_VERDICT_TTL_SECONDS = float(os.getenv("JUNK_VERDICT_TTL_SECONDS", 86400))
+JUNK_VERDICT_MAX_ENTRIES = int(os.getenv("JUNK_VERDICT_MAX_ENTRIES", 50000))
+# Playlist cache rows written before verdicts moved out of the track dicts carry them under this key
+LEGACY_JUNK_VERDICT_KEY = "_junk"
+
+# track id -> base verdict, judged once as the track enters the playlist cache. Kept beside the
+# track dicts rather than in them, since those dicts are served as-is in API responses
+junk_verdicts = TTLCache(maxsize=JUNK_VERDICT_MAX_ENTRIES, ttl=JUNK_VERDICT_TTL_SECONDS)
+
+
+@lru_cache(maxsize=64)
+def compile_junk_pattern(tokens: tuple[str, ...]) -> re.Pattern | None:
+    """One alternation regex for a token list (plain substring semantics, case-insensitive)."""
+    tokens = tuple(t.lower() for t in tokens if t)
+    if not tokens:
+        return None
+    # Longest first so overlapping tokens don't shadow each other in the alternation
+    return re.compile("|".join(re.escape(t) for t in sorted(set(tokens), key=len, reverse=True)))
+
+
+_BASE_PATTERN = compile_junk_pattern(tuple(JUNK_TOKENS))
+
+
+def _names(track: dict) -> str:
+    # A newline can't occur in a token, so matches never straddle two names
+    return "\n".join(
+        [(track.get("name") or "").lower()] + [(a.get("name") or "").lower() for a in track.get("artists", [])]
+    )
+
+
+def is_junk_track(track: dict) -> bool:
+    """Return True if a track looks like a cover, karaoke, or tribute version."""
+    if _BASE_PATTERN.search(_names(track)):
+        return True
+    # Filter out very low-popularity tracks (often bootleg/cover accounts)
+    return track.get("popularity", 50) < 5
+
+
+def judge_track(track: dict, verdict: bool | None = None) -> bool:
+    """Record a track's base verdict (computed unless given) under its id, and return it."""
+    if verdict is None:
+        verdict = is_junk_track(track)
+    if track.get("id"):
+        junk_verdicts.set(track["id"], verdict)
+    return verdict
+
+
+def mood_junk_pattern(mood_profile: dict) -> re.Pattern | None:
+    """The compiled extra tokens of a mood, or None if it doesn't add any."""
+    return compile_junk_pattern(tuple(mood_profile.get("junk_tokens", ())))
+
+
+def is_junk_for_mood(track: dict, extra_pattern: re.Pattern | None = None) -> bool:
+    """Base verdict (precomputed when the track was cached, if available) plus a mood's extra tokens."""
+    verdict = junk_verdicts.get(track.get("id"))
+    if verdict is None:
+        verdict = judge_track(track)
+    if verdict:
+        return True
+    return bool(extra_pattern and extra_pattern.search(_names(track)))
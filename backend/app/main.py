@@ -1,4 +1,5 @@
 import sys
+import time
 import asyncio
 from contextlib import asynccontextmanager
 from pathlib import Path
@@ -6,67 +7,39 @@ from pathlib import Path
 # Must be BEFORE any `from app.*` imports so Vercel serverless can resolve the package
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+_boot_started = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
-from app.routers import auth, spotify, history, social, blend, contact
+from app.routers import auth, spotify, history, social, blend, contact, metrics
 from app.scheduler import retention_cleanup_loop
-from app.database import engine, Base
-from app import models
+from app.spotify_client import open_spotify_client, close_spotify_client
+from app.database import async_engine
+from app.startup import prepare_schema, record_phase, report_cold_start
 import os
-import uvicorn
 
 load_dotenv()
+record_phase("imports", time.perf_counter() - _boot_started)
 
-# Programmatically run Alembic migrations on startup instead of Base.metadata.create_all
-# This ensures the `alembic_version` table is properly tracked in Vercel's PostgreSQL
-from alembic.config import Config
-from alembic import command
-
-try:
-    alembic_ini_path = os.path.join(os.path.dirname(__file__), "..", "alembic.ini")
-    alembic_cfg = Config(alembic_ini_path)
-    command.upgrade(alembic_cfg, "head")
-    print("[AI.pollo] Successfully ran Alembic migrations on cold boot.")
-except Exception as e:
-    print(f"[AI.pollo] Failed to run Alembic migrations: {e}")
-    # Fallback: create any missing tables directly from models
-    # This is additive and safe — it won't modify or destroy existing tables
-    print("[AI.pollo] Running fallback Base.metadata.create_all()...")
-    Base.metadata.create_all(bind=engine)
-    print("[AI.pollo] Fallback table creation complete.")
-
-# Second fallback: add any missing COLUMNS to existing tables
-# create_all() only creates new tables; it can't ALTER existing ones
-# This list should be maintained as new columns are added to models
-_COLUMN_PATCHES = [
-    ("blend_sessions", "last_generated_json", "TEXT"),
-    ("blend_sessions", "last_generated_mood", "VARCHAR"),
-]
-
-try:
-    from sqlalchemy import text
-    with engine.connect() as conn:
-        for table, column, col_type in _COLUMN_PATCHES:
-            try:
-                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {col_type}"))
-            except Exception:
-                pass  # Column already exists or table doesn't exist yet
-        conn.commit()
-    print(f"[AI.pollo] Column patches verified ({len(_COLUMN_PATCHES)} checked).")
-except Exception as e:
-    print(f"[AI.pollo] Column patch check skipped: {e}")
+# Cheap alembic_version check by default; Alembic is only imported when the schema is behind
+prepare_schema()
+_setup_started = time.perf_counter()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Mounts infinite background daemon loops upon API startup and destroys them safely upon SIGTERM shutdown.
     """
+    # Open the shared keep-alive Spotify connection pool once per process
+    await open_spotify_client()
     # Mount automated Database Data Retention sweeping policy logic (7-Day TTL)
     retention_loop = asyncio.create_task(retention_cleanup_loop())
     yield
     # Safely de-construct background daemons when exiting FastAPI
     retention_loop.cancel()
+    await close_spotify_client()
+    await async_engine.dispose()
     
 app = FastAPI(
     title="AI.pollo 𓏢",
@@ -112,8 +85,15 @@ app.include_router(social.router)
 app.include_router(history.router)
 app.include_router(blend.router)
 app.include_router(contact.router)
+app.include_router(metrics.router)
+
+record_phase("app_setup", time.perf_counter() - _setup_started)
+report_cold_start()
 
 if __name__ == "__main__":
+    # Only the local dev server needs uvicorn; serverless imports this module without running it
+    import uvicorn
+
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Text, Boolean, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -35,9 +35,13 @@ class MoodEntry(Base):
     user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"))
     mood_name = Column(String, index=True) # e.g., 'Happy', 'Chill'
     timestamp = Column(DateTime, default=datetime.utcnow)
-    tracks_preview_json = Column(Text, nullable=True) # JSON array of track data for previews without API call
+    tracks_preview_json = Column(Text, nullable=True) # Legacy JSON previews; new entries link rows in mood_entry_tracks
+
+    # Serves the (timestamp, id) keyset pages of a user's history and the friends feed
+    __table_args__ = (Index("ix_mood_entries_user_id_timestamp", user_id, timestamp.desc(), id.desc()),)
 
     user = relationship("User", back_populates="mood_entries")
+    track_links = relationship("MoodEntryTrack", cascade="all, delete-orphan", passive_deletes=True)
 
 class Friendship(Base):
     __tablename__ = "friendships"
@@ -55,6 +59,8 @@ class TrackFeedback(Base):
     This data continuously trains the Curated Intersect Algorithm for deeper personalization.
     """
     __tablename__ = "track_feedback"
+    # One verdict per user and track; feedback writes upsert against this
+    __table_args__ = (UniqueConstraint("user_id", "track_id", name="uq_track_feedback_user_track"),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), index=True)
@@ -77,6 +83,7 @@ class BlendSession(Base):
     is_active = Column(Boolean, default=True)
     last_generated_json = Column(Text, nullable=True)  # Full track JSON for broadcasting to joiners
     last_generated_mood = Column(String, nullable=True)  # e.g. 'chill'
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # Bumped on join, leave and generate; ETag of the room state
 
     participants = relationship("BlendParticipant", back_populates="session", cascade="all, delete-orphan")
     host = relationship("User", foreign_keys=[host_id])
@@ -98,3 +105,51 @@ class BlendParticipant(Base):
 
     session = relationship("BlendSession", back_populates="participants")
     user = relationship("User", foreign_keys=[user_id])
+
+class PlaylistTrackCache(Base):
+    """
+    Slim snapshot of a Spotify playlist's tracks, keyed by playlist id and validated by `snapshot_id`.
+    Spotify bumps the snapshot on every edit, so a matching snapshot means the cached items are still exact.
+    """
+    __tablename__ = "playlist_track_cache"
+
+    playlist_id = Column(String, primary_key=True, index=True)
+    snapshot_id = Column(String, nullable=False)
+    tracks_json = Column(Text, nullable=False)  # JSON array of slim track projections
+    total = Column(Integer, default=0)  # Total tracks in the playlist (may exceed the cached first page)
+    fetched_at = Column(DateTime, default=datetime.utcnow)
+
+class MoodDailyRollup(Base):
+    """
+    Per-user mood counts by UTC day and hour, kept in step with every MoodEntry insert.
+    History charts read these instead of scanning raw entries; `python -m app.mood_rollups rebuild`
+    recomputes them from mood_entries.
+    """
+    __tablename__ = "mood_daily_rollups"
+
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    hour = Column(Integer, primary_key=True)  # 0-23, UTC
+    mood_name = Column(String, primary_key=True)
+    entry_count = Column(Integer, nullable=False, default=0)
+
+class Track(Base):
+    """
+    Preview metadata for a Spotify track, stored once however many mood entries reference it.
+    """
+    __tablename__ = "tracks"
+
+    id = Column(String, primary_key=True)  # Spotify track id
+    name = Column(String, nullable=False)
+    artists_json = Column(Text, nullable=False)  # JSON array of artist names
+    album_image = Column(String, nullable=True)
+
+class MoodEntryTrack(Base):
+    """
+    The tracks a MoodEntry generated, in playlist order (replaces the per-entry preview JSON).
+    """
+    __tablename__ = "mood_entry_tracks"
+
+    entry_id = Column(Integer, ForeignKey("mood_entries.id", ondelete="CASCADE"), primary_key=True)
+    position = Column(Integer, primary_key=True)
+    track_id = Column(String, ForeignKey("tracks.id"), nullable=False, index=True)
@@ -0,0 +1,134 @@
+import os
+from collections import deque
+from functools import lru_cache
+from typing import Iterable
+from app.config.mood_profiles import MOOD_KEYWORDS, MOOD_ASSOCIATIONS
+
+# Substring matching (the default) reproduces the historical scores exactly, including
+# "hot" firing inside "photo". Word-boundary matching only counts whole words/phrases.
+MOOD_MATCH_WORD_BOUNDARIES = os.getenv("MOOD_MATCH_WORD_BOUNDARIES", "false").lower() == "true"
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordAutomaton:
+    """
+    Aho–Corasick automaton over a fixed phrase list: one left-to-right pass over the text
+    reports every phrase occurring in it, however many phrases there are.
+
+    Transitions are memoized into a DFA lazily, and only for characters that appear in some
+    phrase; any other character always leads back to the root.
+    """
+
+    def __init__(self, patterns: Iterable[str], word_boundaries: bool = False):
+        self.patterns = list(patterns)
+        self.word_boundaries = word_boundaries
+        self._delta: list[dict[str, int]] = [{}]  # goto edges, later also memoized fail hops
+        self._fail: list[int] = [0]
+        self._out: list[tuple[int, ...]] = [()]
+        self._alphabet: set[str] = set()
+
+        for pid, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            state = 0
+            for ch in pattern:
+                nxt = self._delta[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._delta)
+                    self._delta[state][ch] = nxt
+                    self._delta.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = nxt
+            self._out[state] += (pid,)
+            self._alphabet.update(pattern)
+
+        # Breadth-first failure links; each state also inherits the outputs of its fail state
+        queue = deque(self._delta[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._delta[state].items():
+                queue.append(nxt)
+                self._fail[nxt] = self._step(self._fail[state], ch, memoize=False)
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def _step(self, state: int, ch: str, memoize: bool = True) -> int:
+        """Follow failure links from `state` until `ch` can be consumed."""
+        origin = state
+        while True:
+            nxt = self._delta[state].get(ch)
+            if nxt is not None:
+                break
+            if state == 0:
+                nxt = 0
+                break
+            state = self._fail[state]
+        if memoize and (origin != 0 or nxt != 0):
+            self._delta[origin][ch] = nxt
+        return nxt
+
+    def find(self, text: str) -> set[int]:
+        """Ids (indices into `patterns`) of every phrase found in `text`."""
+        delta, out, alphabet, patterns = self._delta, self._out, self._alphabet, self.patterns
+        hits: set[int] = set()
+        state = 0
+        for end, ch in enumerate(text):
+            if ch not in alphabet:
+                state = 0
+                continue
+            nxt = delta[state].get(ch)
+            state = nxt if nxt is not None else self._step(state, ch)
+            if not out[state]:
+                continue
+            if not self.word_boundaries:
+                hits.update(out[state])
+                continue
+            after_ok = end + 1 >= len(text) or not _is_word_char(text[end + 1])
+            for pid in out[state]:
+                start = end - len(patterns[pid]) + 1
+                if after_ok and (start == 0 or not _is_word_char(text[start - 1])):
+                    hits.add(pid)
+        return hits
+
+
+class MoodMatcher:
+    """The MOOD_KEYWORDS / MOOD_ASSOCIATIONS tables compiled for `_analyze_text_mood`."""
+
+    def __init__(self, keywords: dict[str, list[str]], associations: dict[str, str], word_boundaries: bool = False):
+        self.moods = list(keywords)
+
+        # Tier 1: a keyword is worth its word count to every mood listing it (per listing)
+        weights: dict[str, list[tuple[str, int]]] = {}
+        for mood, phrases in keywords.items():
+            for phrase in phrases:
+                weights.setdefault(phrase, []).append((mood, len(phrase.split())))
+        self._keyword_weights = list(weights.values())
+        self._keywords = KeywordAutomaton(weights, word_boundaries)
+
+        # Tier 2: phrases are tallied longest-first, which decides ties between moods
+        ordered = sorted(associations, key=len, reverse=True)
+        self._association_moods = [associations[phrase] for phrase in ordered]
+        self._associations = KeywordAutomaton(ordered, word_boundaries)
+
+    def keyword_scores(self, text_lower: str) -> dict[str, int]:
+        scores = {mood: 0 for mood in self.moods}
+        for pid in self._keywords.find(text_lower):
+            for mood, weight in self._keyword_weights[pid]:
+                scores[mood] += weight
+        return scores
+
+    def association_scores(self, text_lower: str) -> dict[str, int]:
+        scores: dict[str, int] = {}
+        for pid in sorted(self._associations.find(text_lower)):
+            mood = self._association_moods[pid]
+            scores[mood] = scores.get(mood, 0) + 1
+        return scores
+
+
+@lru_cache(maxsize=1)
+def get_mood_matcher() -> MoodMatcher:
+    """The shared matcher, compiled on first use rather than on every cold start."""
+    return MoodMatcher(MOOD_KEYWORDS, MOOD_ASSOCIATIONS, MOOD_MATCH_WORD_BOUNDARIES)
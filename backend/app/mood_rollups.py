@@ -0,0 +1,116 @@
+"""
+Incrementally maintained (user, UTC day, UTC hour, mood) counts of mood entries.
+
+Every MoodEntry is created through `add_mood_entry` (or `add_mood_entries`), which bumps the matching rollup row in
+the same transaction. To recompute everything from mood_entries (e.g. after restoring a
+backup or on a database that predates the table):
+
+    python -m app.mood_rollups rebuild [--user USER_ID]
+"""
+import os
+import argparse
+from datetime import datetime, date
+from sqlalchemy import func, select, cast, Integer
+from sqlalchemy.orm import Session
+from app.database import upsert_insert
+from app.models import MoodEntry, MoodDailyRollup
+from app.track_previews import link_entry_tracks
+
+# When true the retention sweep also drops rollups older than the raw-entry retention window;
+# by default they outlive the purged entries so long-range charts keep their history
+MOOD_ROLLUPS_FOLLOW_RETENTION = os.getenv("MOOD_ROLLUPS_FOLLOW_RETENTION", "false").lower() == "true"
+
+_KEY_COLUMNS = ["user_id", "date", "hour", "mood_name"]
+
+
+def bump_rollup(db: Session, user_id: str, mood: str, timestamp: datetime, count: int = 1):
+    """Add `count` entries to the rollup bucket of `timestamp`. The caller commits."""
+    key = {"user_id": user_id, "date": timestamp.date(), "hour": timestamp.hour, "mood_name": mood}
+    insert = upsert_insert(db)
+    if insert is None:
+        row = db.get(MoodDailyRollup, tuple(key[c] for c in _KEY_COLUMNS))
+        if row:
+            row.entry_count += count
+        else:
+            db.add(MoodDailyRollup(**key, entry_count=count))
+        return
+    stmt = insert(MoodDailyRollup).values(**key, entry_count=count)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=_KEY_COLUMNS,
+        set_={"entry_count": MoodDailyRollup.entry_count + stmt.excluded.entry_count},
+    ))
+
+
+def add_mood_entry(db: Session, user_id: str, mood: str, previews: list[dict]) -> MoodEntry:
+    """
+    Create a MoodEntry linked to its track `previews` (see track_previews.preview_track) and
+    count it in the rollups. The caller commits everything together.
+    """
+    return add_mood_entries(db, [user_id], mood, previews)[0]
+
+
+def add_mood_entries(db: Session, user_ids: list[str], mood: str, previews: list[dict]) -> list[MoodEntry]:
+    """
+    One entry per user sharing the same `previews` (a blend): the tracks are upserted once and
+    each entry only adds its links and rollup bump. The caller commits everything together.
+    """
+    timestamp = datetime.utcnow()
+    entries = [MoodEntry(user_id=user_id, mood_name=mood, timestamp=timestamp) for user_id in user_ids]
+    db.add_all(entries)
+    db.flush()  # assigns the entry ids for the track links
+    link_entry_tracks(db, entries, previews)
+    for user_id in user_ids:
+        bump_rollup(db, user_id, mood, timestamp)
+    return entries
+
+
+def _bucket_columns(db: Session):
+    """(day, hour) SQL expressions for MoodEntry.timestamp in this dialect."""
+    if db.get_bind().dialect.name == "sqlite":
+        return func.date(MoodEntry.timestamp), cast(func.strftime("%H", MoodEntry.timestamp), Integer)
+    return func.date(MoodEntry.timestamp), cast(func.extract("hour", MoodEntry.timestamp), Integer)
+
+
+def rebuild_rollups(db: Session, user_id: str | None = None) -> int:
+    """Recompute rollups from mood_entries (for one user, or everyone). Returns the rows written."""
+    day, hour = _bucket_columns(db)
+    grouped = select(
+        MoodEntry.user_id, day, hour, MoodEntry.mood_name, func.count()
+    ).where(
+        MoodEntry.user_id.is_not(None), MoodEntry.mood_name.is_not(None), MoodEntry.timestamp.is_not(None)
+    ).group_by(MoodEntry.user_id, day, hour, MoodEntry.mood_name)
+
+    deleted = db.query(MoodDailyRollup)
+    if user_id:
+        grouped = grouped.where(MoodEntry.user_id == user_id)
+        deleted = deleted.filter(MoodDailyRollup.user_id == user_id)
+    deleted.delete(synchronize_session=False)
+
+    result = db.execute(MoodDailyRollup.__table__.insert().from_select(_KEY_COLUMNS + ["entry_count"], grouped))
+    db.commit()
+    return result.rowcount
+
+
+def purge_rollups_before(db: Session, cutoff: date) -> int:
+    """Retention hook: drop rollup days before `cutoff`. The caller commits."""
+    return db.query(MoodDailyRollup).filter(MoodDailyRollup.date < cutoff).delete(synchronize_session=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the mood_daily_rollups table.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rebuild = sub.add_parser("rebuild", help="Recompute rollups from mood_entries")
+    rebuild.add_argument("--user", help="Only rebuild this user's rollups")
+    args = parser.parse_args()
+
+    from app.database import SessionLocal
+    db = SessionLocal()
+    try:
+        written = rebuild_rollups(db, args.user)
+        print(f"[AI.pollo] Rebuilt {written} mood rollup rows" + (f" for {args.user}" if args.user else ""))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import os
+import json
+import base64
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+from sqlalchemy.engine import Row
+
+# Default and maximum page sizes for the cursor-paginated history and feed endpoints
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", 20))
+HISTORY_MAX_PAGE_SIZE = int(os.getenv("HISTORY_MAX_PAGE_SIZE", 100))
+
+
+def page_size(limit: int | None) -> int:
+    if not limit or limit < 1:
+        return HISTORY_PAGE_SIZE
+    return min(limit, HISTORY_MAX_PAGE_SIZE)
+
+
+def encode_cursor(timestamp: datetime, entry_id: int) -> str:
+    """Opaque continuation token: the (timestamp, id) of the last row on the page."""
+    raw = json.dumps([timestamp.isoformat(), entry_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, entry_id = json.loads(raw)
+        return datetime.fromisoformat(timestamp), int(entry_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_page(query, timestamp_col, id_col, cursor: str | None, limit: int | None):
+    """
+    One page of `query`, newest first, continuing after `cursor`.
+
+    Rows are ordered on (timestamp, id) so entries sharing a timestamp never repeat or go
+    missing between pages, and each page is an index range scan instead of an OFFSET that
+    grows with how far back the reader has scrolled. Returns (rows, next_cursor); the cursor
+    is None on the last page. `query` may select extra entities: the first one must be the
+    row the timestamp/id columns belong to.
+    """
+    size = page_size(limit)
+    if cursor:
+        timestamp, entry_id = decode_cursor(cursor)
+        query = query.filter(tuple_(timestamp_col, id_col) < tuple_(timestamp, entry_id))
+    rows = query.order_by(timestamp_col.desc(), id_col.desc()).limit(size + 1).all()
+
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        last = rows[-1]
+        last = last[0] if isinstance(last, Row) else last
+        next_cursor = encode_cursor(getattr(last, timestamp_col.key), getattr(last, id_col.key))
+    return rows, next_cursor
@@ -0,0 +1,129 @@
+import json
+from datetime import datetime
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal, run_db
+from app.models import PlaylistTrackCache
+from app.spotify_client import spotify_get
+from app.rate_limit import Priority
+from app.junk_filter import LEGACY_JUNK_VERDICT_KEY, judge_track
+
+# Ask Spotify for exactly the slim projection we keep, so cache misses download less too
+PLAYLIST_TRACK_FIELDS = (
+    "items(track(id,name,uri,popularity,explicit,preview_url,duration_ms,external_urls,"
+    "artists(id,name),album(name,images))),total"
+)
+
+
+def slim_track(track: dict) -> dict:
+    """Project a full Spotify track object down to the fields the app actually reads (recording its junk verdict)."""
+    album = track.get("album") or {}
+    slim = {
+        "id": track.get("id"),
+        "name": track.get("name"),
+        "uri": track.get("uri"),
+        "artists": [{"id": a.get("id"), "name": a.get("name")} for a in track.get("artists", [])],
+        "album": {"name": album.get("name"), "images": album.get("images", [])},
+        "popularity": track.get("popularity", 50),
+        "explicit": track.get("explicit", False),
+        "preview_url": track.get("preview_url"),
+        "duration_ms": track.get("duration_ms"),
+        "external_urls": track.get("external_urls", {}),
+    }
+    # Judged once here, as the track enters the cache, instead of on every pool build
+    judge_track(slim)
+    return slim
+
+
+def _load(db: Session, playlist_id: str, snapshot_id: str) -> tuple[list[dict], int] | None:
+    row = db.query(PlaylistTrackCache).filter(PlaylistTrackCache.playlist_id == playlist_id).first()
+    if row and row.snapshot_id == snapshot_id:
+        tracks = json.loads(row.tracks_json)
+        for t in tracks:
+            # Rows cached by an earlier build hold the verdict inline; move it out of the dict
+            judge_track(t, t.pop(LEGACY_JUNK_VERDICT_KEY, None))
+        return tracks, row.total or 0
+    return None
+
+
+def _store(db: Session, playlist_id: str, snapshot_id: str, tracks: list[dict], total: int):
+    try:
+        row = db.query(PlaylistTrackCache).filter(PlaylistTrackCache.playlist_id == playlist_id).first()
+        if not row:
+            row = PlaylistTrackCache(playlist_id=playlist_id)
+            db.add(row)
+        row.snapshot_id = snapshot_id
+        row.tracks_json = json.dumps(tracks)
+        row.total = total
+        row.fetched_at = datetime.utcnow()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+async def _cache_call(db: Session | AsyncSession | None, fn, *args):
+    """
+    Run a cache read/write on the caller's session, or else on a short-lived async session of
+    its own: a connection is only held for the query itself, never across the Spotify fetch,
+    and concurrent playlist fetches never share one.
+    """
+    if db is not None:
+        return await run_db(db, fn, *args)
+    async with AsyncSessionLocal() as session:
+        return await session.run_sync(fn, *args)
+
+
+async def _fetch_snapshot_id(access_token: str, playlist_id: str, priority: Priority) -> str | None:
+    """Cheap metadata probe: a few bytes instead of the full item list."""
+    resp = await spotify_get(
+        f"https://api.spotify.com/v1/playlists/{playlist_id}",
+        access_token,
+        priority,
+        shared=True,
+        params={"fields": "snapshot_id"},
+    )
+    resp.raise_for_status()
+    return resp.json().get("snapshot_id")
+
+
+async def get_playlist_tracks(
+    access_token: str,
+    playlist_id: str,
+    snapshot_id: str | None = None,
+    db: Session | AsyncSession | None = None,
+    priority: Priority = Priority.INTERACTIVE,
+) -> tuple[list[dict], int]:
+    """
+    Return (slim tracks, total) for the first page (100 items) of a playlist.
+
+    `snapshot_id` can be passed when the caller already has it (search results include it);
+    otherwise a metadata probe decides whether the cached items are still current.
+    Raises httpx.HTTPStatusError when Spotify rejects the fetch.
+    """
+    if snapshot_id is None:
+        snapshot_id = await _fetch_snapshot_id(access_token, playlist_id, priority)
+    if snapshot_id:
+        cached = await _cache_call(db, _load, playlist_id, snapshot_id)
+        if cached is not None:
+            return cached
+
+    resp = await spotify_get(
+        f"https://api.spotify.com/v1/playlists/{playlist_id}/tracks",
+        access_token,
+        priority,
+        shared=True,
+        params={"limit": 100, "fields": PLAYLIST_TRACK_FIELDS},
+    )
+    resp.raise_for_status()
+    data = resp.json()
+    # Filter out local tracks or podcasts
+    tracks = [slim_track(item["track"]) for item in data.get("items", []) if item.get("track") and item["track"].get("id")]
+    total = data.get("total", len(tracks))
+
+    if snapshot_id:
+        try:
+            await _cache_call(db, _store, playlist_id, snapshot_id, tracks, total)
+        except Exception as e:
+            print(f"[AI.pollo] Failed to cache playlist {playlist_id}: {e}")
+    return tracks, total
@@ -0,0 +1,89 @@
+"""
+Channel pub/sub feeding the open event streams (blend rooms).
+
+The default broker fans messages out to the subscribers inside this process, so it only reaches
+streams held by the same instance. Multi-instance deployments set PUBSUB_BROKER to
+"module:factory", a callable returning an object with the same `publish` / `subscribe` /
+`has_subscribers` interface backed by something shared (Redis, Postgres LISTEN/NOTIFY, ...).
+Messages must stay JSON-serializable so such brokers can carry them.
+
+`broker_is_shared` is False for the in-process default: publishers on other instances never reach
+this process's streams, so they re-check their source themselves (see the blend room stream).
+"""
+import os
+import asyncio
+import importlib
+from contextlib import asynccontextmanager
+
+PUBSUB_BROKER = os.getenv("PUBSUB_BROKER", "")
+# Every message so far replaces the previous state, so a lagging subscriber only keeps the newest few
+PUBSUB_QUEUE_SIZE = int(os.getenv("PUBSUB_QUEUE_SIZE", 8))
+
+
+class Subscription:
+    """One subscriber's inbox on a channel."""
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=PUBSUB_QUEUE_SIZE)
+
+    def deliver(self, message):
+        if self._queue.full():
+            self._queue.get_nowait()  # drop the oldest rather than block the publisher
+        self._queue.put_nowait(message)
+
+    async def get(self, timeout: float | None = None):
+        """The next message, or None if `timeout` seconds pass without one."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class InProcessBroker:
+    """Fans messages out to this process's subscribers. Use it from the event loop thread."""
+    shared = False
+
+    def __init__(self):
+        self._channels: dict[str, set[Subscription]] = {}
+
+    def has_subscribers(self, channel: str) -> bool:
+        return bool(self._channels.get(channel))
+
+    async def publish(self, channel: str, message) -> int:
+        """Deliver `message` to every current subscriber of `channel`; returns how many."""
+        subscribers = self._channels.get(channel, ())
+        for subscription in subscribers:
+            subscription.deliver(message)
+        return len(subscribers)
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str):
+        subscription = Subscription()
+        self._channels.setdefault(channel, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            subscribers = self._channels.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[channel]
+
+    def stats(self) -> dict:
+        return {
+            "channels": len(self._channels),
+            "subscribers": sum(len(subscribers) for subscribers in self._channels.values()),
+        }
+
+
+def _load_broker():
+    if not PUBSUB_BROKER:
+        return InProcessBroker()
+    module, _, factory = PUBSUB_BROKER.partition(":")
+    print(f"[AI.pollo] Using pub/sub broker {PUBSUB_BROKER}")
+    return getattr(importlib.import_module(module), factory)()
+
+
+broker = _load_broker()
+# Brokers loaded from PUBSUB_BROKER are taken to be shared unless they say otherwise
+broker_is_shared = getattr(broker, "shared", True)
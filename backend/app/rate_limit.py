@@ -0,0 +1,164 @@
+import time
+import heapq
+import asyncio
+import itertools
+from dataclasses import dataclass, field
+from enum import IntEnum
+from app.cache import TTLCache
+
+
+class Priority(IntEnum):
+    """Dispatch lanes, lowest value first. Interactive calls always jump ahead of queued bulk scraping."""
+    INTERACTIVE = 0
+    BULK = 1
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, bursting up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self) -> float:
+        """Seconds until one token is available (0 if one is available now)."""
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self._refill()
+        self.tokens -= 1
+
+
+class SchedulerTimeout(Exception):
+    """A request waited longer than the scheduler's `max_wait` for admission."""
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    key: str = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class RequestScheduler:
+    """
+    Admission control for outbound API calls.
+
+    A request is dispatched once (a) a concurrency slot is free, (b) the app-wide bucket and the
+    caller's per-token bucket both hold a token, and (c) no Retry-After cooldown is in effect.
+    Waiters are served in (priority, arrival) order; a waiter whose own per-token bucket is empty
+    is skipped so one heavy user can't hold up everyone queued behind them.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        app_rate: float = 20.0,
+        app_burst: float = 40.0,
+        user_rate: float = 10.0,
+        user_burst: float = 20.0,
+        max_wait: float | None = None,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_wait = max_wait
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self._app_bucket = TokenBucket(app_rate, app_burst)
+        self._user_buckets = TTLCache(maxsize=4096, ttl=600)
+        self._active = 0
+        self._queue: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._cooldown_until = 0.0
+        self._timer: asyncio.TimerHandle | None = None
+        self.stats = {"dispatched": 0, "queued": 0, "throttled": 0, "retries": 0, "gave_up": 0, "timed_out": 0}
+
+    def _user_bucket(self, key: str) -> TokenBucket:
+        bucket = self._user_buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.user_rate, self.user_burst)
+            self._user_buckets.set(key, bucket)
+        return bucket
+
+    def cool_down(self, seconds: float):
+        """Pause all dispatching (Spotify's 429s are app-wide) until the Retry-After window passes."""
+        self._cooldown_until = max(self._cooldown_until, time.monotonic() + seconds)
+        self.stats["throttled"] += 1
+
+    def cooldown_remaining(self) -> float:
+        return max(self._cooldown_until - time.monotonic(), 0.0)
+
+    def _dispatch(self):
+        self._timer = None
+        next_wake = None
+        skipped = []
+        while self._queue and self._active < self.max_concurrency:
+            waiter = heapq.heappop(self._queue)
+            if waiter.future.done():  # cancelled while queued
+                continue
+            global_wait = max(self._cooldown_until - time.monotonic(), self._app_bucket.wait_time())
+            if global_wait > 0:
+                heapq.heappush(self._queue, waiter)
+                next_wake = global_wait
+                break
+            user_wait = self._user_bucket(waiter.key).wait_time()
+            if user_wait > 0:
+                skipped.append(waiter)
+                next_wake = user_wait if next_wake is None else min(next_wake, user_wait)
+                continue
+            self._app_bucket.consume()
+            self._user_bucket(waiter.key).consume()
+            self._active += 1
+            self.stats["dispatched"] += 1
+            waiter.future.set_result(None)
+        for waiter in skipped:
+            heapq.heappush(self._queue, waiter)
+        if self._queue and next_wake is not None:
+            self._timer = asyncio.get_running_loop().call_later(next_wake, self._dispatch)
+
+    async def acquire(self, key: str, priority: Priority = Priority.INTERACTIVE):
+        """Wait for admission; raises SchedulerTimeout after `max_wait` seconds in the queue."""
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, _Waiter(int(priority), next(self._seq), key, future))
+        self._kick()
+        if not future.done():
+            self.stats["queued"] += 1
+        try:
+            # wait_for cancels the queued future on timeout, and _dispatch skips cancelled waiters
+            await asyncio.wait_for(future, self.max_wait)
+        except asyncio.TimeoutError:
+            self.stats["timed_out"] += 1
+            raise SchedulerTimeout(f"not admitted within {self.max_wait}s") from None
+        except asyncio.CancelledError:
+            # The slot may have been granted in the same tick the caller gave up
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        self._active -= 1
+        self._kick()
+
+    def _kick(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._dispatch()
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "active": self._active,
+            "waiting": sum(1 for w in self._queue if not w.future.done()),
+            "max_concurrency": self.max_concurrency,
+            "cooldown_remaining": round(self.cooldown_remaining(), 3),
+        }
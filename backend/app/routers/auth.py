@@ -4,7 +4,6 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app import models
 import os
-import httpx
 import base64
 import secrets
 import time
@@ -12,6 +11,8 @@ import hmac
 import hashlib
 from urllib.parse import urlencode
 from dotenv import load_dotenv
+from app.spotify_client import get_spotify_client, spotify_get
+from app.identity import get_cached_identity, remember_identity
 
 load_dotenv()
 
@@ -80,19 +81,20 @@ def _verify_signed_state(state: str) -> bool:
 async def _fetch_spotify_profile(access_token: str) -> dict | None:
     """Fetch the current user's Spotify profile. Returns None on failure."""
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            resp = await client.get(
-                "https://api.spotify.com/v1/me",
-                headers={"Authorization": f"Bearer {access_token}"},
-            )
+        cached = get_cached_identity(access_token)
+        if cached:
+            data = cached["profile"]
+        else:
+            resp = await spotify_get("https://api.spotify.com/v1/me", access_token)
             resp.raise_for_status()
             data = resp.json()
-            return {
-                "id": data["id"],
-                "display_name": data.get("display_name"),
-                "email": data.get("email", ""),
-                "images": data.get("images", []),
-            }
+            remember_identity(access_token, data)
+        return {
+            "id": data["id"],
+            "display_name": data.get("display_name"),
+            "email": data.get("email", ""),
+            "images": data.get("images", []),
+        }
     except Exception:
         return None
 
@@ -149,8 +151,8 @@ async def callback(
         "Content-Type": "application/x-www-form-urlencoded",
     }
 
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        resp = await client.post(spotify_token_url, headers=headers, data=data)
+    client = get_spotify_client()
+    resp = await client.post(spotify_token_url, headers=headers, data=data)
 
     if resp.status_code != 200:
         return {"error": "Failed to exchange authorization code", "details": resp.text}
@@ -250,10 +252,10 @@ async def _do_refresh(refresh_token: str) -> str | None:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            resp = await client.post(spotify_token_url, headers=headers, data=data)
-            resp.raise_for_status()
-            return resp.json().get("access_token")
+        client = get_spotify_client()
+        resp = await client.post(spotify_token_url, headers=headers, data=data)
+        resp.raise_for_status()
+        return resp.json().get("access_token")
     except Exception:
         return None
 
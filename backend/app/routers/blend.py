@@ -1,15 +1,118 @@
-from fastapi import APIRouter, Request, Depends, HTTPException
+from fastapi import APIRouter, Request, Response, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_async_db, run_db, AsyncSessionLocal
 from app import models
-from app.routers.spotify import _get_current_user_id, _get_token_or_error, _get_group_recommendations
+from app.routers.spotify import _get_current_user_id, _get_token_or_error, _get_group_recommendations, _ranking_params
 from app.config.mood_profiles import MOOD_PROFILES
+from app.deadline import Deadline
+from app.mood_rollups import add_mood_entries
+from app.track_previews import preview_track
+from app.pubsub import broker, broker_is_shared
+from app.etags import etag_matches, not_modified, CACHE_CONTROL_REVALIDATE
+import os
 import json
+import time
 import string
 import random
 
+# Comment lines keep idle room streams from being cut by proxies. With the in-process broker each
+# one also checks the room version, since joins handled by other instances are never published here
+BLEND_EVENTS_KEEPALIVE_SECONDS = float(os.getenv("BLEND_EVENTS_KEEPALIVE_SECONDS", 15))
+# Streams end after this long so serverless invocations stay bounded; clients reconnect
+BLEND_EVENTS_MAX_SECONDS = float(os.getenv("BLEND_EVENTS_MAX_SECONDS", 240))
+
 router = APIRouter(prefix="/api/blend", tags=["blend"])
 
+
+def _room_channel(code: str) -> str:
+    return f"blend:{code}"
+
+
+def _room_etag(code: str, version: int) -> str:
+    return f'"blend-{code}-{version}"'
+
+
+def _bump_version(session: models.BlendSession):
+    # Incremented in SQL so two writers committing together can't both store the same version
+    session.version = models.BlendSession.version + 1
+
+
+def _room_state(db: Session, code: str) -> tuple[dict, str | None] | None:
+    """
+    The room as GET /{code} returns it, minus `last_generated_tracks`, plus that field's raw
+    stored JSON. None if there is no such room.
+    """
+    session = db.scalar(select(models.BlendSession).where(models.BlendSession.id == code))
+    if not session:
+        return None
+
+    # One join instead of a user lookup per participant
+    participant_users = db.scalars(
+        select(models.User).join(
+            models.BlendParticipant, models.BlendParticipant.user_id == models.User.id
+        ).where(
+            models.BlendParticipant.session_id == code
+        ).order_by(models.BlendParticipant.id)
+    )
+    users = [{
+        "id": db_user.id,
+        "display_name": db_user.display_name,
+        "image_url": db_user.image_url,
+        "is_host": db_user.id == session.host_id
+    } for db_user in participant_users]
+
+    return {
+        "id": session.id,
+        "host_id": session.host_id,
+        "is_active": session.is_active,
+        "version": session.version,
+        "created_at": session.created_at.isoformat() + "Z",
+        "participants": users,
+        "last_generated_mood": session.last_generated_mood
+    }, session.last_generated_json
+
+
+def _sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+def _state_event(state: dict, tracks_json: str | None) -> list:
+    """["state", SSE data, room version]; the version lets streams skip a state they already sent."""
+    # The stored tracks JSON is spliced in as-is instead of being decoded and re-encoded
+    body = json.dumps(state)
+    return ["state", f'{body[:-1]}, "last_generated_tracks": {tracks_json or "null"}}}', state["version"]]
+
+
+def _closed_event(reason: str) -> list:
+    return ["closed", json.dumps({"reason": reason})]
+
+
+async def _room_change(code: str, version: int) -> list | None:
+    """The event for a room that moved past `version` (reading one row when it hasn't), else None."""
+    async with AsyncSessionLocal() as db:
+        row = (await db.execute(
+            select(models.BlendSession.version, models.BlendSession.is_active).where(models.BlendSession.id == code)
+        )).first()
+        if row is None or not row.is_active:
+            return _closed_event("not_found" if row is None else "ended")
+        if row.version == version:
+            return None
+        room = await run_db(db, _room_state, code)
+    return _state_event(*room) if room else _closed_event("not_found")
+
+
+async def _publish_room(db, code: str):
+    """Push the room's state to its open event streams; nothing is queried when none are open."""
+    channel = _room_channel(code)
+    if not broker.has_subscribers(channel):
+        return
+    room = await run_db(db, _room_state, code)
+    if room:
+        await broker.publish(channel, _state_event(*room))
+
 @router.post("/create")
 async def create_blend_session(request: Request, db: Session = Depends(get_db)):
     """Creates a new blend session returning a 5-character shortcode."""
@@ -93,8 +196,10 @@ async def join_blend_session(code: str, request: Request, db: Session = Depends(
                 refresh_token=refresh_token
             )
             db.add(participant)
+            _bump_version(session)  # refreshing a member's tokens leaves the visible room unchanged
             
         db.commit()
+        await _publish_room(db, code)
         return {"message": "Joined successfully", "session_id": code}
     except HTTPException:
         db.rollback()
@@ -105,48 +210,100 @@ async def join_blend_session(code: str, request: Request, db: Session = Depends(
 
 
 @router.get("/{code}")
-async def get_blend_session(code: str, request: Request, db: Session = Depends(get_db)):
-    """Fetch the state of a Blend Session and its participants (for Waiting Room polling)."""
+async def get_blend_session(code: str, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    """
+    Fetch the state of a Blend Session and its participants (for Waiting Room polling).
+    The ETag is the room version, so an unchanged poll costs one scalar lookup and a 304.
+    """
     _get_token_or_error(request) # Ensure caller is authenticated
     code = code.upper()
     
-    session = db.query(models.BlendSession).filter(models.BlendSession.id == code).first()
-    if not session:
+    if request.headers.get("if-none-match"):
+        version = await db.scalar(select(models.BlendSession.version).where(models.BlendSession.id == code))
+        if version is not None and etag_matches(request, _room_etag(code, version)):
+            return not_modified(_room_etag(code, version))
+    
+    room = await run_db(db, _room_state, code)
+    if not room:
         raise HTTPException(status_code=404, detail="Session not found")
         
-    participants = db.query(models.BlendParticipant).filter(
-        models.BlendParticipant.session_id == code
-    ).all()
+    state, tracks_json = room
+    state["last_generated_tracks"] = json.loads(tracks_json) if tracks_json else None
+    response.headers["ETag"] = _room_etag(code, state["version"])
+    response.headers["Cache-Control"] = CACHE_CONTROL_REVALIDATE
+    return state
+
+
+@router.get("/{code}/events")
+async def stream_blend_events(code: str, request: Request):
+    """
+    Server-sent events replacing Waiting Room polling: a `state` event (same body as GET /{code})
+    on connect and again whenever someone joins, leaves or the host generates, and `closed` when
+    the room is gone or the host ends it. An idle room costs keep-alive comments, plus a version
+    lookup per keep-alive when the broker doesn't reach across instances.
+    """
+    access_token = _get_token_or_error(request)
+    await _get_current_user_id(access_token)  # 401 an expired token before the stream opens
+    code = code.upper()
+    channel = _room_channel(code)
+
+    async def events():
+        # Subscribe before reading the snapshot so a change landing in between is not missed
+        async with broker.subscribe(channel) as subscription:
+            async with AsyncSessionLocal() as db:
+                room = await run_db(db, _room_state, code)
+            if not room or not room[0]["is_active"]:
+                yield _sse(*_closed_event("not_found" if not room else "ended"))
+                return
+            version = room[0]["version"]
+            yield _sse(*_state_event(*room)[:2])
+
+            ends_at = time.monotonic() + BLEND_EVENTS_MAX_SECONDS
+            while (remaining := ends_at - time.monotonic()) > 0:
+                message = await subscription.get(min(BLEND_EVENTS_KEEPALIVE_SECONDS, remaining))
+                if message is None and not broker_is_shared:
+                    message = await _room_change(code, version)
+                if message is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                event, data = message[:2]
+                if event == "state":
+                    if message[2] <= version:
+                        continue  # already sent by a version check (or overtaken by a newer state)
+                    version = message[2]
+                yield _sse(event, data)
+                if event == "closed":
+                    return
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def _save_generated_blend(db: Session, session: models.BlendSession, user_ids: list[str], mood: str, tracks: list[dict]):
+    full_tracks_json = json.dumps(tracks)
+    previews = [preview_track(t) for t in tracks]
     
-    users = []
-    for p in participants:
-        db_user = db.query(models.User).filter(models.User.id == p.user_id).first()
-        if db_user:
-            users.append({
-                "id": db_user.id,
-                "display_name": db_user.display_name,
-                "image_url": db_user.image_url,
-                "is_host": db_user.id == session.host_id
-            })
-            
-    return {
-        "id": session.id,
-        "host_id": session.host_id,
-        "is_active": session.is_active,
-        "created_at": session.created_at.isoformat() + "Z",
-        "participants": users,
-        "last_generated_tracks": json.loads(session.last_generated_json) if session.last_generated_json else None,
-        "last_generated_mood": session.last_generated_mood
-    }
+    # Persist generated tracks into the session so joiners can receive them via polling
+    session.last_generated_json = full_tracks_json
+    session.last_generated_mood = mood
+    _bump_version(session)
+    
+    add_mood_entries(db, user_ids, mood, previews)
+        
+    # Allow room to remain active so participants can dynamically drop in/out
+    # and re-generate ad-infinitum. 
+    db.commit()
 
 @router.post("/{code}/generate")
-async def generate_blend_playlist(code: str, request: Request, db: Session = Depends(get_db)):
+async def generate_blend_playlist(code: str, request: Request, db: AsyncSession = Depends(get_async_db)):
     """Generate a group-consensus playlist. Only the host can trigger this."""
     access_token = _get_token_or_error(request)
     user_id = await _get_current_user_id(access_token, db)
     code = code.upper()
     
-    session = db.query(models.BlendSession).filter(models.BlendSession.id == code).first()
+    session = await db.scalar(select(models.BlendSession).where(models.BlendSession.id == code))
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
         
@@ -156,16 +313,22 @@ async def generate_blend_playlist(code: str, request: Request, db: Session = Dep
     try:
         body = await request.json()
         mood = body.get("mood")
-        limit = body.get("limit", 20)
+        deadline = Deadline(body.get("budget_ms"))
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid JSON body")
+
+    limit, _, _, error = _ranking_params(body)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
         
     if mood not in MOOD_PROFILES:
         raise HTTPException(status_code=400, detail="Invalid mood selected")
         
     mood_profile = MOOD_PROFILES[mood]
         
-    participants = db.query(models.BlendParticipant).filter(models.BlendParticipant.session_id == code).all()
+    participants = (await db.scalars(
+        select(models.BlendParticipant).where(models.BlendParticipant.session_id == code)
+    )).all()
     if not participants:
         raise HTTPException(status_code=400, detail="No participants found")
         
@@ -178,7 +341,7 @@ async def generate_blend_playlist(code: str, request: Request, db: Session = Dep
             tokens.append(p.access_token)
     
     try:
-        tracks = await _get_group_recommendations(tokens, mood_profile, limit, db)
+        tracks = await _get_group_recommendations(tokens, mood, mood_profile, limit, db, deadline)
     except HTTPException:
         raise
     except Exception as e:
@@ -186,29 +349,14 @@ async def generate_blend_playlist(code: str, request: Request, db: Session = Dep
         
     # If successful, inject identical historical timeline snapshots into every user's personal Heatmap log
     if tracks:
-        full_tracks_json = json.dumps(tracks)
-        track_preview = json.dumps([{"id": t["id"], "name": t["name"], "artists": [a.get("name") for a in t.get("artists", [])], "album_image": t.get("album", {}).get("images", [{}])[0].get("url") if t.get("album", {}).get("images") else None} for t in tracks])
-        
-        # Persist generated tracks into the session so joiners can receive them via polling
-        session.last_generated_json = full_tracks_json
-        session.last_generated_mood = mood
-        
-        for p in participants:
-            entry = models.MoodEntry(
-                user_id=p.user_id,
-                mood_name=mood, # e.g. 'Chill', 'Upbeat'
-                tracks_preview_json=track_preview
-            )
-            db.add(entry)
-            
-        # Allow room to remain active so participants can dynamically drop in/out
-        # and re-generate ad-infinitum. 
-        db.commit()
+        await run_db(db, _save_generated_blend, session, [p.user_id for p in participants], mood, tracks)
+        await _publish_room(db, code)
 
     return {
         "mood": mood,
         "description": mood_profile["description"],
         "tracks": tracks,
+        **deadline.report(),
     }
 
 
@@ -232,10 +380,15 @@ async def leave_blend_session(code: str, request: Request, db: Session = Depends
         raise HTTPException(status_code=400, detail="You are not part of this session")
         
     db.delete(existing)
+    _bump_version(session)
     
     # Auto-close the room if the Host bails out
     if session.host_id == user_id:
         session.is_active = False
         
     db.commit()
+    if session.is_active:
+        await _publish_room(db, code)
+    else:
+        await broker.publish(_room_channel(code), _closed_event("ended"))
     return {"message": "Left session successfully"}
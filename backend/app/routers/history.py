@@ -1,54 +1,105 @@
-from fastapi import APIRouter, Depends, Request, HTTPException
+from fastapi import APIRouter, Depends, Request, HTTPException, Query
 from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db, run_db
 from app import models
 from app.routers.spotify import _get_current_user_id, _get_token_or_error
-from datetime import datetime, timedelta
-import json
+from app.pagination import keyset_page
+from app.track_previews import load_previews
+from datetime import datetime, time, timedelta
 
 router = APIRouter(prefix="/api/history", tags=["history"])
 
-@router.get("/timeline")
-async def get_mood_timeline(request: Request, db: Session = Depends(get_db), days: int = 365):
-    access_token = _get_token_or_error(request)
-    if not access_token:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-        
-    user_id = await _get_current_user_id(access_token, db)
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Could not identify user")
 
-    start_date = datetime.utcnow() - timedelta(days=days)
-    
-    entries = db.query(models.MoodEntry).filter(
-        models.MoodEntry.user_id == user_id,
-        models.MoodEntry.timestamp >= start_date
-    ).order_by(models.MoodEntry.timestamp.desc()).all()
-    
-    # Aggregate data
-    mood_counts = {}
+def _rollup_charts(db: Session, user_id: str, start_date: datetime, tz_offset_minutes: int):
+    """
+    Mood distribution, per-day heatmap and hour-of-day histogram from the hourly rollups:
+    work scales with the hours the user was active, not with how many entries they made.
+    Buckets are shifted whole into the viewer's timezone (an offset like +05:30 moves each
+    UTC hour by its start).
+    """
+    rows = db.query(
+        models.MoodDailyRollup.date, models.MoodDailyRollup.hour,
+        models.MoodDailyRollup.mood_name, models.MoodDailyRollup.entry_count,
+    ).filter(
+        models.MoodDailyRollup.user_id == user_id,
+        models.MoodDailyRollup.date >= start_date.date(),
+    ).all()
+
+    shift = timedelta(minutes=tz_offset_minutes)
+    first_bucket = start_date.replace(minute=0, second=0, microsecond=0)
+    mood_counts, moods_by_day, hours = {}, {}, [0] * 24
+    for day, hour, mood, count in rows:
+        bucket = datetime.combine(day, time(hour))
+        if bucket < first_bucket:
+            continue
+        local = bucket + shift
+        mood_counts[mood] = mood_counts.get(mood, 0) + count
+        day_moods = moods_by_day.setdefault(local.date().isoformat(), {})
+        day_moods[mood] = day_moods.get(mood, 0) + count
+        hours[local.hour] += count
+
+    heatmap = [
+        {"date": date_str, "count": sum(moods.values()), "dominant_mood": max(moods, key=moods.get)}
+        for date_str, moods in sorted(moods_by_day.items(), reverse=True)
+    ]
+    mood_counts = dict(sorted(mood_counts.items(), key=lambda kv: kv[1], reverse=True))
+    return mood_counts, heatmap, hours
+
+
+def _timeline_page(db: Session, user_id: str, start_date: datetime, tz_offset: int, cursor: str | None, limit: int | None) -> dict:
+    mood_counts, heatmap_array, hour_counts = _rollup_charts(db, user_id, start_date, tz_offset)
+
+    entries, next_cursor = keyset_page(
+        db.query(models.MoodEntry).filter(
+            models.MoodEntry.user_id == user_id,
+            models.MoodEntry.timestamp >= start_date,
+        ),
+        models.MoodEntry.timestamp, models.MoodEntry.id, cursor, limit,
+    )
+
+    previews = load_previews(db, entries)
     timeline = []
-    heatmap_data = {}
-    
     for entry in entries:
-        mood = entry.mood_name
-        mood_counts[mood] = mood_counts.get(mood, 0) + 1
-        
-        # Format date for heatmap (YYYY-MM-DD)
-        date_str = entry.timestamp.strftime("%Y-%m-%d")
-        heatmap_data[date_str] = heatmap_data.get(date_str, 0) + 1
-        
         timeline.append({
             "id": entry.id,
-            "mood": mood,
+            "mood": entry.mood_name,
             "timestamp": entry.timestamp.isoformat() + "Z",
-            "tracks": json.loads(entry.tracks_preview_json) if entry.tracks_preview_json else []
+            "tracks": previews[entry.id]
         })
-        
-    heatmap_array = [{"date": k, "count": v} for k, v in heatmap_data.items()]
-        
+
     return {
         "mood_distribution": mood_counts,
         "recent_entries": timeline,
-        "heatmap": heatmap_array
+        "heatmap": heatmap_array,
+        "hourly": hour_counts,
+        "total_entries": sum(mood_counts.values()),
+        "next_cursor": next_cursor,
     }
+
+
+@router.get("/timeline")
+async def get_mood_timeline(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    days: int = 365,
+    limit: int | None = None,
+    cursor: str | None = None,
+    tz_offset: int = Query(0, ge=-14 * 60, le=14 * 60),
+):
+    """
+    Mood distribution, per-day heatmap and hour-of-day counts for the last `days`, read from
+    the mood rollups, plus one page of recent entries (pass back `next_cursor` as `cursor`
+    for the next page). `tz_offset` is the viewer's offset from UTC in minutes, so heatmap
+    days and hours line up with their local clock.
+    """
+    access_token = _get_token_or_error(request)
+    if not access_token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+        
+    user_id = await _get_current_user_id(access_token, db)
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Could not identify user")
+
+    start_date = datetime.utcnow() - timedelta(days=days)
+    return await run_db(db, _timeline_page, user_id, start_date, tz_offset, cursor, limit)
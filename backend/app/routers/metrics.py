@@ -0,0 +1,59 @@
+"""
+Operational counters for this instance (HTTP pool, caches, DB pool, cold start).
+
+They reveal traffic, pool sizing and schema revisions, so the routes answer 404 unless
+METRICS_ENABLED is "true". When METRICS_TOKEN is also set, requests must send it in the
+X-Metrics-Token header.
+"""
+import os
+import hmac
+from fastapi import APIRouter, Depends, HTTPException, Request
+from app.spotify_client import get_connection_stats
+from app.identity import identity_cache
+from app.candidate_pool import get_pool_stats
+from app.feedback_profile import feedback_profiles
+from app.junk_filter import junk_verdicts
+from app.db_pool import get_pool_stats as get_db_pool_stats
+from app.startup import get_startup_report
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+
+def _require_metrics_access(request: Request):
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if METRICS_TOKEN and not hmac.compare_digest(request.headers.get("x-metrics-token", ""), METRICS_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid metrics token")
+
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"], dependencies=[Depends(_require_metrics_access)])
+
+
+@router.get("/http")
+async def get_http_metrics():
+    """Per-host connection reuse counters for the shared Spotify HTTP pool."""
+    return get_connection_stats()
+
+
+@router.get("/caches")
+async def get_cache_metrics():
+    """Hit/miss counters for the in-process caches."""
+    return {
+        "identity": identity_cache.stats(),
+        "candidate_pools": get_pool_stats(),
+        "feedback_profiles": feedback_profiles.stats(),
+        "junk_verdicts": junk_verdicts.stats(),
+    }
+
+
+@router.get("/db")
+async def get_db_metrics():
+    """Database pool mode, checkout latency percentiles and connection/overflow counters."""
+    return get_db_pool_stats()
+
+
+@router.get("/startup")
+async def get_startup_metrics():
+    """This instance's cold-boot phase timings and what the schema check decided."""
+    return get_startup_report()
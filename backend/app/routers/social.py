@@ -1,33 +1,32 @@
 from fastapi import APIRouter, Depends, Request, HTTPException
 from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_async_db, run_db
 from app import models
 from app.routers.spotify import _get_current_user_id, _get_token_or_error
-import json
+from app.pagination import keyset_page
+from app.track_previews import load_previews
 
 router = APIRouter(prefix="/api/social", tags=["social"])
 
-@router.get("/feed")
-async def get_social_feed(request: Request, db: Session = Depends(get_db)):
-    access_token = _get_token_or_error(request)
-    if not access_token:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-        
-    user_id = await _get_current_user_id(access_token, db)
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Could not identify user")
-
+def _feed_page(db: Session, user_id: str, cursor: str | None, limit: int | None) -> dict:
     # Get followed users
-    following = db.query(models.Friendship).filter(models.Friendship.follower_id == user_id).all()
-    following_ids = [f.followed_id for f in following]
+    following_ids = [
+        followed_id for (followed_id,) in
+        db.query(models.Friendship.followed_id).filter(models.Friendship.follower_id == user_id)
+    ]
     
     # Optimized: Single merged query eliminating the N+1 vulnerability
-    feed_entries = db.query(models.MoodEntry, models.User).outerjoin(
-        models.User, models.MoodEntry.user_id == models.User.id
-    ).filter(
-        models.MoodEntry.user_id.in_(following_ids)
-    ).order_by(models.MoodEntry.timestamp.desc()).limit(50).all()
+    feed_entries, next_cursor = keyset_page(
+        db.query(models.MoodEntry, models.User).outerjoin(
+            models.User, models.MoodEntry.user_id == models.User.id
+        ).filter(
+            models.MoodEntry.user_id.in_(following_ids)
+        ),
+        models.MoodEntry.timestamp, models.MoodEntry.id, cursor, limit,
+    )
     
+    previews = load_previews(db, [entry for entry, _ in feed_entries])
     feed = []
     for entry, user in feed_entries:
         feed.append({
@@ -39,10 +38,23 @@ async def get_social_feed(request: Request, db: Session = Depends(get_db)):
             } if user else None,
             "mood": entry.mood_name,
             "timestamp": entry.timestamp.isoformat() + "Z",
-            "tracks": json.loads(entry.tracks_preview_json) if entry.tracks_preview_json else []
+            "tracks": previews[entry.id]
         })
         
-    return {"feed": feed}
+    return {"feed": feed, "next_cursor": next_cursor}
+
+@router.get("/feed")
+async def get_social_feed(request: Request, db: AsyncSession = Depends(get_async_db), limit: int | None = None, cursor: str | None = None):
+    """Friends' mood entries, newest first, one page at a time (pass back `next_cursor` as `cursor`)."""
+    access_token = _get_token_or_error(request)
+    if not access_token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+        
+    user_id = await _get_current_user_id(access_token, db)
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Could not identify user")
+
+    return await run_db(db, _feed_page, user_id, cursor, limit)
 
 @router.post("/follow/{target_id}")
 async def follow_user(request: Request, target_id: str, db: Session = Depends(get_db)):
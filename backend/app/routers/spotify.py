@@ -1,19 +1,42 @@
-from fastapi import APIRouter, Request, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Request, Response, Depends, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal, get_async_db, run_db
 from app import models
-from app.models import TrackFeedback
+from app.feedback_profile import get_feedback_profile, save_feedback
+from app.mood_rollups import add_mood_entry
+from app.track_previews import preview_track
 from pydantic import BaseModel
+import os
 import json
+import time
+import hashlib
 import httpx
 import asyncio
 import random
+from dataclasses import dataclass, field
+from functools import lru_cache
 from dotenv import load_dotenv
-from app.config.mood_profiles import MOOD_PROFILES, MOOD_KEYWORDS, MOOD_ASSOCIATIONS
+from app.config.mood_profiles import MOOD_PROFILES
+from app.mood_matcher import get_mood_matcher
+from app.etags import etag_matches, not_modified, CACHE_CONTROL_REVALIDATE
+from app.spotify_client import spotify_get, spotify_request
+from app.identity import get_cached_identity, remember_identity, mark_registered
+from app.deadline import Deadline
+from app.scoring import score_candidates, rank_pool
+from app.candidate_pool import CandidatePool, get_candidate_pool, stream_candidate_pool
+from app import playlist_cache
 
 load_dotenv()
 
+# Bulk mood classification limits (/api/analyze-mood/batch)
+MOOD_BATCH_MAX_TEXTS = int(os.getenv("MOOD_BATCH_MAX_TEXTS", 5000))
+MOOD_BATCH_CHUNK_SIZE = int(os.getenv("MOOD_BATCH_CHUNK_SIZE", 250))
+# Thumbs up/down events accepted per /api/recommendations/feedback/batch request
+FEEDBACK_BATCH_MAX_EVENTS = int(os.getenv("FEEDBACK_BATCH_MAX_EVENTS", 500))
+
 router = APIRouter(prefix="/api", tags=["spotify"])
 
 
@@ -21,10 +44,6 @@ router = APIRouter(prefix="/api", tags=["spotify"])
 # Helpers
 # ============================================================
 
-def _auth_header(access_token: str) -> dict:
-    return {"Authorization": f"Bearer {access_token}"}
-
-
 def _get_token_or_error(request: Request) -> str:
     # First try Authorization header
     auth_header = request.headers.get("Authorization")
@@ -37,31 +56,46 @@ def _get_token_or_error(request: Request) -> str:
         return token
     raise HTTPException(status_code=401, detail="Not authenticated")
 
-async def _get_current_user_id(access_token: str, db: Session = None) -> str:
+async def _get_current_user_profile(access_token: str) -> dict:
+    """Return the raw /v1/me payload, served from the identity cache whenever possible."""
+    cached = get_cached_identity(access_token)
+    if cached:
+        return cached["profile"]
+
+    resp = await spotify_get("https://api.spotify.com/v1/me", access_token)
+    resp.raise_for_status()
+    user_data = resp.json()
+    remember_identity(access_token, user_data)
+    return user_data
+
+
+def _register_user(db: Session, user_data: dict):
+    user_id = user_data["id"]
+    db_user = db.query(models.User).filter(models.User.id == user_id).first()
+    if not db_user:
+        image_url = user_data["images"][0]["url"] if user_data.get("images") else None
+        new_user = models.User(
+            id=user_id,
+            display_name=user_data.get("display_name"),
+            image_url=image_url
+        )
+        db.add(new_user)
+        db.commit()
+        print(f"[AI.pollo] Auto-registered new user: {user_data.get('display_name')}")
+
+
+async def _get_current_user_id(access_token: str, db: Session | AsyncSession = None) -> str:
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                "https://api.spotify.com/v1/me", headers=_auth_header(access_token)
-            )
-            resp.raise_for_status()
-            user_data = resp.json()
-            user_id = user_data["id"]
-            
-            # Auto-register user into database to prevent foreign key Null errors on History/Social data
-            if db:
-                db_user = db.query(models.User).filter(models.User.id == user_id).first()
-                if not db_user:
-                    image_url = user_data["images"][0]["url"] if user_data.get("images") else None
-                    new_user = models.User(
-                        id=user_id,
-                        display_name=user_data.get("display_name"),
-                        image_url=image_url
-                    )
-                    db.add(new_user)
-                    db.commit()
-                    print(f"[AI.pollo] Auto-registered new user: {user_data.get('display_name')}")
-            
-            return user_id
+        user_data = await _get_current_user_profile(access_token)
+        user_id = user_data["id"]
+        
+        # Auto-register user into database to prevent foreign key Null errors on History/Social data
+        # (skipped once this token's user row has already been verified)
+        if db and not (get_cached_identity(access_token) or {}).get("registered"):
+            await run_db(db, _register_user, user_data)
+            mark_registered(access_token)
+        
+        return user_id
     except httpx.HTTPStatusError as e:
         if e.response.status_code == 401:
             raise HTTPException(status_code=401, detail="Spotify token expired")
@@ -77,10 +111,9 @@ async def _fetch_top_tracks(access_token: str, time_range: str = "short_term", l
     url = "https://api.spotify.com/v1/me/top/tracks"
     params = {"time_range": time_range, "limit": limit}
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(url, headers=_auth_header(access_token), params=params)
-        resp.raise_for_status()
-        return resp.json().get("items", [])
+    resp = await spotify_get(url, access_token, params=params)
+    resp.raise_for_status()
+    return resp.json().get("items", [])
 
 
 async def _fetch_artist_genres(access_token: str, artist_ids: list[str], max_artists: int = 5) -> set[str]:
@@ -89,10 +122,9 @@ async def _fetch_artist_genres(access_token: str, artist_ids: list[str], max_art
     for artist_id in artist_ids[:max_artists]:
         url = f"https://api.spotify.com/v1/artists/{artist_id}"
         try:
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(url, headers=_auth_header(access_token))
-                resp.raise_for_status()
-                genres.update(resp.json().get("genres", []))
+            resp = await spotify_get(url, access_token)
+            resp.raise_for_status()
+            genres.update(resp.json().get("genres", []))
         except httpx.HTTPStatusError:
             continue
     return genres
@@ -103,10 +135,9 @@ async def _fetch_followed_artists(access_token: str, limit: int = 20) -> list[di
     url = "https://api.spotify.com/v1/me/following"
     params = {"type": "artist", "limit": limit}
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url, headers=_auth_header(access_token), params=params)
-            resp.raise_for_status()
-            return resp.json().get("artists", {}).get("items", [])
+        resp = await spotify_get(url, access_token, params=params)
+        resp.raise_for_status()
+        return resp.json().get("artists", {}).get("items", [])
     except Exception as e:
         print(f"[AI.pollo] Failed to fetch followed artists: {e}")
         return []
@@ -116,10 +147,9 @@ async def _fetch_related_artists(access_token: str, artist_id: str) -> list[dict
     """Fetch artists related to the given artist (Spotify's 'fans also like')."""
     url = f"https://api.spotify.com/v1/artists/{artist_id}/related-artists"
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url, headers=_auth_header(access_token))
-            resp.raise_for_status()
-            return resp.json().get("artists", [])
+        resp = await spotify_get(url, access_token)
+        resp.raise_for_status()
+        return resp.json().get("artists", [])
     except Exception as e:
         print(f"[AI.pollo] Failed to fetch related artists for {artist_id}: {e}")
         return []
@@ -132,28 +162,24 @@ async def _search_tracks_by_mood(access_token: str, mood_profile: dict, limit: i
     search_url = "https://api.spotify.com/v1/search"
     search_params = {"q": search_query, "type": "track", "limit": limit}
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(search_url, headers=_auth_header(access_token), params=search_params)
-        resp.raise_for_status()
-        return resp.json().get("tracks", {}).get("items", [])
+    resp = await spotify_get(search_url, access_token, params=search_params)
+    resp.raise_for_status()
+    return resp.json().get("tracks", {}).get("items", [])
 
 
-def _analyze_text_mood(text: str) -> tuple[str | None, float, dict[str, int]]:
+def _analyze_text_mood(text: str, quiet: bool = False) -> tuple[str | None, float, dict[str, int]]:
     """Analyze text and return (detected_mood, confidence, scores).
     
     Uses a two-tier approach:
     1. Primary: Score against MOOD_KEYWORDS (comprehensive keyword lists)
     2. Fallback: Check MOOD_ASSOCIATIONS for slang/contextual/unconventional terms
+
+    `quiet` skips the per-text logging (batch jobs would flood the logs).
     """
     text_lower = text.lower()
-    mood_scores = {mood: 0 for mood in MOOD_KEYWORDS}
 
-    # Tier 1: Primary keyword matching
-    for mood, keywords in MOOD_KEYWORDS.items():
-        for keyword in keywords:
-            if keyword in text_lower:
-                word_count = len(keyword.split())
-                mood_scores[mood] += word_count
+    # Tier 1: Primary keyword matching (every keyword hit in one pass of the compiled matcher)
+    mood_scores = get_mood_matcher().keyword_scores(text_lower)
 
     detected_mood = max(mood_scores, key=mood_scores.get)
     max_score = mood_scores[detected_mood]
@@ -164,14 +190,8 @@ def _analyze_text_mood(text: str) -> tuple[str | None, float, dict[str, int]]:
         return detected_mood, confidence, mood_scores
 
     # Tier 2: Fallback — check MOOD_ASSOCIATIONS for slang/unconventional terms
-    # Check longest phrases first to match multi-word expressions
-    sorted_associations = sorted(MOOD_ASSOCIATIONS.keys(), key=len, reverse=True)
-    association_scores: dict[str, int] = {}
-    
-    for phrase in sorted_associations:
-        if phrase in text_lower:
-            mapped_mood = MOOD_ASSOCIATIONS[phrase]
-            association_scores[mapped_mood] = association_scores.get(mapped_mood, 0) + 1
+    # (tallied longest phrase first, so multi-word expressions win ties)
+    association_scores = get_mood_matcher().association_scores(text_lower)
 
     if association_scores:
         best_mood = max(association_scores, key=association_scores.get)
@@ -179,98 +199,63 @@ def _analyze_text_mood(text: str) -> tuple[str | None, float, dict[str, int]]:
         confidence = association_scores[best_mood] / total
         # Populate mood_scores for the response
         mood_scores[best_mood] = association_scores[best_mood]
-        print(f"[AI.pollo] Mood detected via associations: '{best_mood}' from text '{text}' (confidence: {confidence:.2f})")
+        if not quiet:
+            print(f"[AI.pollo] Mood detected via associations: '{best_mood}' from text '{text}' (confidence: {confidence:.2f})")
         return best_mood, confidence, mood_scores
 
     # No match at all
-    print(f"[AI.pollo] Could not detect mood from text: '{text}'")
+    if not quiet:
+        print(f"[AI.pollo] Could not detect mood from text: '{text}'")
     return None, 0, mood_scores
 
 
-# Blocklist tokens for filtering out cover/karaoke/tribute junk from search results
-_JUNK_TOKENS = [
-    "cover", "karaoke", "tribute", "instrumental", "backing track",
-    "in the style of", "originally performed", "made famous",
-    "piano version", "music box", "lullaby version", "8-bit",
-    "8 bit", "ringtone", "midi", "acapella version",
-]
-
-def _is_junk_track(track: dict) -> bool:
-    """Return True if a track looks like a cover, karaoke, or tribute version."""
-    name = (track.get("name") or "").lower()
-    # Check track name for junk tokens
-    for token in _JUNK_TOKENS:
-        if token in name:
-            return True
-    # Check artist names for junk tokens
-    for artist in track.get("artists", []):
-        artist_name = (artist.get("name") or "").lower()
-        for token in _JUNK_TOKENS:
-            if token in artist_name:
-                return True
-    # Filter out very low-popularity tracks (often bootleg/cover accounts)
-    if track.get("popularity", 50) < 5:
-        return True
-    return False
+@dataclass
+class _TasteContext:
+    """Everything listener-specific the Curated Intersect scoring needs (Steps 0-1)."""
+    user_id: str | None = None
+    liked_tracks: set = field(default_factory=set)
+    disliked_tracks: set = field(default_factory=set)
+    liked_artists: set = field(default_factory=set)
+    disliked_artists: set = field(default_factory=set)
+    # One artist-id set per listener (a blend has one per participant)
+    taste_profiles: list[set] = field(default_factory=list)
 
 
-async def _get_personalized_recommendations(
-    access_token: str, mood_profile: dict, limit: int = 20, db: Session = None
-) -> list[dict]:
-    """Get mood-matched, personalized tracks using a Curated Intersect Algorithm.
-    
-    Since Spotify deprecated /v1/recommendations and audio-features, we scrape 
-    human-curated mood playlists and intersect them with the user's top artists
-    and explicit machine-learning feedback preferences.
-    """
-    headers = _auth_header(access_token)
-    
-    import time
-    t_start = time.time()
-
+async def _load_taste_context(access_token: str, db: Session | AsyncSession = None, deadline: Deadline | None = None) -> _TasteContext:
     # Step 0: Get User ID & fetch their explicit ML Feedback history
-    user_id = await _get_current_user_id(access_token, db)
-    liked_tracks = set()
-    disliked_tracks = set()
-    liked_artists = set()
-    disliked_artists = set()
-
-    if user_id and db:
-        feedbacks = db.query(TrackFeedback).filter(TrackFeedback.user_id == user_id).all()
-        for fb in feedbacks:
-            if fb.is_liked:
-                if fb.track_id: liked_tracks.add(fb.track_id)
-                if fb.artist_id: liked_artists.add(fb.artist_id)
-            else:
-                if fb.track_id: disliked_tracks.add(fb.track_id)
-                if fb.artist_id: disliked_artists.add(fb.artist_id)
-        print(f"[AI.pollo ML] Loaded feedback profile: {len(liked_tracks)} liked tracks, {len(disliked_tracks)} disliked.")
-
-    async with httpx.AsyncClient(headers=headers, timeout=15.0) as client:
-        # Step 1: Fetch user's top artists to build the taste profile
-        async def _get_followed():
-            try:
-                r = await client.get("https://api.spotify.com/v1/me/following", params={"type": "artist", "limit": 50})
-                if r.status_code == 200:
-                    return [a["id"] for a in r.json().get("artists", {}).get("items", []) if "id" in a]
-            except Exception as e:
-                print(f"[AI.pollo] Failed to fetch followed: {e}")
-            return []
+    ctx = _TasteContext(user_id=await _get_current_user_id(access_token, db))
 
-        async def _get_top(time_range: str):
-            try:
-                r = await client.get("https://api.spotify.com/v1/me/top/tracks", params={"time_range": time_range, "limit": 50})
-                if r.status_code == 200:
-                    artist_ids = []
-                    for t in r.json().get("items", []):
-                        for a in t.get("artists", []):
-                            if "id" in a and a["id"] not in artist_ids:
-                                artist_ids.append(a["id"])
-                    return artist_ids
-            except Exception:
-                pass
-            return []
+    if ctx.user_id and db:
+        feedback = await run_db(db, get_feedback_profile, ctx.user_id)
+        ctx.liked_tracks, ctx.disliked_tracks = feedback.liked_tracks, feedback.disliked_tracks
+        ctx.liked_artists, ctx.disliked_artists = feedback.liked_artists, feedback.disliked_artists
+        print(f"[AI.pollo ML] Loaded feedback profile: {len(ctx.liked_tracks)} liked tracks, {len(ctx.disliked_tracks)} disliked.")
+
+    # Step 1: Fetch user's top artists to build the taste profile
+    async def _get_followed():
+        try:
+            r = await spotify_get("https://api.spotify.com/v1/me/following", access_token, params={"type": "artist", "limit": 50})
+            if r.status_code == 200:
+                return [a["id"] for a in r.json().get("artists", {}).get("items", []) if "id" in a]
+        except Exception as e:
+            print(f"[AI.pollo] Failed to fetch followed: {e}")
+        return []
+
+    async def _get_top(time_range: str):
+        try:
+            r = await spotify_get("https://api.spotify.com/v1/me/top/tracks", access_token, params={"time_range": time_range, "limit": 50})
+            if r.status_code == 200:
+                artist_ids = []
+                for t in r.json().get("items", []):
+                    for a in t.get("artists", []):
+                        if "id" in a and a["id"] not in artist_ids:
+                            artist_ids.append(a["id"])
+                return artist_ids
+        except Exception:
+            pass
+        return []
 
+    async def _get_taste():
         followed_ids, top_artist_ids = await asyncio.gather(
             _get_followed(),
             _get_top("short_term")
@@ -278,169 +263,118 @@ async def _get_personalized_recommendations(
         
         if not top_artist_ids:
             top_artist_ids = await _get_top("medium_term")
-            
-        user_taste_profile = set(followed_ids + top_artist_ids)
-        print(f"[AI.pollo] Built user taste profile with {len(user_taste_profile)} unique artists.")
-
-        # Step 2: Search for human-curated playlists matching the mood
-        # Instead of just picking the first keyword [0], we combine the top 2 descriptors and genres 
-        # to ensure we capture a wide net of vibes (e.g. 'sensual dark-pop' vs just 'sensual r-n-b')
-        search_queries = []
-        for keyword in mood_profile.get("search_descriptors", [""])[:2]:
-            for genre in mood_profile.get("genres", [""])[:2]:
-                search_queries.append(f"{keyword} {genre}".strip())
-        
-        playlist_ids = []
-        try:
-            # Run multiple targeted queries to build a much larger pool of 15 overlapping playlists
-            banned_terms = mood_profile.get("banned_playlist_terms", [])
-            async def _search_spotify_playlists(q: str):
-                try:
-                    r = await client.get(
-                        "https://api.spotify.com/v1/search", 
-                        params={"q": q, "type": "playlist", "limit": 5}
-                    )
-                    r.raise_for_status()
-                    
-                    scraped_ids = []
-                    for p in r.json().get("playlists", {}).get("items", []):
-                        if not p or not p.get("id"): continue
-                        title = (p.get("name") or "").lower()
-                        if any(term in title for term in banned_terms):
-                            continue
-                        scraped_ids.append(p["id"])
-                    return scraped_ids
-                except Exception:
-                    return []
-
-            results = await asyncio.gather(*[_search_spotify_playlists(q) for q in search_queries])
-            for res in results:
-                playlist_ids.extend(res)
-                
-            # Remove any duplicates
-            playlist_ids = list(set(playlist_ids))
-        except Exception as e:
-            print(f"[AI.pollo] Playlist search failed: {e}")
+        return followed_ids, top_artist_ids
 
-        if not playlist_ids:
-            return []
-            
-        print(f"[AI.pollo] Scraping {len(playlist_ids)} playlists from queries: {search_queries}...")
+    # Out of budget: score on playlist consensus and feedback alone
+    followed_ids, top_artist_ids = await (deadline or Deadline()).run("profile", _get_taste(), ([], []))
+        
+    ctx.taste_profiles = [set(followed_ids + top_artist_ids)]
+    print(f"[AI.pollo] Built user taste profile with {len(ctx.taste_profiles[0])} unique artists.")
+    return ctx
 
-        # Step 3: Fetch tracks from all matching playlists in parallel
-        async def _get_playlist_tracks(pid: str):
-            try:
-                r = await client.get(
-                    f"https://api.spotify.com/v1/playlists/{pid}/tracks", 
-                    params={"limit": 100}
-                )
-                if r.status_code == 200:
-                    items = r.json().get("items", [])
-                    # Filter out local tracks or podcasts
-                    return [item["track"] for item in items if item.get("track") and item["track"].get("id")]
-            except Exception:
-                pass
-            return []
-            
-        playlist_track_lists = await asyncio.gather(*[_get_playlist_tracks(pid) for pid in playlist_ids])
 
-        # Step 4: Pool, score, and dedup tracks
-        track_scores: dict[str, int] = {}
-        track_dict: dict[str, dict] = {}
-        dedup_map: set[tuple[str, str]] = set()
+def _rank_candidates(
+    pool: CandidatePool, mood_profile: dict, ctx: _TasteContext, limit: int, reserve: int = 0, seed: int | None = None
+) -> tuple[list[dict], list[dict], dict[str, int]]:
+    """
+    Steps 4-5: score a candidate pool against the listeners' taste.
 
-        for track_list in playlist_track_lists:
-            for t in track_list:
-                tid = t.get("id")
-                if not tid or _is_junk_track(t):
-                    continue
-                    
-                track_name = (t.get("name") or "").lower().strip()
-                primary_artist = ""
-                artists = t.get("artists", [])
-                if artists:
-                    primary_artist = (artists[0].get("name") or "").lower().strip()
-                    
-                dedup_key = (track_name, primary_artist)
-                if dedup_key in dedup_map and tid not in track_dict:
-                    continue # Skip duplicates
-                    
-                dedup_map.add(dedup_key)
-                
-                if tid not in track_dict:
-                    track_dict[tid] = t
-                    track_scores[tid] = 0
-                    
-                    # ML Dislike Penalty: Immediately skip tracks the user explicitly disliked
-                    if tid in disliked_tracks or any(a.get("id") in disliked_artists for a in artists):
-                        continue
-                    
-                    # Core intersect logic: +100 points for a taste match
-                    if any(a.get("id") in user_taste_profile for a in artists):
-                        track_scores[tid] += 100
-                        
-                    # Explicit boost (e.g. naturally float darker/toxic pop tracks higher if mood requests it)
-                    explicit_boost = mood_profile.get("explicit_boost", 0)
-                    if explicit_boost > 0 and t.get("explicit", False):
-                        track_scores[tid] += explicit_boost
-                        
-                    # ML Bias Scoring
-                    if tid in liked_tracks:
-                        track_scores[tid] += 50
-                    if any(a.get("id") in liked_artists for a in artists):
-                        track_scores[tid] += 200
-                
-                # +1 point for every time it appears in a curated playlist (consensus sorting)
-                track_scores[tid] += 1
-
-        # Step 5: Sort by score DESC, then shuffle slightly amongst same-tier scores for variety
-        score_tiers: dict[int, list[dict]] = {}
-        for tid, score in track_scores.items():
-            if score not in score_tiers:
-                score_tiers[score] = []
-            score_tiers[score].append(track_dict[tid])
-            
-        sorted_scores = sorted(score_tiers.keys(), reverse=True)
-        final_tracks = []
-        
-        for score in sorted_scores:
-            tier_tracks = score_tiers[score]
-            random.shuffle(tier_tracks) # Shuffle within the same score group
-            final_tracks.extend(tier_tracks)
-            if len(final_tracks) >= limit * 2: # Keep enough for final shuffle
-                break
+    Returns (top `limit` tracks, the next `reserve` tracks as a replacement queue, their scores).
+    Equal scores are shuffled by `seed`, so the same seed reproduces the same ranking.
+    """
+    # Step 4: consensus, taste intersect, explicit boost and ML feedback, vectorized over the pool
+    encoded = pool.encode()
+    scores = score_candidates(
+        encoded,
+        ctx.taste_profiles,
+        ctx.liked_tracks,
+        ctx.disliked_tracks,
+        ctx.liked_artists,
+        ctx.disliked_artists,
+        mood_profile.get("explicit_boost", 0),
+    )
+
+    # Step 5: Top-k by score DESC with seeded tie-breaks (variety within a score tier) — only the
+    # tracks actually returned are ever ordered
+    if seed is None:
+        seed = random.getrandbits(32)
+    final_indices = rank_pool(encoded, scores, limit + reserve, seed)
+    track_scores = {pool.tracks[i]["id"]: int(scores[i]) for i in final_indices}
 
     # Inject historical feedback markers into the final tracks for frontend UI persistence
+    # (copies, since the pooled track dicts are shared with every other user of this mood)
+    final_tracks = [dict(pool.tracks[i]) for i in final_indices]
     for t in final_tracks:
         tid = t.get("id", "")
         artists = t.get("artists", [])
         
-        is_liked = tid in liked_tracks or any(a.get("id") in liked_artists for a in artists)
-        is_disliked = tid in disliked_tracks or any(a.get("id") in disliked_artists for a in artists)
+        is_liked = tid in ctx.liked_tracks or any(a.get("id") in ctx.liked_artists for a in artists)
+        is_disliked = tid in ctx.disliked_tracks or any(a.get("id") in ctx.disliked_artists for a in artists)
         
         if is_liked:
             t["_feedback"] = "liked"
         elif is_disliked:
             t["_feedback"] = "disliked"
 
-    # Final slice
-    result = final_tracks[:limit]
+    return final_tracks[:limit], final_tracks[limit:], track_scores
+
+
+async def _get_personalized_recommendations(
+    access_token: str,
+    mood: str,
+    mood_profile: dict,
+    limit: int = 20,
+    db: Session | AsyncSession = None,
+    deadline: Deadline | None = None,
+    reserve: int = 0,
+    seed: int | None = None,
+) -> tuple[list[dict], list[dict]]:
+    """Get mood-matched, personalized tracks using a Curated Intersect Algorithm.
+    
+    Since Spotify deprecated /v1/recommendations and audio-features, we scrape 
+    human-curated mood playlists and intersect them with the user's top artists
+    and explicit machine-learning feedback preferences.
+
+    With a `deadline`, stages that overrun the budget are cut short and the tracks are scored
+    from whatever arrived; the cut stages are recorded on the deadline.
+
+    Returns (tracks, reserve): the top `limit` tracks plus the next `reserve` best ones, which
+    the client swaps in when a track is skipped.
+    """
+    import time
+    t_start = time.time()
+
+    # Reject a bad token up front (usually a cache hit) with a 401 before kicking off the shared pool build
+    await _get_current_user_id(access_token)
+
+    # Steps 0-1 (this user's taste) and Steps 2-3 (curated playlist candidates, which depend only
+    # on the mood and come from the shared pool cache) are independent, so they run side by side
+    ctx, pool = await asyncio.gather(
+        _load_taste_context(access_token, db, deadline),
+        get_candidate_pool(mood, mood_profile, access_token, deadline),
+    )
+    if not pool.tracks:
+        return [], []
+
+    result, reserve_tracks, track_scores = _rank_candidates(pool, mood_profile, ctx, limit, reserve, seed)
     
     # Calculate how many were taste-matched for logging
     matched = len([t for t in result if track_scores.get(t["id"], 0) >= 100])
     t_total = time.time() - t_start
     print(f"[AI.pollo] Returning {len(result)} tracks ({matched} matched user taste) in {t_total:.2f}s total via Curated Intersect Algorithm")
-    return result
+    return result, reserve_tracks
 
 
 async def _get_group_recommendations(
-    access_tokens: list[str], mood_profile: dict, limit: int = 20, db: Session = None
+    access_tokens: list[str], mood: str, mood_profile: dict, limit: int = 20, db: Session | AsyncSession = None, deadline: Deadline | None = None
 ) -> list[dict]:
     """
     Collaborative version of the Curated Intersect Algorithm.
     Ingests multiple Spotify auth tokens, building a multi-user taste consensus pool.
     Heavily boosts tracks/artists that overlap between multiple users in the session.
+    Honours an optional `deadline` the same way _get_personalized_recommendations does.
     """
+    deadline = deadline or Deadline()
     import time
     t_start = time.time()
     
@@ -451,215 +385,80 @@ async def _get_group_recommendations(
     
     user_taste_profiles = [] # List of sets containing artist IDs
 
-    # Step 1: Fetch taste profiles and feedback for ALL participants concurrently
+    # Step 1: Fetch taste profiles for ALL participants concurrently
     async def _fetch_user_profile(token: str):
-        headers = _auth_header(token)
-        async with httpx.AsyncClient(headers=headers, timeout=15.0) as client:
-            user_id = None
-            try: # Get Profile
-                user_resp = await client.get("https://api.spotify.com/v1/me")
-                if user_resp.status_code == 200:
-                    user_id = user_resp.json().get("id")
-            except Exception:
-                pass
-                
-            # DB feedback
-            liked_t, disliked_t, liked_a, disliked_a = set(), set(), set(), set()
-            if user_id and db:
-                feedbacks = db.query(TrackFeedback).filter(TrackFeedback.user_id == user_id).all()
-                for fb in feedbacks:
-                    if fb.is_liked:
-                        if fb.track_id: liked_t.add(fb.track_id)
-                        if fb.artist_id: liked_a.add(fb.artist_id)
-                    else:
-                        if fb.track_id: disliked_t.add(fb.track_id)
-                        if fb.artist_id: disliked_a.add(fb.artist_id)
-            
-            # Spotify Taste
-            async def _get_followed():
-                try:
-                    r = await client.get("https://api.spotify.com/v1/me/following", params={"type": "artist", "limit": 50})
-                    if r.status_code == 200:
-                        return [a["id"] for a in r.json().get("artists", {}).get("items", []) if "id" in a]
-                except Exception: return []
-                return []
+        user_id = None
+        try: # Get Profile
+            user_id = (await _get_current_user_profile(token)).get("id")
+        except Exception:
+            pass
             
-            async def _get_top(time_range: str):
-                try:
-                    r = await client.get("https://api.spotify.com/v1/me/top/tracks", params={"time_range": time_range, "limit": 50})
-                    if r.status_code == 200:
-                        a_ids = []
-                        for t in r.json().get("items", []):
-                            for a in t.get("artists", []):
-                                if "id" in a and a["id"] not in a_ids:
-                                    a_ids.append(a["id"])
-                        return a_ids
-                except Exception: return []
-                return []
-                
-            followed, top = await asyncio.gather(_get_followed(), _get_top("short_term"))
-            if not top: top = await _get_top("medium_term")
-            
-            return {
-                "user_id": user_id,
-                "taste_set": set(followed + top),
-                "liked_t": liked_t, "disliked_t": disliked_t,
-                "liked_a": liked_a, "disliked_a": disliked_a
-            }
-
-    profiles = await asyncio.gather(*[_fetch_user_profile(t) for t in access_tokens])
-    active_user_ids = []
-    
-    for p in profiles:
-        user_taste_profiles.append(p["taste_set"])
-        all_liked_tracks.update(p["liked_t"])
-        all_disliked_tracks.update(p["disliked_t"])
-        all_liked_artists.update(p["liked_a"])
-        all_disliked_artists.update(p["disliked_a"])
-        if p.get("user_id"):
-            active_user_ids.append(p["user_id"])
-        
-    print(f"[AI.pollo Blend] Merged {len(access_tokens)} profiles into consensus pool.")
-
-    # Step 2: Search for human-curated playlists matching the mood
-    search_queries = []
-    for keyword in mood_profile.get("search_descriptors", [""])[:2]:
-        for genre in mood_profile.get("genres", [""])[:2]:
-            search_queries.append(f"{keyword} {genre}".strip())
-    
-    playlist_ids = []
-    banned_terms = mood_profile.get("banned_playlist_terms", [])
-    
-    # We use the first token to perform general Spotify queries
-    host_headers = _auth_header(access_tokens[0])
-    async with httpx.AsyncClient(headers=host_headers, timeout=15.0) as client:
-        async def _search_spotify_playlists(q: str):
+        # Spotify Taste
+        async def _get_followed():
             try:
-                r = await client.get(
-                    "https://api.spotify.com/v1/search", 
-                    params={"q": q, "type": "playlist", "limit": 5}
-                )
+                r = await spotify_get("https://api.spotify.com/v1/me/following", token, params={"type": "artist", "limit": 50})
                 if r.status_code == 200:
-                    s_ids = []
-                    for p in r.json().get("playlists", {}).get("items", []):
-                        if not p or not p.get("id"): continue
-                        title = (p.get("name") or "").lower()
-                        if any(term in title for term in banned_terms): continue
-                        s_ids.append(p["id"])
-                    return s_ids
-            except Exception: pass
+                    return [a["id"] for a in r.json().get("artists", {}).get("items", []) if "id" in a]
+            except Exception: return []
             return []
-
-        results = await asyncio.gather(*[_search_spotify_playlists(q) for q in search_queries])
-        for res in results: playlist_ids.extend(res)
-        playlist_ids = list(set(playlist_ids))
         
-        if not playlist_ids: return []
-
-        # Step 3: Fetch tracks from all matching playlists in parallel
-        async def _get_playlist_tracks(pid: str):
+        async def _get_top(time_range: str):
             try:
-                r = await client.get(
-                    f"https://api.spotify.com/v1/playlists/{pid}/tracks", 
-                    params={"limit": 100}
-                )
+                r = await spotify_get("https://api.spotify.com/v1/me/top/tracks", token, params={"time_range": time_range, "limit": 50})
                 if r.status_code == 200:
-                    items = r.json().get("items", [])
-                    return [item["track"] for item in items if item.get("track") and item["track"].get("id")]
-            except Exception: pass
+                    a_ids = []
+                    for t in r.json().get("items", []):
+                        for a in t.get("artists", []):
+                            if "id" in a and a["id"] not in a_ids:
+                                a_ids.append(a["id"])
+                    return a_ids
+            except Exception: return []
             return []
             
-        playlist_track_lists = await asyncio.gather(*[_get_playlist_tracks(pid) for pid in playlist_ids])
-
-    # Step 4: Pool, score, and dedup tracks using GROUP CONSENSUS
-    track_scores: dict[str, int] = {}
-    track_dict: dict[str, dict] = {}
-    dedup_map: set[tuple[str, str]] = set()
+        async def _get_taste():
+            followed, top = await asyncio.gather(_get_followed(), _get_top("short_term"))
+            if not top: top = await _get_top("medium_term")
+            return followed, top
 
-    for track_list in playlist_track_lists:
-        for t in track_list:
-            tid = t.get("id")
-            if not tid or _is_junk_track(t): continue
-                
-            track_name = (t.get("name") or "").lower().strip()
-            artists = t.get("artists", [])
-            primary_artist = (artists[0].get("name") or "").lower().strip() if artists else ""
-                
-            dedup_key = (track_name, primary_artist)
-            if dedup_key in dedup_map and tid not in track_dict:
-                continue
-                
-            dedup_map.add(dedup_key)
-            
-            if tid not in track_dict:
-                track_dict[tid] = t
-                track_scores[tid] = 0
-                
-                # ML Penalty: If ANY user dislikes it, we veto it
-                if tid in all_disliked_tracks or any(a.get("id") in all_disliked_artists for a in artists):
-                    continue
-                
-                # Group Consensus Scoring
-                overlap_count = 0
-                for artist in artists:
-                    a_id = artist.get("id")
-                    if not a_id: continue
-                    
-                    # Count how many users have this artist in their taste profile
-                    matches = sum(1 for profile_set in user_taste_profiles if a_id in profile_set)
-                    if matches > overlap_count:
-                        overlap_count = matches
-                
-                # Dynamic Multiplayer Multiplier:
-                # 1 match = +100
-                # 2 matches = +100 + 50
-                # 3 matches = +100 + 50 + 50
-                if overlap_count > 0:
-                    track_scores[tid] += 100 + ((overlap_count - 1) * 50)
-                    
-                # Explicit Boost
-                explicit_boost = mood_profile.get("explicit_boost", 0)
-                if explicit_boost > 0 and t.get("explicit", False):
-                    track_scores[tid] += explicit_boost
-                    
-                # ML Like Boost
-                if tid in all_liked_tracks: track_scores[tid] += 50
-                if any(a.get("id") in all_liked_artists for a in artists): track_scores[tid] += 200
-            
-            # Playlist consensus
-            track_scores[tid] += 1
-
-    # Step 5: Sort and Shuffle
-    score_tiers: dict[int, list[dict]] = {}
-    for tid, score in track_scores.items():
-        if score not in score_tiers:
-            score_tiers[score] = []
-        score_tiers[score].append(track_dict[tid])
+        followed, top = await deadline.run("profile", _get_taste(), ([], []))
         
-    sorted_scores = sorted(score_tiers.keys(), reverse=True)
-    final_tracks = []
+        return {"user_id": user_id, "taste_set": set(followed + top)}
+
+    # Step 2-3: Shared mood candidate pool (searched with the host's token on a cache miss),
+    # fetched alongside the participant profiles
+    pool, *profiles = await asyncio.gather(
+        get_candidate_pool(mood, mood_profile, access_tokens[0], deadline),
+        *[_fetch_user_profile(t) for t in access_tokens],
+    )
+    active_user_ids = []
     
-    for score in sorted_scores:
-        tier_tracks = score_tiers[score]
-        random.shuffle(tier_tracks)
-        final_tracks.extend(tier_tracks)
-        if len(final_tracks) >= limit * 2:
-            break
-
-    # Inject Historical Markers
-    for t in final_tracks:
-        tid = t.get("id", "")
-        artists = t.get("artists", [])
-        
-        is_liked = tid in all_liked_tracks or any(a.get("id") in all_liked_artists for a in artists)
-        is_disliked = tid in all_disliked_tracks or any(a.get("id") in all_disliked_artists for a in artists)
+    for p in profiles:
+        user_taste_profiles.append(p["taste_set"])
+        # DB feedback (cached per user), loaded one participant at a time: a request's session
+        # can't serve the concurrent profile fetches above
+        feedback = await run_db(db, get_feedback_profile, p["user_id"])
+        all_liked_tracks.update(feedback.liked_tracks)
+        all_disliked_tracks.update(feedback.disliked_tracks)
+        all_liked_artists.update(feedback.liked_artists)
+        all_disliked_artists.update(feedback.disliked_artists)
+        if p.get("user_id"):
+            active_user_ids.append(p["user_id"])
         
-        if is_liked:
-            t["_feedback"] = "liked"
-        elif is_disliked:
-            t["_feedback"] = "disliked"
+    print(f"[AI.pollo Blend] Merged {len(access_tokens)} profiles into consensus pool.")
 
-    result = final_tracks[:limit]
+    if not pool.tracks: return []
+
+    # Step 4-5: Score the pooled tracks using GROUP CONSENSUS. An artist shared by several
+    # participants earns +100 for the first plus +50 for every extra listener, and ANY
+    # participant's dislike vetoes a track
+    group_ctx = _TasteContext(
+        liked_tracks=all_liked_tracks,
+        disliked_tracks=all_disliked_tracks,
+        liked_artists=all_liked_artists,
+        disliked_artists=all_disliked_artists,
+        taste_profiles=user_taste_profiles,
+    )
+    result, _, _ = _rank_candidates(pool, mood_profile, group_ctx, limit)
     
     t_total = time.time() - t_start
     print(f"[AI.pollo Blend] Yielded {len(result)} consensus tracks in {t_total:.2f}s")
@@ -675,13 +474,7 @@ async def get_user_profile(request: Request):
         return {"error": "Not authenticated"}
 
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                "https://api.spotify.com/v1/me",
-                headers=_auth_header(access_token),
-            )
-            resp.raise_for_status()
-            return resp.json()
+        return await _get_current_user_profile(access_token)
     except httpx.HTTPStatusError as e:
         return {"error": "Failed to fetch profile", "details": str(e)}
 
@@ -701,10 +494,9 @@ async def get_user_top_tracks(
     params = {"time_range": time_range, "limit": limit, "offset": offset}
 
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url, headers=_auth_header(access_token), params=params)
-            resp.raise_for_status()
-            return resp.json()
+        resp = await spotify_get(url, access_token, params=params)
+        resp.raise_for_status()
+        return resp.json()
     except httpx.HTTPStatusError as e:
         return {"error": "Failed to retrieve top tracks", "details": str(e)}
 
@@ -724,10 +516,9 @@ async def get_user_top_artists(
     params = {"time_range": time_range, "limit": limit, "offset": offset}
 
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url, headers=_auth_header(access_token), params=params)
-            resp.raise_for_status()
-            return resp.json()
+        resp = await spotify_get(url, access_token, params=params)
+        resp.raise_for_status()
+        return resp.json()
     except httpx.HTTPStatusError as e:
         return {"error": "Failed to retrieve top artists", "details": str(e)}
 
@@ -745,10 +536,9 @@ async def get_artist(request: Request, artist_id: str):
     url = f"https://api.spotify.com/v1/artists/{artist_id}"
 
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url, headers=_auth_header(access_token))
-            resp.raise_for_status()
-            return resp.json()
+        resp = await spotify_get(url, access_token)
+        resp.raise_for_status()
+        return resp.json()
     except httpx.HTTPStatusError as e:
         return {"error": "Failed to retrieve artist", "details": str(e)}
 
@@ -757,14 +547,32 @@ async def get_artist(request: Request, artist_id: str):
 # Mood Endpoints
 # ============================================================
 
+@lru_cache(maxsize=1)
+def _mood_catalog() -> tuple[bytes, str]:
+    """MOOD_PROFILES encoded once, with its content hash as the ETag."""
+    body = json.dumps(MOOD_PROFILES, ensure_ascii=False, separators=(",", ":")).encode()
+    return body, f'"moods-{hashlib.sha256(body).hexdigest()[:16]}"'
+
+
 @router.get("/moods")
-async def get_moods():
-    """Return all available mood profiles."""
-    return MOOD_PROFILES
+async def get_moods(request: Request):
+    """Return all available mood profiles (304 when If-None-Match has the catalog's hash)."""
+    body, etag = _mood_catalog()
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return Response(body, media_type="application/json", headers={"ETag": etag, "Cache-Control": CACHE_CONTROL_REVALIDATE})
 
 
 @router.get("/recommendations")
-async def get_recommendations(request: Request, mood: str, limit: int = 20, db: Session = Depends(get_db)):
+async def get_recommendations(
+    request: Request,
+    mood: str,
+    limit: int = 20,
+    reserve: int = 0,
+    seed: int | None = None,
+    budget_ms: int | None = None,
+    db: AsyncSession = Depends(get_async_db),
+):
     access_token = _get_token_or_error(request)
     if not access_token:
         return {"error": "Not authenticated"}
@@ -772,10 +580,17 @@ async def get_recommendations(request: Request, mood: str, limit: int = 20, db:
     if mood not in MOOD_PROFILES:
         return {"error": f"Invalid mood. Choose from: {list(MOOD_PROFILES.keys())}"}
 
+    limit, reserve, seed, error = _ranking_params({"limit": limit, "reserve": reserve, "seed": seed})
+    if error:
+        return JSONResponse({"error": error}, status_code=400)
+
     mood_profile = MOOD_PROFILES[mood]
+    deadline = Deadline(budget_ms)
 
     try:
-        tracks = await _get_personalized_recommendations(access_token, mood_profile, limit, db)
+        tracks, reserve_tracks = await _get_personalized_recommendations(
+            access_token, mood, mood_profile, limit, db, deadline, reserve, seed
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -783,19 +598,15 @@ async def get_recommendations(request: Request, mood: str, limit: int = 20, db:
 
     user_id = await _get_current_user_id(access_token, db)
     if user_id:
-        track_preview = json.dumps([{"id": t["id"], "name": t["name"], "artists": [a.get("name") for a in t.get("artists", [])], "album_image": t.get("album", {}).get("images", [{}])[0].get("url") if t.get("album", {}).get("images") else None} for t in tracks])
-        entry = models.MoodEntry(
-            user_id=user_id,
-            mood_name=mood,
-            tracks_preview_json=track_preview
-        )
-        db.add(entry)
-        db.commit()
+        await run_db(db, _record_mood_entry, user_id, mood, tracks)
 
     return {
         "mood": mood,
         "description": mood_profile["description"],
         "tracks": tracks,
+        "reserve": reserve_tracks,
+        "seed": seed,
+        **deadline.report(),
     }
 
 
@@ -820,38 +631,37 @@ async def search_playlists(request: Request, mood: str, limit: int = 10):
     playlists = []
     
     try:
-        async with httpx.AsyncClient() as client:
-            banned_terms = mood_profile.get("banned_playlist_terms", [])
-            async def _search_spotify_playlists(q: str):
-                try:
-                    resp = await client.get(
-                        search_url, headers=_auth_header(access_token), params={"q": q, "type": "playlist", "limit": max(2, limit // len(search_queries))}
-                    )
-                    resp.raise_for_status()
+        banned_terms = mood_profile.get("banned_playlist_terms", [])
+        async def _search_spotify_playlists(q: str):
+            try:
+                resp = await spotify_get(
+                    search_url, access_token, shared=True, params={"q": q, "type": "playlist", "limit": max(2, limit // len(search_queries))}
+                )
+                resp.raise_for_status()
+                
+                scraped_lists = []
+                for p in resp.json().get("playlists", {}).get("items", []):
+                    if not p or not p.get("id"): continue
+                    title = (p.get("name") or "").lower()
+                    if any(term in title for term in banned_terms):
+                        continue
+                    scraped_lists.append(p)
+                return scraped_lists
+            except Exception:
+                return []
+
+        results = await asyncio.gather(*[_search_spotify_playlists(q) for q in search_queries])
+        
+        # Flatten and deduplicate
+        seen_ids = set()
+        for res_list in results:
+            for p in res_list:
+                if p["id"] not in seen_ids:
+                    seen_ids.add(p["id"])
+                    playlists.append(p)
                     
-                    scraped_lists = []
-                    for p in resp.json().get("playlists", {}).get("items", []):
-                        if not p or not p.get("id"): continue
-                        title = (p.get("name") or "").lower()
-                        if any(term in title for term in banned_terms):
-                            continue
-                        scraped_lists.append(p)
-                    return scraped_lists
-                except Exception:
-                    return []
-
-            results = await asyncio.gather(*[_search_spotify_playlists(q) for q in search_queries])
-            
-            # Flatten and deduplicate
-            seen_ids = set()
-            for res_list in results:
-                for p in res_list:
-                    if p["id"] not in seen_ids:
-                        seen_ids.add(p["id"])
-                        playlists.append(p)
-                        
-            # Enforce overall API limit
-            playlists = playlists[:limit]
+        # Enforce overall API limit
+        playlists = playlists[:limit]
             
     except httpx.HTTPStatusError as e:
         return {"error": "Failed to search playlists", "details": str(e)}
@@ -893,8 +703,94 @@ async def analyze_mood(request: Request):
     }
 
 
+def _resolve_requested_mood(body: dict) -> tuple[str | None, str | None]:
+    """Determine mood — either from text analysis or direct selection. Returns (mood, error)."""
+    if "text" in body:
+        text = body.get("text", "").lower()
+        detected_mood, confidence, scores = _analyze_text_mood(text)
+        if detected_mood is None:
+            return None, "Could not detect mood from text."
+        return detected_mood, None
+    elif "mood" in body:
+        mood = body.get("mood")
+        if mood not in MOOD_PROFILES:
+            return None, f"Invalid mood. Choose from: {list(MOOD_PROFILES.keys())}"
+        return mood, None
+    return None, "Provide either 'text' or 'mood' in request body"
+
+
+def _ranking_params(body: dict) -> tuple[int, int, int, str | None]:
+    """
+    Coerce limit / reserve / seed from a request body (or query parameters gathered into a dict)
+    the same way for every ranking endpoint. Returns (limit, reserve, seed, error).
+    """
+    try:
+        limit = int(body.get("limit", 20))
+        reserve = int(body.get("reserve", 0))
+        seed = body.get("seed")
+        # One seed per request keeps tier shuffles stable between refinements, so cards don't reshuffle
+        seed = random.getrandbits(32) if seed is None else int(seed)
+    except (TypeError, ValueError):
+        return 0, 0, 0, "'limit', 'reserve' and 'seed' must be integers"
+    if limit < 1 or reserve < 0:
+        return 0, 0, 0, "'limit' must be positive and 'reserve' not negative"
+    return limit, reserve, seed, None
+
+
+def _record_mood_entry(db: Session, user_id: str, mood: str, tracks: list[dict]):
+    add_mood_entry(db, user_id, mood, [preview_track(t) for t in tracks])
+    db.commit()
+
+
+def _analyze_mood_chunk(texts: list) -> list[dict]:
+    results = []
+    for text in texts:
+        if not isinstance(text, str):
+            results.append({"error": "Each text must be a string"})
+            continue
+        detected_mood, confidence, scores = _analyze_text_mood(text.lower(), quiet=True)
+        results.append({"detected_mood": detected_mood, "confidence": confidence, "scores": scores})
+    return results
+
+
+@router.post("/analyze-mood/batch")
+async def analyze_mood_batch(request: Request):
+    """
+    Classify up to MOOD_BATCH_MAX_TEXTS texts in one request: {"texts": [...]}.
+
+    Results come back in input order. Batches larger than one chunk are classified on the
+    worker threadpool, chunk by chunk, so the event loop keeps serving other requests.
+    """
+    try:
+        body = await request.json()
+        texts = body.get("texts")
+    except Exception:
+        return {"error": "Invalid request. Send JSON with a 'texts' list"}
+
+    if not isinstance(texts, list):
+        return {"error": "Invalid request. Send JSON with a 'texts' list"}
+    if len(texts) > MOOD_BATCH_MAX_TEXTS:
+        return {"error": f"Too many texts: at most {MOOD_BATCH_MAX_TEXTS} per batch"}
+
+    t_start = time.perf_counter()
+    if len(texts) <= MOOD_BATCH_CHUNK_SIZE:
+        results = _analyze_mood_chunk(texts)
+    else:
+        results = []
+        for i in range(0, len(texts), MOOD_BATCH_CHUNK_SIZE):
+            results.extend(await run_in_threadpool(_analyze_mood_chunk, texts[i:i + MOOD_BATCH_CHUNK_SIZE]))
+    elapsed = time.perf_counter() - t_start
+
+    return {
+        "count": len(results),
+        "results": results,
+        "elapsed_ms": round(elapsed * 1000, 2),
+        "items_per_second": round(len(results) / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
 @router.post("/mood-recommendations")
-async def mood_recommendations(request: Request, db: Session = Depends(get_db)):
+async def mood_recommendations(request: Request, db: AsyncSession = Depends(get_async_db)):
     access_token = _get_token_or_error(request)
     if not access_token:
         return {"error": "Not authenticated"}
@@ -904,26 +800,21 @@ async def mood_recommendations(request: Request, db: Session = Depends(get_db)):
     except Exception:
         return {"error": "Invalid JSON body"}
 
-    limit = body.get("limit", 20)
+    limit, reserve, seed, error = _ranking_params(body)
+    if error:
+        return JSONResponse({"error": error}, status_code=400)
 
-    # Determine mood — either from text analysis or direct selection
-    if "text" in body:
-        text = body.get("text", "").lower()
-        detected_mood, confidence, scores = _analyze_text_mood(text)
-        if detected_mood is None:
-            return {"error": "Could not detect mood from text."}
-        mood = detected_mood
-    elif "mood" in body:
-        mood = body.get("mood")
-        if mood not in MOOD_PROFILES:
-            return {"error": f"Invalid mood. Choose from: {list(MOOD_PROFILES.keys())}"}
-    else:
-        return {"error": "Provide either 'text' or 'mood' in request body"}
+    mood, error = _resolve_requested_mood(body)
+    if error:
+        return {"error": error}
 
     mood_profile = MOOD_PROFILES[mood]
+    deadline = Deadline(body.get("budget_ms"))
 
     try:
-        tracks = await _get_personalized_recommendations(access_token, mood_profile, limit, db)
+        tracks, reserve_tracks = await _get_personalized_recommendations(
+            access_token, mood, mood_profile, limit, db, deadline, reserve, seed
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -931,22 +822,109 @@ async def mood_recommendations(request: Request, db: Session = Depends(get_db)):
 
     user_id = await _get_current_user_id(access_token, db)
     if user_id:
-        track_preview = json.dumps([{"id": t["id"], "name": t["name"], "artists": [a.get("name") for a in t.get("artists", [])], "album_image": t.get("album", {}).get("images", [{}])[0].get("url") if t.get("album", {}).get("images") else None} for t in tracks])
-        entry = models.MoodEntry(
-            user_id=user_id,
-            mood_name=mood,
-            tracks_preview_json=track_preview
-        )
-        db.add(entry)
-        db.commit()
+        await run_db(db, _record_mood_entry, user_id, mood, tracks)
 
     return {
         "mood": mood,
         "description": mood_profile["description"],
         "tracks": tracks,
+        "reserve": reserve_tracks,
+        "seed": seed,
+        **deadline.report(),
     }
 
 
+@router.post("/mood-recommendations/stream")
+async def mood_recommendations_stream(request: Request):
+    """
+    Streaming variant of /mood-recommendations as NDJSON (one JSON object per line).
+
+    Emits `provisional` rankings while the mood's curated playlists are still arriving
+    (only when the top tracks actually change), then a single `final` ranking. Errors after
+    the stream has started arrive as an `error` line.
+    """
+    access_token = _get_token_or_error(request)
+    if not access_token:
+        return JSONResponse({"error": "Not authenticated"}, status_code=401)
+
+    try:
+        body = await request.json()
+    except Exception:
+        return JSONResponse({"error": "Invalid JSON body"}, status_code=400)
+
+    limit, reserve, seed, error = _ranking_params(body)
+    if error:
+        return JSONResponse({"error": error}, status_code=400)
+    mood, error = _resolve_requested_mood(body)
+    if error:
+        return JSONResponse({"error": error}, status_code=400)
+    mood_profile = MOOD_PROFILES[mood]
+
+    # Verify the token before committing to a 200 stream
+    await _get_current_user_id(access_token)
+
+    async def _events():
+        # The stream outlives the request's dependencies, so it manages its own session
+        db = AsyncSessionLocal()
+        # The taste profile (/me, follows, top tracks) loads while the pool streams in; nothing is
+        # ranked until it lands, then every pool update is ranked as it arrives
+        ctx_task = asyncio.create_task(_load_taste_context(access_token, db))
+        updates = aiter(stream_candidate_pool(mood, mood_profile, access_token))
+        next_update = asyncio.ensure_future(anext(updates))
+        try:
+            last_ids = None
+            tracks = []
+            pool, final, ranked = None, False, True
+            while True:
+                waiting = {t for t in (next_update, ctx_task) if t is not None and not t.done()}
+                if waiting:
+                    await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                if next_update is not None and next_update.done():
+                    try:
+                        pool, final = next_update.result()
+                    except StopAsyncIteration:
+                        final = True
+                    next_update = None if final else asyncio.ensure_future(anext(updates))
+                    ranked = False
+                if ranked or not ctx_task.done() or pool is None:
+                    if final and ctx_task.done():
+                        break
+                    continue
+                ctx = ctx_task.result()
+                ranked = True
+
+                tracks, reserve_tracks, _ = _rank_candidates(pool, mood_profile, ctx, limit, reserve, seed)
+                ids = [t["id"] for t in tracks]
+                if final or (tracks and ids != last_ids):
+                    last_ids = ids
+                    yield json.dumps({
+                        "type": "final" if final else "provisional",
+                        "mood": mood,
+                        "description": mood_profile["description"],
+                        "playlists_scored": len(pool.playlist_ids),
+                        "tracks": tracks,
+                        "reserve": reserve_tracks,
+                        "seed": seed,
+                    }) + "\n"
+                if final:
+                    break
+
+            if ctx_task.result().user_id:
+                await run_db(db, _record_mood_entry, ctx_task.result().user_id, mood, tracks)
+        except Exception as e:
+            print(f"[AI.pollo] Streaming recommendations failed: {e}")
+            yield json.dumps({"type": "error", "detail": f"Failed to get recommendations: {str(e)}"}) + "\n"
+        finally:
+            pending = [t for t in (next_update, ctx_task) if t is not None and not t.done()]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            await updates.aclose()
+            await db.close()
+
+    return StreamingResponse(_events(), media_type="application/x-ndjson")
+
+
 
 @router.post("/playlists/create")
 async def create_playlist(request: Request):
@@ -970,46 +948,38 @@ async def create_playlist(request: Request):
     if not track_uris:
         return {"error": "At least one track URI is required"}
 
-    headers = _auth_header(access_token)
-    headers["Content-Type"] = "application/json"
-
     # Step 1: Get user ID
     try:
-        async with httpx.AsyncClient() as client:
-            user_resp = await client.get(
-                "https://api.spotify.com/v1/me", headers=headers
-            )
-            user_resp.raise_for_status()
-            user_id = user_resp.json()["id"]
+        user_id = (await _get_current_user_profile(access_token))["id"]
     except httpx.HTTPStatusError as e:
         return {"error": "Failed to get user profile", "details": str(e)}
 
     # Step 2: Create playlist
     try:
-        async with httpx.AsyncClient() as client:
-            create_resp = await client.post(
-                f"https://api.spotify.com/v1/users/{user_id}/playlists",
-                headers=headers,
-                json={
-                    "name": name,
-                    "description": description,
-                    "public": is_public,
-                },
-            )
-            create_resp.raise_for_status()
-            playlist = create_resp.json()
+        create_resp = await spotify_request(
+            "POST",
+            f"https://api.spotify.com/v1/users/{user_id}/playlists",
+            access_token,
+            json={
+                "name": name,
+                "description": description,
+                "public": is_public,
+            },
+        )
+        create_resp.raise_for_status()
+        playlist = create_resp.json()
     except httpx.HTTPStatusError as e:
         return {"error": "Failed to create playlist", "details": str(e)}
 
     # Step 3: Add tracks
     try:
-        async with httpx.AsyncClient() as client:
-            add_resp = await client.post(
-                f"https://api.spotify.com/v1/playlists/{playlist['id']}/tracks",
-                headers=headers,
-                json={"uris": track_uris},
-            )
-            add_resp.raise_for_status()
+        add_resp = await spotify_request(
+            "POST",
+            f"https://api.spotify.com/v1/playlists/{playlist['id']}/tracks",
+            access_token,
+            json={"uris": track_uris},
+        )
+        add_resp.raise_for_status()
     except httpx.HTTPStatusError as e:
         return {"error": "Playlist created but failed to add tracks", "details": str(e)}
 
@@ -1023,25 +993,18 @@ async def create_playlist(request: Request):
 
 # Dynamic path-param route must come AFTER static /playlists/search and /playlists/create
 @router.get("/playlists/{playlist_id}/tracks")
-async def get_playlist_tracks(request: Request, playlist_id: str, limit: int = 50):
-    """Fetch tracks from a specific Spotify playlist."""
+async def get_playlist_tracks(request: Request, playlist_id: str, limit: int = 50, db: AsyncSession = Depends(get_async_db)):
+    """Fetch tracks from a specific Spotify playlist (served from the snapshot cache when unchanged)."""
     access_token = _get_token_or_error(request)
     if not access_token:
         return JSONResponse({"error": "Not authenticated"}, status_code=401)
 
-    url = f"https://api.spotify.com/v1/playlists/{playlist_id}/tracks"
-    params = {"limit": min(limit, 100), "fields": "items(track(id,name,uri,preview_url,duration_ms,artists(id,name,external_urls),album(id,name,images,release_date),external_urls)),total"}
-
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url, headers=_auth_header(access_token), params=params)
-            resp.raise_for_status()
-            data = resp.json()
+        tracks, total = await playlist_cache.get_playlist_tracks(access_token, playlist_id, db=db)
     except httpx.HTTPStatusError as e:
         return JSONResponse({"error": "Failed to fetch playlist tracks", "details": str(e)}, status_code=500)
 
-    tracks = [item["track"] for item in data.get("items", []) if item.get("track")]
-    return {"tracks": tracks, "total": data.get("total", len(tracks))}
+    return {"tracks": tracks[:min(limit, 100)], "total": total}
 
 class TrackFeedbackRequest(BaseModel):
     track_id: str
@@ -1052,7 +1015,7 @@ class TrackFeedbackRequest(BaseModel):
 async def submit_track_feedback(
     request: Request, 
     feedback: TrackFeedbackRequest, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Save explicit user preferences (Thumbs Up/Down) to bias future algorithm recommendations."""
     access_token = _get_token_or_error(request)
@@ -1064,22 +1027,33 @@ async def submit_track_feedback(
         return {"error": "Could not determine user ID"}
 
     # Update or insert feedback
-    existing_feedback = db.query(TrackFeedback).filter(
-        TrackFeedback.user_id == user_id,
-        TrackFeedback.track_id == feedback.track_id
-    ).first()
+    await run_db(db, save_feedback, user_id, [(feedback.track_id, feedback.artist_id, feedback.is_liked)])
+    return {"message": "Feedback saved successfully", "is_liked": feedback.is_liked}
 
-    if existing_feedback:
-        existing_feedback.is_liked = feedback.is_liked
-    else:
-        new_feedback = TrackFeedback(
-            user_id=user_id,
-            track_id=feedback.track_id,
-            artist_id=feedback.artist_id,
-            is_liked=feedback.is_liked
-        )
-        db.add(new_feedback)
 
-    db.commit()
-    return {"message": "Feedback saved successfully", "is_liked": feedback.is_liked}
+class TrackFeedbackBatchRequest(BaseModel):
+    events: list[TrackFeedbackRequest]
+
+@router.post("/recommendations/feedback/batch")
+async def submit_track_feedback_batch(
+    request: Request,
+    batch: TrackFeedbackBatchRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Save many thumbs up/down events at once (e.g. queued client-side while swiping).
+    Events are applied in order, so a later event for the same track wins.
+    """
+    access_token = _get_token_or_error(request)
+    if not access_token:
+        return {"error": "Not authenticated"}
+    if len(batch.events) > FEEDBACK_BATCH_MAX_EVENTS:
+        return {"error": f"Too many events: at most {FEEDBACK_BATCH_MAX_EVENTS} per batch"}
+
+    user_id = await _get_current_user_id(access_token, db)
+    if not user_id:
+        return {"error": "Could not determine user ID"}
+
+    applied = await run_db(db, save_feedback, user_id, [(e.track_id, e.artist_id, e.is_liked) for e in batch.events])
+    return {"message": "Feedback saved successfully", "received": len(batch.events), "saved": len(applied)}
 
@@ -1,16 +1,36 @@
 import asyncio
 import logging
 from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
 from app.database import SessionLocal
-from app.models import MoodEntry
+from app.models import MoodEntry, MoodEntryTrack, Track, PlaylistTrackCache
+from app.mood_rollups import MOOD_ROLLUPS_FOLLOW_RETENTION, purge_rollups_before
 
 logger = logging.getLogger(__name__)
 
 # Configurable generic TTL policy, safely defaulting to 365 Days to support the Heatmap UI
 RETENTION_PERIOD_DAYS = 365
+# Cached playlist snapshots that haven't been refetched in this long are dropped (they refill on demand)
+PLAYLIST_CACHE_RETENTION_DAYS = 30
 # Run the purge loop every 12 hours (43200 seconds)
 PURGE_INTERVAL_SECONDS = 43200 
 
+def purge_orphan_tracks(db):
+    """
+    Delete every track no mood entry references, in a transaction of its own. A save linking
+    one of them concurrently holds its row lock (see track_previews._store_tracks) until it
+    commits, after which the foreign key refuses the delete: the sweep backs off and the
+    remaining orphans go next cycle.
+    """
+    try:
+        still_linked = db.query(MoodEntryTrack.track_id)
+        db.query(Track).filter(Track.id.not_in(still_linked.scalar_subquery())).delete(synchronize_session=False)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        logger.info("[RETENTION POLICY] A track was relinked mid-sweep; orphan cleanup deferred to the next cycle.")
+
+
 async def retention_cleanup_loop():
     """
     Infinite asynchronous background loop that deletes MoodEntry rows older than the retention policy limit.
@@ -23,9 +43,18 @@ async def retention_cleanup_loop():
             db = SessionLocal()
             cutoff_date = datetime.utcnow() - timedelta(days=RETENTION_PERIOD_DAYS)
             
-            # Execute mass-deletion on strictly expired mood entries
+            # Execute mass-deletion on strictly expired mood entries. Bulk deletes skip ORM cascades
+            # (and SQLite doesn't enforce ON DELETE CASCADE), so their track links go first
+            expired_ids = db.query(MoodEntry.id).filter(MoodEntry.timestamp < cutoff_date)
+            db.query(MoodEntryTrack).filter(MoodEntryTrack.entry_id.in_(expired_ids.scalar_subquery())).delete(synchronize_session=False)
             deleted_count = db.query(MoodEntry).filter(MoodEntry.timestamp < cutoff_date).delete(synchronize_session=False)
+            # Rollups outlive their raw entries unless configured to expire with them
+            if MOOD_ROLLUPS_FOLLOW_RETENTION:
+                purge_rollups_before(db, cutoff_date.date())
+            playlist_cutoff = datetime.utcnow() - timedelta(days=PLAYLIST_CACHE_RETENTION_DAYS)
+            db.query(PlaylistTrackCache).filter(PlaylistTrackCache.fetched_at < playlist_cutoff).delete(synchronize_session=False)
             db.commit()
+            purge_orphan_tracks(db)
             
             if deleted_count > 0:
                 logger.info(f"[RETENTION POLICY] Purged {deleted_count} stale rows migrating beyond the {RETENTION_PERIOD_DAYS} day TTL.")
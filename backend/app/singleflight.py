@@ -0,0 +1,39 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls that share a key into one in-flight execution.
+
+    The first caller (the leader) runs `fn`; everyone arriving before it finishes awaits the
+    same future. Nothing is cached afterwards: once the call settles the key is free again.
+    """
+
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self.stats = {"leaders": 0, "shared": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """Run (or join) the call for `key`. Returns (result, was_leader)."""
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["shared"] += 1
+            # Shielded so one follower being cancelled doesn't cancel the call for the rest
+            return await asyncio.shield(future), False
+
+        self.stats["leaders"] += 1
+        future = asyncio.ensure_future(fn())
+        self._inflight[key] = future
+
+        def _settle(done: asyncio.Future):
+            if self._inflight.get(key) is done:
+                del self._inflight[key]
+            if not done.cancelled():
+                done.exception()  # Mark retrieved so unobserved failures don't log warnings
+
+        future.add_done_callback(_settle)
+        return await asyncio.shield(future), True
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "in_flight": len(self._inflight)}
@@ -0,0 +1,226 @@
+import os
+import math
+import random
+import asyncio
+import importlib.util
+import httpx
+from collections import defaultdict
+from dotenv import load_dotenv
+from app.cache import hash_token
+from app.identity import forget_identity
+from app.rate_limit import Priority, RequestScheduler, SchedulerTimeout
+from app.singleflight import SingleFlight
+
+load_dotenv()
+
+# Pool sizing for the process-wide Spotify client (overridable per deployment)
+SPOTIFY_HTTP_MAX_CONNECTIONS = int(os.getenv("SPOTIFY_HTTP_MAX_CONNECTIONS", 100))
+SPOTIFY_HTTP_MAX_KEEPALIVE = int(os.getenv("SPOTIFY_HTTP_MAX_KEEPALIVE", 20))
+SPOTIFY_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("SPOTIFY_HTTP_KEEPALIVE_EXPIRY", 30.0))
+SPOTIFY_HTTP_TIMEOUT = float(os.getenv("SPOTIFY_HTTP_TIMEOUT", 15.0))
+
+# HTTP/2 multiplexes the playlist fan-out over a single TLS connection, but needs the optional `h2` package
+SPOTIFY_HTTP2 = os.getenv("SPOTIFY_HTTP2", "true").lower() == "true" and importlib.util.find_spec("h2") is not None
+
+# Outbound request scheduling (token buckets are per second; Spotify enforces a rolling 30s window)
+SPOTIFY_MAX_CONCURRENCY = int(os.getenv("SPOTIFY_MAX_CONCURRENCY", 16))
+SPOTIFY_APP_RATE = float(os.getenv("SPOTIFY_APP_RATE", 20))
+SPOTIFY_APP_BURST = float(os.getenv("SPOTIFY_APP_BURST", 40))
+SPOTIFY_USER_RATE = float(os.getenv("SPOTIFY_USER_RATE", 10))
+SPOTIFY_USER_BURST = float(os.getenv("SPOTIFY_USER_BURST", 25))
+SPOTIFY_MAX_RETRIES = int(os.getenv("SPOTIFY_MAX_RETRIES", 3))
+# A Retry-After longer than this is surfaced to the caller instead of parking the request
+SPOTIFY_MAX_RETRY_AFTER = float(os.getenv("SPOTIFY_MAX_RETRY_AFTER", 10))
+# Longest a request waits for admission before it is answered with a local 429
+SPOTIFY_MAX_QUEUE_WAIT = float(os.getenv("SPOTIFY_MAX_QUEUE_WAIT", 20))
+
+_client: httpx.AsyncClient | None = None
+
+scheduler = RequestScheduler(
+    max_concurrency=SPOTIFY_MAX_CONCURRENCY,
+    app_rate=SPOTIFY_APP_RATE,
+    app_burst=SPOTIFY_APP_BURST,
+    user_rate=SPOTIFY_USER_RATE,
+    user_burst=SPOTIFY_USER_BURST,
+    max_wait=SPOTIFY_MAX_QUEUE_WAIT,
+)
+single_flight = SingleFlight()
+
+# Per-host connection reuse counters: every request vs. every fresh TCP/TLS handshake
+_connection_stats: dict[str, dict[str, int]] = defaultdict(lambda: {"requests": 0, "new_connections": 0, "tls_handshakes": 0})
+
+
+def _make_tracer(host: str):
+    """Build an httpcore trace hook that counts handshakes for a single host."""
+    async def _trace(event_name: str, info: dict):
+        if event_name == "connection.connect_tcp.complete":
+            _connection_stats[host]["new_connections"] += 1
+        elif event_name == "connection.start_tls.complete":
+            _connection_stats[host]["tls_handshakes"] += 1
+    return _trace
+
+
+async def _on_request(request: httpx.Request):
+    host = request.url.host
+    _connection_stats[host]["requests"] += 1
+    request.extensions["trace"] = _make_tracer(host)
+
+
+async def _on_response(response: httpx.Response):
+    # A rejected bearer token must never keep resolving to a cached identity
+    if response.status_code == 401:
+        auth = response.request.headers.get("Authorization", "")
+        if auth.startswith("Bearer "):
+            forget_identity(auth.split(" ", 1)[1])
+
+
+def _build_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=SPOTIFY_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=SPOTIFY_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=SPOTIFY_HTTP_KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncClient(
+        http2=SPOTIFY_HTTP2,
+        limits=limits,
+        timeout=SPOTIFY_HTTP_TIMEOUT,
+        event_hooks={"request": [_on_request], "response": [_on_response]},
+    )
+
+
+def get_spotify_client() -> httpx.AsyncClient:
+    """Return the shared keep-alive client.
+
+    Normally opened by the FastAPI lifespan hook, but created lazily as well so
+    serverless invocations that skip lifespan events still reuse one pool per process.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+async def open_spotify_client():
+    get_spotify_client()
+    print(f"[AI.pollo] Spotify HTTP pool ready (http2={SPOTIFY_HTTP2}, max_connections={SPOTIFY_HTTP_MAX_CONNECTIONS}).")
+
+
+async def close_spotify_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    try:
+        retry_after = float(response.headers.get("Retry-After", ""))
+    except ValueError:
+        retry_after = 0.5 * (2 ** attempt)  # No hint given: exponential backoff
+    # Jitter so every request parked on the same 429 doesn't stampede back at once
+    return retry_after + random.uniform(0, 0.25 * retry_after + 0.1)
+
+
+async def _send(method: str, url: str, access_token: str | None, key: str, priority: Priority, **kwargs) -> httpx.Response:
+    """Scheduled send with 429 Retry-After handling."""
+    client = get_spotify_client()
+    headers = dict(kwargs.pop("headers", None) or {})
+    if access_token:
+        headers["Authorization"] = f"Bearer {access_token}"
+
+    for attempt in range(SPOTIFY_MAX_RETRIES + 1):
+        try:
+            await scheduler.acquire(key, priority)
+        except SchedulerTimeout:
+            # Answer like Spotify would so callers' existing 429 handling applies
+            print(f"[AI.pollo] Spotify request to {url} not admitted within {scheduler.max_wait}s; answering 429.")
+            retry_after = max(1, math.ceil(scheduler.cooldown_remaining()))
+            return httpx.Response(429, headers={"Retry-After": str(retry_after)}, request=httpx.Request(method, url))
+        try:
+            response = await client.request(method, url, headers=headers, **kwargs)
+        finally:
+            scheduler.release()
+
+        if response.status_code != 429:
+            return response
+
+        delay = _retry_delay(response, attempt)
+        # The pause is app-wide, so a long Retry-After we are about to give up on must not freeze
+        # every other call for its full length
+        scheduler.cool_down(min(delay, SPOTIFY_MAX_RETRY_AFTER))
+        if attempt == SPOTIFY_MAX_RETRIES or delay > SPOTIFY_MAX_RETRY_AFTER:
+            scheduler.stats["gave_up"] += 1
+            print(f"[AI.pollo] Spotify rate limit hit on {url}; giving up after {attempt + 1} attempt(s).")
+            return response
+        scheduler.stats["retries"] += 1
+        await asyncio.sleep(delay)
+    return response
+
+
+def _flight_key(method: str, url: str, params: dict | None, scope: str) -> tuple:
+    normalized = tuple(sorted((k, str(v)) for k, v in (params or {}).items()))
+    return (method, url, normalized, scope)
+
+
+async def spotify_request(
+    method: str,
+    url: str,
+    access_token: str | None,
+    priority: Priority = Priority.INTERACTIVE,
+    shared: bool = False,
+    **kwargs,
+) -> httpx.Response:
+    """
+    Send a Spotify Web API request through the shared pool and the request scheduler.
+
+    Requests are admitted per app and per token, capped in concurrency and dispatched by
+    priority lane. 429 responses are retried after their Retry-After (plus jitter) up to
+    SPOTIFY_MAX_RETRIES times; the final 429 is returned so callers can still react to it.
+
+    Identical concurrent GETs are coalesced into one in-flight request. By default the
+    coalescing scope is the caller's token; `shared=True` marks user-agnostic reads
+    (playlist search, playlist contents) that may be answered with any user's token.
+    """
+    key = hash_token(access_token) if access_token else "app"
+    if method != "GET":
+        return await _send(method, url, access_token, key, priority, **kwargs)
+
+    scope = "app" if shared else key
+    flight_key = _flight_key(method, url, kwargs.get("params"), scope)
+    response, leader = await single_flight.do(
+        flight_key, lambda: _send(method, url, access_token, key, priority, **kwargs)
+    )
+    if response.status_code == 401 and not leader:
+        # Another user's token led the shared call and was rejected; don't inherit their failure
+        response = await _send(method, url, access_token, key, priority, **kwargs)
+    return response
+
+
+async def spotify_get(
+    url: str, access_token: str | None, priority: Priority = Priority.INTERACTIVE, shared: bool = False, **kwargs
+) -> httpx.Response:
+    return await spotify_request("GET", url, access_token, priority, shared, **kwargs)
+
+
+def get_connection_stats() -> dict:
+    """Snapshot of per-host reuse metrics. A reuse ratio close to 1.0 means handshakes are amortised."""
+    hosts = {}
+    for host, stats in _connection_stats.items():
+        requests = stats["requests"]
+        reused = max(requests - stats["new_connections"], 0)
+        hosts[host] = {
+            **stats,
+            "reused_connections": reused,
+            "reuse_ratio": round(reused / requests, 4) if requests else 0.0,
+        }
+    return {
+        "http2": SPOTIFY_HTTP2,
+        "limits": {
+            "max_connections": SPOTIFY_HTTP_MAX_CONNECTIONS,
+            "max_keepalive_connections": SPOTIFY_HTTP_MAX_KEEPALIVE,
+            "keepalive_expiry": SPOTIFY_HTTP_KEEPALIVE_EXPIRY,
+        },
+        "hosts": hosts,
+        "scheduler": scheduler.snapshot(),
+        "single_flight": single_flight.snapshot(),
+    }
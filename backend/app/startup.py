@@ -0,0 +1,140 @@
+"""
+Cold-boot work done when app.main is imported, timed phase by phase.
+
+SCHEMA_STARTUP_MODE decides what happens to the database schema before the first request:
+- "check" (default): read alembic_version and compare it with the head revision of
+  alembic/versions, found by scanning the migration files rather than importing Alembic. Only a
+  database that is behind gets the Alembic upgrade and column patches.
+- "upgrade": always run the upgrade and column patches (the behaviour before this mode existed).
+- "skip": trust build.sh's `alembic upgrade head` and do not touch the database.
+
+`get_startup_report()` backs /api/metrics/startup.
+"""
+import os
+import re
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from sqlalchemy import text
+from app.database import engine, Base
+from app import models  # noqa: F401  (registers the tables for the create_all fallback)
+
+SCHEMA_STARTUP_MODE = os.getenv("SCHEMA_STARTUP_MODE", "check").lower()
+
+BACKEND_DIR = Path(__file__).parent.parent
+VERSIONS_DIR = BACKEND_DIR / "alembic" / "versions"
+_REVISION_LINE = re.compile(r"^(down_)?revision\b[^=]*=(.*)$", re.MULTILINE)
+_REVISION_ID = re.compile(r"['\"](\w+)['\"]")
+
+# Second fallback: add any missing COLUMNS to existing tables
+# create_all() only creates new tables; it can't ALTER existing ones
+# This list should be maintained as new columns are added to models
+_COLUMN_PATCHES = [
+    ("blend_sessions", "last_generated_json", "TEXT"),
+    ("blend_sessions", "last_generated_mood", "VARCHAR"),
+]
+
+_phases: dict[str, float] = {}
+_schema: dict = {"mode": SCHEMA_STARTUP_MODE}
+
+
+def record_phase(name: str, seconds: float):
+    _phases[name] = round(seconds * 1000, 1)
+
+
+@contextmanager
+def timed_phase(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, time.perf_counter() - start)
+
+
+def migration_revisions() -> tuple[set[str], set[str]]:
+    """(every revision, the heads no other migration builds on) in alembic/versions."""
+    revisions, parents = set(), set()
+    for path in VERSIONS_DIR.glob("*.py"):
+        for down, value in _REVISION_LINE.findall(path.read_text()):
+            (parents if down else revisions).update(_REVISION_ID.findall(value))
+    return revisions, revisions - parents
+
+
+def current_revisions() -> set[str]:
+    """Revisions stamped in alembic_version; empty for a database Alembic has never touched."""
+    try:
+        with engine.connect() as conn:
+            return {row[0] for row in conn.execute(text("SELECT version_num FROM alembic_version"))}
+    except Exception:
+        return set()
+
+
+def run_alembic_upgrade():
+    # Programmatically run Alembic migrations on startup instead of Base.metadata.create_all
+    # This ensures the `alembic_version` table is properly tracked in Vercel's PostgreSQL
+    from alembic.config import Config
+    from alembic import command
+
+    try:
+        alembic_cfg = Config(str(BACKEND_DIR / "alembic.ini"))
+        command.upgrade(alembic_cfg, "head")
+        print("[AI.pollo] Successfully ran Alembic migrations on cold boot.")
+    except Exception as e:
+        print(f"[AI.pollo] Failed to run Alembic migrations: {e}")
+        # Fallback: create any missing tables directly from models
+        # This is additive and safe — it won't modify or destroy existing tables
+        print("[AI.pollo] Running fallback Base.metadata.create_all()...")
+        Base.metadata.create_all(bind=engine)
+        print("[AI.pollo] Fallback table creation complete.")
+
+
+def apply_column_patches():
+    try:
+        with engine.connect() as conn:
+            for table, column, col_type in _COLUMN_PATCHES:
+                try:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {col_type}"))
+                except Exception:
+                    pass  # Column already exists or table doesn't exist yet
+            conn.commit()
+        print(f"[AI.pollo] Column patches verified ({len(_COLUMN_PATCHES)} checked).")
+    except Exception as e:
+        print(f"[AI.pollo] Column patch check skipped: {e}")
+
+
+def prepare_schema():
+    """Bring the schema up to date as SCHEMA_STARTUP_MODE says, recording each phase."""
+    if SCHEMA_STARTUP_MODE == "skip":
+        _schema["action"] = "skipped"
+        return
+
+    if SCHEMA_STARTUP_MODE != "upgrade":
+        with timed_phase("schema_check"):
+            known, heads = migration_revisions()
+            current = current_revisions()
+        _schema.update(head=sorted(heads), current=sorted(current))
+        if heads and current == heads:
+            _schema["action"] = "current"
+            return
+        if current - known:
+            # Stamped with a revision this build doesn't know: the database is ahead of the code
+            print(f"[AI.pollo] Database schema {sorted(current)} is not in this build's migrations; leaving it alone.")
+            _schema["action"] = "unknown_revision"
+            return
+
+    with timed_phase("alembic_upgrade"):
+        run_alembic_upgrade()
+    with timed_phase("column_patches"):
+        apply_column_patches()
+    _schema["action"] = "upgraded"
+
+
+def report_cold_start():
+    total = sum(_phases.values())
+    breakdown = ", ".join(f"{name} {ms:.0f}ms" for name, ms in _phases.items())
+    print(f"[AI.pollo] Cold start {total:.0f}ms ({breakdown}); schema {_schema.get('action')}")
+
+
+def get_startup_report() -> dict:
+    """Per-phase cold-boot timings (ms) and what the schema step did."""
+    return {"phases_ms": dict(_phases), "total_ms": round(sum(_phases.values()), 1), "schema": dict(_schema)}
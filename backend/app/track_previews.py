@@ -0,0 +1,81 @@
+import json
+from sqlalchemy.orm import Session
+from app.database import upsert_insert
+from app.models import MoodEntry, MoodEntryTrack, Track
+
+
+def preview_track(track: dict) -> dict:
+    """The slice of a Spotify track the history and feed views show."""
+    images = (track.get("album") or {}).get("images")
+    return {
+        "id": track["id"],
+        "name": track["name"],
+        "artists": [a.get("name") for a in track.get("artists", [])],
+        "album_image": images[0].get("url") if images else None,
+    }
+
+
+def _store_tracks(db: Session, previews: list[dict]):
+    """
+    Insert preview rows for new tracks and refresh the stored ones. On Postgres and SQLite the
+    upsert also locks every existing row until the caller commits, so the retention sweep can't
+    delete a track between this call and the links that reference it.
+    """
+    rows = {
+        p["id"]: {"id": p["id"], "name": p["name"], "artists_json": json.dumps(p["artists"]), "album_image": p["album_image"]}
+        for p in previews
+    }
+    if not rows:
+        return
+    insert = upsert_insert(db)
+    if insert is not None:
+        stmt = insert(Track).values(list(rows.values()))
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["id"],
+            set_={"name": stmt.excluded.name, "artists_json": stmt.excluded.artists_json, "album_image": stmt.excluded.album_image},
+        ))
+        return
+    existing = {tid for (tid,) in db.query(Track.id).filter(Track.id.in_(rows))}
+    db.add_all(Track(**row) for tid, row in rows.items() if tid not in existing)
+
+
+def link_entry_tracks(db: Session, entries: list[MoodEntry], previews: list[dict]):
+    """Reference the same `previews` from each (flushed) entry, storing the tracks once. The caller commits."""
+    _store_tracks(db, previews)
+    db.add_all(
+        MoodEntryTrack(entry_id=entry.id, position=i, track_id=p["id"])
+        for entry in entries for i, p in enumerate(previews)
+    )
+
+
+def load_previews(db: Session, entries: list[MoodEntry]) -> dict[int, list[dict]]:
+    """
+    Track previews for a page of entries, keyed by entry id, hydrated with one query.
+    Entries written before the tracks table existed fall back to their legacy JSON column.
+    """
+    previews: dict[int, list[dict]] = {entry.id: [] for entry in entries}
+    if not entries:
+        return previews
+
+    rows = db.query(
+        MoodEntryTrack.entry_id, Track.id, Track.name, Track.artists_json, Track.album_image
+    ).join(Track, Track.id == MoodEntryTrack.track_id).filter(
+        MoodEntryTrack.entry_id.in_(list(previews))
+    ).order_by(MoodEntryTrack.entry_id, MoodEntryTrack.position).all()
+
+    # Entries from one blend share their tracks, so each track is decoded once per page
+    decoded: dict[str, dict] = {}
+    linked = set()
+    for entry_id, track_id, name, artists_json, album_image in rows:
+        preview = decoded.get(track_id)
+        if preview is None:
+            preview = decoded[track_id] = {
+                "id": track_id, "name": name, "artists": json.loads(artists_json), "album_image": album_image
+            }
+        previews[entry_id].append(preview)
+        linked.add(entry_id)
+
+    for entry in entries:
+        if entry.id not in linked and entry.tracks_preview_json:
+            previews[entry.id] = json.loads(entry.tracks_preview_json)
+    return previews
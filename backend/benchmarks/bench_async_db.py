@@ -0,0 +1,88 @@
+"""
+Benchmark for request handlers querying the database on the event loop.
+
+Runs N concurrent "requests", each issuing one slow query (a SQLite `sleep_ms` function stands
+in for a remote round trip) next to an awaited Spotify-like call, once through the sync
+SessionLocal and once through AsyncSessionLocal. Reports the wall time and the worst event
+loop stall seen by a heartbeat task: the sync path serialises every request behind each query.
+
+    cd backend && python benchmarks/bench_async_db.py [--requests 20] [--query-ms 50]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_async_db.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import event, text  # noqa: E402
+from app.database import engine, async_engine, SessionLocal, AsyncSessionLocal  # noqa: E402
+
+
+def _sleep_ms(ms):
+    time.sleep(ms / 1000)
+    return ms
+
+
+def _register_sleep(dbapi_connection, _record):
+    dbapi_connection.create_function("sleep_ms", 1, _sleep_ms)
+
+
+event.listen(engine, "connect", _register_sleep)
+event.listen(async_engine.sync_engine, "connect", _register_sleep)
+
+
+async def sync_request(query_ms: int):
+    db = SessionLocal()
+    try:
+        db.execute(text("SELECT sleep_ms(:ms)"), {"ms": query_ms})
+    finally:
+        db.close()
+    await asyncio.sleep(query_ms / 1000)  # the Spotify call
+
+
+async def async_request(query_ms: int):
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("SELECT sleep_ms(:ms)"), {"ms": query_ms})
+    await asyncio.sleep(query_ms / 1000)
+
+
+async def run(handler, requests: int, query_ms: int) -> tuple[float, float]:
+    worst_lag = 0.0
+    done = False
+
+    async def heartbeat():
+        nonlocal worst_lag
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.005)
+            worst_lag = max(worst_lag, time.perf_counter() - start - 0.005)
+
+    beat = asyncio.create_task(heartbeat())
+    start = time.perf_counter()
+    await asyncio.gather(*(handler(query_ms) for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    done = True
+    await beat
+    return elapsed, worst_lag
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--query-ms", type=int, default=50)
+    args = parser.parse_args()
+
+    for name, handler in (("sync session", sync_request), ("async session", async_request)):
+        elapsed, lag = await run(handler, args.requests, args.query_ms)
+        print(f"{name:>14}: {args.requests} requests in {elapsed * 1000:7.1f} ms, "
+              f"worst event loop stall {lag * 1000:6.1f} ms")
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+"""
+Benchmark for the cold-start import of app.main.
+
+Imports app.main in fresh interpreters with `-X importtime` (schema step skipped, throwaway
+SQLite database), then reports the median total import time, self time summed per top-level
+package, and the cumulative time of each app.* module.
+
+    cd backend && python benchmarks/bench_cold_start.py [--runs 5] [--top 12]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..")
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def import_profile() -> list[tuple[int, int, str]]:
+    """(self us, cumulative us, module) for every module app.main pulls in, in one fresh process."""
+    env = dict(os.environ)
+    env.update(
+        SCHEMA_STARTUP_MODE="skip",
+        DATABASE_URL=f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench_cold_start.db')}",
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            rows.append((int(match.group(1)), int(match.group(2)), match.group(4)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12)
+    args = parser.parse_args()
+
+    totals: list[float] = []
+    packages: dict[str, list[float]] = defaultdict(list)
+    app_modules: dict[str, list[float]] = defaultdict(list)
+    for _ in range(args.runs):
+        rows = import_profile()
+        per_package: dict[str, int] = defaultdict(int)
+        for self_us, cumulative_us, module in rows:
+            per_package[module.split(".")[0]] += self_us
+            if module == "app.main":
+                totals.append(cumulative_us / 1000)
+            elif module.startswith("app."):
+                app_modules[module].append(cumulative_us / 1000)
+        for package, us in per_package.items():
+            packages[package].append(us / 1000)
+
+    print(f"app.main import: median {statistics.median(totals):.1f} ms over {args.runs} runs "
+          f"(min {min(totals):.1f}, max {max(totals):.1f})")
+    print(f"\nself time by top-level package (top {args.top}, median ms):")
+    ranked = sorted(packages.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for package, samples in ranked[:args.top]:
+        print(f"  {package:<28} {statistics.median(samples):8.1f}")
+    print("\napp modules (cumulative, median ms):")
+    for module, samples in sorted(app_modules.items(), key=lambda item: statistics.median(item[1]), reverse=True):
+        print(f"  {module:<28} {statistics.median(samples):8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark for `_analyze_text_mood` keyword matching.
+
+Compares the original per-keyword substring scan against the compiled Aho–Corasick matcher
+on prompts cut or padded to 10, 100 and 2,000 characters, and checks the scores agree.
+Also reports how many prompts would score differently with word-boundary matching.
+
+    cd backend && python benchmarks/bench_mood_matcher.py [--sizes 10 100 2000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.config.mood_profiles import MOOD_KEYWORDS, MOOD_ASSOCIATIONS  # noqa: E402
+from app.mood_matcher import MoodMatcher  # noqa: E402
+
+CORPUS = os.path.join(os.path.dirname(__file__), "mood_prompts.txt")
+
+
+def legacy_scores(text_lower: str) -> tuple[dict[str, int], dict[str, int]]:
+    """Tier 1 and Tier 2 as they were written in routers/spotify.py."""
+    mood_scores = {mood: 0 for mood in MOOD_KEYWORDS}
+    for mood, keywords in MOOD_KEYWORDS.items():
+        for keyword in keywords:
+            if keyword in text_lower:
+                mood_scores[mood] += len(keyword.split())
+    sorted_associations = sorted(MOOD_ASSOCIATIONS.keys(), key=len, reverse=True)
+    association_scores: dict[str, int] = {}
+    for phrase in sorted_associations:
+        if phrase in text_lower:
+            mapped_mood = MOOD_ASSOCIATIONS[phrase]
+            association_scores[mapped_mood] = association_scores.get(mapped_mood, 0) + 1
+    return mood_scores, association_scores
+
+
+def fit(prompts: list[str], size: int) -> list[str]:
+    """Cut each prompt to `size` characters, padding with the following prompts as needed."""
+    texts = []
+    for i in range(len(prompts)):
+        text = prompts[i]
+        j = i
+        while len(text) < size:
+            j += 1
+            text += " " + prompts[j % len(prompts)]
+        texts.append(text[:size])
+    return texts
+
+
+def per_call_us(fn, texts: list[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best / len(texts) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 2000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with open(CORPUS) as f:
+        prompts = [line.strip().lower() for line in f if line.strip()]
+
+    start = time.perf_counter()
+    matcher = MoodMatcher(MOOD_KEYWORDS, MOOD_ASSOCIATIONS)
+    build_ms = (time.perf_counter() - start) * 1000
+    bounded = MoodMatcher(MOOD_KEYWORDS, MOOD_ASSOCIATIONS, word_boundaries=True)
+    compiled = lambda text: (matcher.keyword_scores(text), matcher.association_scores(text))  # noqa: E731
+
+    print(f"{len(prompts)} prompts, matcher compiled in {build_ms:.1f}ms")
+    print(f"{'chars':>6} {'legacy us':>10} {'automaton us':>13} {'speedup':>8} {'word-boundary diffs':>20}")
+    for size in args.sizes:
+        texts = fit(prompts, size)
+        for text in texts:
+            # Compared as ordered items: the association tally order decides ties between moods
+            assert [list(d.items()) for d in compiled(text)] == [list(d.items()) for d in legacy_scores(text)], text
+        diffs = sum(1 for text in texts if (bounded.keyword_scores(text), bounded.association_scores(text)) != compiled(text))
+        legacy_us = per_call_us(legacy_scores, texts, args.repeat)
+        compiled_us = per_call_us(compiled, texts, args.repeat)
+        print(f"{size:>6} {legacy_us:>10.1f} {compiled_us:>13.1f} {legacy_us / compiled_us:>7.1f}x {diffs:>14}/{len(texts)}")
+
+
+if __name__ == "__main__":
+    main()
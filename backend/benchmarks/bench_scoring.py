@@ -0,0 +1,143 @@
+"""
+Microbenchmark for Step 4 (candidate scoring) of the Curated Intersect Algorithm.
+
+Compares the original per-track dict loop against the encoded pool scorer, both with
+NumPy (when installed) and with the pure-Python fallback, and checks they agree. Also times
+Step 5: the original sort-every-tier-and-shuffle against top-k selection of 60 tracks.
+
+    cd backend && python benchmarks/bench_scoring.py [--sizes 2000 20000 200000] [--listeners 1]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.scoring import encode_pool, score_candidates, rank_pool, _load_numpy  # noqa: E402
+
+np = _load_numpy()
+
+
+def synthetic_pool(n: int, seed: int = 7) -> tuple[list[dict], dict[str, int]]:
+    rng = random.Random(seed)
+    n_artists = max(n // 4, 10)
+    tracks, occurrences = [], {}
+    for i in range(n):
+        artists = [{"id": f"a{rng.randrange(n_artists)}", "name": "x"} for _ in range(rng.choice((1, 1, 1, 2, 3)))]
+        tracks.append({"id": f"t{i}", "name": f"Song {i}", "artists": artists, "explicit": rng.random() < 0.3})
+        occurrences[f"t{i}"] = rng.randint(1, 4)
+    return tracks, occurrences
+
+
+def synthetic_listener(n: int, rng: random.Random) -> dict:
+    n_artists = max(n // 4, 10)
+    artist = lambda: f"a{rng.randrange(n_artists)}"  # noqa: E731
+    track = lambda: f"t{rng.randrange(n)}"  # noqa: E731
+    return {
+        "taste": {artist() for _ in range(150)},
+        "liked_t": {track() for _ in range(40)},
+        "disliked_t": {track() for _ in range(20)},
+        "liked_a": {artist() for _ in range(15)},
+        "disliked_a": {artist() for _ in range(10)},
+    }
+
+
+def legacy_scores(tracks, occurrences, taste_profiles, liked_t, disliked_t, liked_a, disliked_a, explicit_boost):
+    """The Step 4 loop as it was written in routers/spotify.py (group variant, which subsumes the solo one)."""
+    track_scores = {}
+    for t in tracks:
+        tid = t["id"]
+        artists = t.get("artists", [])
+        track_scores[tid] = occurrences[tid]
+        if tid in disliked_t or any(a.get("id") in disliked_a for a in artists):
+            track_scores[tid] -= 1
+            continue
+        overlap_count = 0
+        for artist in artists:
+            a_id = artist.get("id")
+            if not a_id:
+                continue
+            matches = sum(1 for profile_set in taste_profiles if a_id in profile_set)
+            if matches > overlap_count:
+                overlap_count = matches
+        if overlap_count > 0:
+            track_scores[tid] += 100 + ((overlap_count - 1) * 50)
+        if explicit_boost > 0 and t.get("explicit", False):
+            track_scores[tid] += explicit_boost
+        if tid in liked_t:
+            track_scores[tid] += 50
+        if any(a.get("id") in liked_a for a in artists):
+            track_scores[tid] += 200
+    return [track_scores[t["id"]] for t in tracks]
+
+
+def legacy_rank(tracks, scores, limit):
+    """The Step 5 tier sort + shuffle as it was written in routers/spotify.py."""
+    score_tiers = {}
+    for t, score in zip(tracks, scores):
+        score_tiers.setdefault(score, []).append(t)
+    final_tracks = []
+    for score in sorted(score_tiers.keys(), reverse=True):
+        tier_tracks = score_tiers[score]
+        random.shuffle(tier_tracks)
+        final_tracks.extend(tier_tracks)
+        if len(final_tracks) >= limit * 2:
+            break
+    return final_tracks[:limit]
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2_000, 20_000, 200_000])
+    parser.add_argument("--listeners", type=int, default=1, help="taste profiles to score against (blend size)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"numpy: {np.__version__ if np is not None else 'not installed'}, listeners: {args.listeners}")
+    print(f"{'candidates':>10} {'legacy ms':>10} {'python ms':>10} {'numpy ms':>10} {'speedup':>8} {'encode ms':>10}"
+          f" | {'tier rank':>9} {'top-k py':>9} {'top-k np':>9}")
+    for n in args.sizes:
+        tracks, occurrences = synthetic_pool(n)
+        rng = random.Random(n)
+        listeners = [synthetic_listener(n, rng) for _ in range(args.listeners)]
+        taste = [l["taste"] for l in listeners]
+        merged = {key: set().union(*(l[key] for l in listeners)) for key in ("liked_t", "disliked_t", "liked_a", "disliked_a")}
+        feedback = (merged["liked_t"], merged["disliked_t"], merged["liked_a"], merged["disliked_a"])
+
+        encode_ms = best_of(lambda: encode_pool(tracks, occurrences), 1) * 1000
+        encoded = encode_pool(tracks, occurrences)
+
+        expected = legacy_scores(tracks, occurrences, taste, *feedback, 15)
+        legacy_ms = best_of(lambda: legacy_scores(tracks, occurrences, taste, *feedback, 15), args.repeat) * 1000
+        assert score_candidates(encoded, taste, *feedback, 15, use_numpy=False) == expected
+        python_ms = best_of(lambda: score_candidates(encoded, taste, *feedback, 15, use_numpy=False), args.repeat) * 1000
+
+        numpy_ms = float("nan")
+        if np is not None:
+            assert score_candidates(encoded, taste, *feedback, 15, use_numpy=True).tolist() == expected
+            numpy_ms = best_of(lambda: score_candidates(encoded, taste, *feedback, 15, use_numpy=True), args.repeat) * 1000
+        fastest = min(python_ms, numpy_ms) if np is not None else python_ms
+
+        tier_ms = best_of(lambda: legacy_rank(tracks, expected, 60), args.repeat) * 1000
+        topk_py_ms = best_of(lambda: rank_pool(encoded, expected, 60, seed=1), args.repeat) * 1000
+        topk_np_ms = float("nan")
+        if np is not None:
+            np_scores = np.asarray(expected)
+            topk_np_ms = best_of(lambda: rank_pool(encoded, np_scores, 60, seed=1), args.repeat) * 1000
+        print(f"{n:>10} {legacy_ms:>10.2f} {python_ms:>10.2f} {numpy_ms:>10.2f} {legacy_ms / fastest:>7.1f}x {encode_ms:>10.2f}"
+              f" | {tier_ms:>9.2f} {topk_py_ms:>9.2f} {topk_np_ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ import { Play, Pause, ThumbsUp, ThumbsDown, Loader2, RefreshCw } from 'lucide-re
 import type { SpotifyTrack } from '../types'
 import { motion, AnimatePresence, type Variants } from 'framer-motion'
 import { cn } from '../utils/utils'
-import { moodAPI } from '../services/api'
+import { feedbackQueue } from '../services/api'
 
 interface TrackCardProps {
     track: SpotifyTrack
@@ -13,7 +13,6 @@ interface TrackCardProps {
 const TrackCard = memo(function TrackCard({ track, onReplace }: TrackCardProps) {
     const [isPlaying, setIsPlaying] = useState(false)
     const [feedback, setFeedback] = useState<'liked' | 'disliked' | null>(track._feedback || null)
-    const [isSubmitting, setIsSubmitting] = useState(false)
     const [audioSrc, setAudioSrc] = useState<string | null>(track.preview_url)
     const [isLoadingAudio, setIsLoadingAudio] = useState(false)
     const [audioProgress, setAudioProgress] = useState(0)
@@ -56,18 +55,17 @@ const TrackCard = memo(function TrackCard({ track, onReplace }: TrackCardProps)
     const handleFeedback = async (e: React.MouseEvent, type: 'liked' | 'disliked') => {
         e.preventDefault()
         e.stopPropagation()
-        if (isSubmitting || !track.id || !primaryArtistId) return
+        if (!track.id || !primaryArtistId) return
 
-        setIsSubmitting(true)
-        const isLiked = type === 'liked'
+        // Shown right away; the event rides the next feedback batch and is undone if that fails
+        const previous = feedback
+        setFeedback(type)
 
         try {
-            await moodAPI.submitTrackFeedback(track.id, primaryArtistId, isLiked)
-            setFeedback(type)
+            await feedbackQueue.enqueue(track.id, primaryArtistId, type === 'liked')
         } catch (error) {
             console.error('[AI.pollo ML] Failed to submit feedback:', error)
-        } finally {
-            setIsSubmitting(false)
+            if (isMounted.current) setFeedback((current) => (current === type ? previous : current))
         }
     }
 
@@ -203,7 +201,7 @@ const TrackCard = memo(function TrackCard({ track, onReplace }: TrackCardProps)
             <div className="absolute top-3 right-3 flex flex-col gap-2 z-20 opacity-0 group-hover:opacity-100 transition-opacity duration-300">
                 <button
                     onClick={(e) => handleFeedback(e, 'liked')}
-                    disabled={isSubmitting || feedback === 'liked'}
+                    disabled={feedback === 'liked'}
                     className={cn(
                         "p-2 rounded-full true-glass-strong transition-all duration-300 hover:scale-110 shadow-lg pointer-events-auto",
                         feedback === 'liked' ? "bg-brand-cyan/20 text-brand-cyan border-brand-cyan/50" : "text-white/70 hover:text-white bg-black/40 hover:bg-black/60"
@@ -214,7 +212,7 @@ const TrackCard = memo(function TrackCard({ track, onReplace }: TrackCardProps)
                 </button>
                 <button
                     onClick={(e) => handleFeedback(e, 'disliked')}
-                    disabled={isSubmitting || feedback === 'disliked'}
+                    disabled={feedback === 'disliked'}
                     className={cn(
                         "p-2 rounded-full true-glass-strong transition-all duration-300 hover:scale-110 shadow-lg pointer-events-auto",
                         feedback === 'disliked' ? "bg-red-500/20 text-red-400 border-red-500/50" : "text-white/70 hover:text-white bg-black/40 hover:bg-black/60"
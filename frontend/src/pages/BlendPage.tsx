@@ -1,7 +1,7 @@
 import React, { useState, useEffect, useRef, useCallback } from 'react';
 import { useNavigate, useParams } from 'react-router-dom';
 import Navbar from '../components/Navbar';
-import api, { playlistAPI } from '../services/api';
+import api, { blendAPI, playlistAPI } from '../services/api';
 import { motion, AnimatePresence } from 'framer-motion';
 import TrackCard from '../components/TrackCard';
 import { useAuth } from '../hooks/useAuth';
@@ -49,7 +49,7 @@ export default function BlendPage() {
     // Statically inject the available moods aligned with Dashboard's MoodSelector IDs
     const moods = ['happy', 'sad', 'energetic', 'chill', 'angry', 'nostalgic', 'anxious', 'cozy', 'melancholic', 'sensual'];
 
-    // Session Polling
+    // Live room updates: a server-sent event stream, falling back to polling if it can't be opened
     useEffect(() => {
         if (!roomId) {
             setSession(null);
@@ -59,51 +59,86 @@ export default function BlendPage() {
             return;
         }
 
-        const fetchSession = async () => {
-            try {
-                const res = await api.get(`/api/blend/${roomId}`);
+        let stopped = false;
+        const controller = new AbortController();
 
-                if (res.data.is_active === false) {
-                    setError('The host has ended this session.');
-                    navigate('/blend', { replace: true });
-                    return;
-                }
+        const endSession = (message: string) => {
+            stopped = true;
+            setError(message);
+            navigate('/blend', { replace: true });
+        };
 
-                setSession(res.data);
+        const applySession = (data: any) => {
+            if (data.is_active === false) {
+                endSession('The host has ended this session.');
+                return;
+            }
 
-                // Sync generated tracks from backend to ALL participants (not just host)
-                if (res.data.last_generated_tracks && res.data.last_generated_tracks.length > 0) {
-                    setGeneratedTracks(prev => {
-                        // Only update if we don't already have tracks (host already has them locally)
-                        // OR if the count differs (host regenerated)
-                        if (prev.length === 0 || JSON.stringify(prev.map((t: any) => t.id)) !== JSON.stringify(res.data.last_generated_tracks.slice(0, 20).map((t: any) => t.id))) {
-                            return res.data.last_generated_tracks.slice(0, 20);
-                        }
-                        return prev;
-                    });
-                    setReserveTracks(prev => {
-                        if (prev.length === 0 && res.data.last_generated_tracks.length > 20) {
-                            return res.data.last_generated_tracks.slice(20);
-                        }
-                        return prev;
-                    });
-                    if (res.data.last_generated_mood) {
-                        setSelectedMood(res.data.last_generated_mood);
+            setSession(data);
+
+            // Sync generated tracks from backend to ALL participants (not just host)
+            if (data.last_generated_tracks && data.last_generated_tracks.length > 0) {
+                setGeneratedTracks(prev => {
+                    // Only update if we don't already have tracks (host already has them locally)
+                    // OR if the count differs (host regenerated)
+                    if (prev.length === 0 || JSON.stringify(prev.map((t: any) => t.id)) !== JSON.stringify(data.last_generated_tracks.slice(0, 20).map((t: any) => t.id))) {
+                        return data.last_generated_tracks.slice(0, 20);
+                    }
+                    return prev;
+                });
+                setReserveTracks(prev => {
+                    if (prev.length === 0 && data.last_generated_tracks.length > 20) {
+                        return data.last_generated_tracks.slice(20);
                     }
+                    return prev;
+                });
+                if (data.last_generated_mood) {
+                    setSelectedMood(data.last_generated_mood);
                 }
+            }
+        };
 
+        const fetchSession = async () => {
+            try {
+                const res = await api.get(`/api/blend/${roomId}`);
+                applySession(res.data);
             } catch (err: any) {
                 if (err.response?.status === 404) {
-                    setError('Session not found or has been closed.');
-                    navigate('/blend', { replace: true });
+                    endSession('Session not found or has been closed.');
+                }
+            }
+        };
+
+        const listen = async () => {
+            let failures = 0;
+            while (!stopped) {
+                try {
+                    const opened = await blendAPI.streamRoomEvents(roomId, (event) => {
+                        if (event.event === 'state') {
+                            applySession(event.data);
+                        } else if (event.event === 'closed') {
+                            endSession(event.data.reason === 'not_found'
+                                ? 'Session not found or has been closed.'
+                                : 'The host has ended this session.');
+                        }
+                    }, controller.signal);
+                    if (!opened) break;
+                    failures = 0; // the server ended a healthy stream: reconnect right away
+                } catch {
+                    if (stopped || ++failures >= 3) break;
+                    await new Promise(resolve => setTimeout(resolve, 1000 * failures));
                 }
             }
+            if (stopped) return;
+            fetchSession();
+            pollInterval.current = setInterval(fetchSession, 3000);
         };
 
-        fetchSession();
-        pollInterval.current = setInterval(fetchSession, 3000);
+        listen();
 
         return () => {
+            stopped = true;
+            controller.abort();
             if (pollInterval.current) clearInterval(pollInterval.current);
         };
     }, [roomId, navigate]);
@@ -152,7 +187,7 @@ export default function BlendPage() {
             const tracks = res.data.tracks || [];
             setGeneratedTracks(tracks.slice(0, 20));
             setReserveTracks(tracks.slice(20));
-            // Do NOT stop polling, so users can still see people join/leave if we remove the backend lock
+            // Keep listening to the room, so users can still see people join/leave if we remove the backend lock
         } catch (err: any) {
             setError(err.response?.data?.detail || 'Failed to generate playlist');
         } finally {
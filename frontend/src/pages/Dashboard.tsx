@@ -6,7 +6,7 @@ import PlaylistGrid from '../components/PlaylistGrid'
 import PlaylistCard from '../components/PlaylistCard'
 import PlaylistModal from '../components/PlaylistModal'
 import { moodAPI, playlistAPI } from '../services/api'
-import type { SpotifyTrack } from '../types'
+import type { SpotifyTrack, RecommendationResponse } from '../types'
 import { motion, AnimatePresence } from 'framer-motion'
 import { cn } from '../utils/utils'
 
@@ -55,6 +55,15 @@ export default function Dashboard() {
     const [savedLink, setSavedLink] = useState<string | null>(null)
     const [playlistName, setPlaylistName] = useState<string>('')
 
+    // Used for both provisional (streamed) and final rankings; the first one ends the loading state
+    const showRecommendations = (data: RecommendationResponse) => {
+        setSelectedMood(data.mood)
+        setMoodDescription(data.description)
+        setDisplayTracks(data.tracks)
+        setReserveTracks(data.reserve ?? [])
+        setLoading(false)
+    }
+
     const handleMoodSelect = async (mood: string) => {
         setSelectedMood(mood)
         setError(null)
@@ -65,11 +74,10 @@ export default function Dashboard() {
         setPlaylistName(`AI.pollo · ${mood.charAt(0).toUpperCase() + mood.slice(1)} Vibes`)
 
         try {
-            const { data } = await moodAPI.getRecommendations(mood, 60)
+            const data = await moodAPI.streamMoodRecommendations({ mood, limit: 50, reserve: 10 }, showRecommendations)
+                ?? (await moodAPI.getRecommendations(mood, 50, 10)).data
             if (data.error) throw new Error(data.details || data.error)
-            setMoodDescription(data.description)
-            setDisplayTracks(data.tracks.slice(0, 50))
-            setReserveTracks(data.tracks.slice(50))
+            showRecommendations(data)
         } catch (err: any) {
             console.error('Failed to get recommendations:', err)
             const errorMsg = err?.response?.data?.detail || err.message || 'Failed to load recommendations. Please try again.'
@@ -89,12 +97,10 @@ export default function Dashboard() {
         setDiscoveredPlaylists([])
 
         try {
-            const { data } = await moodAPI.getMoodRecommendations({ text, limit: 60 })
+            const data = await moodAPI.streamMoodRecommendations({ text, limit: 50, reserve: 10 }, showRecommendations)
+                ?? (await moodAPI.getMoodRecommendations({ text, limit: 50, reserve: 10 })).data
             if (data.error) throw new Error(data.details || data.error)
-            setSelectedMood(data.mood)
-            setMoodDescription(data.description)
-            setDisplayTracks(data.tracks.slice(0, 50))
-            setReserveTracks(data.tracks.slice(50))
+            showRecommendations(data)
             setPlaylistName(`AI.pollo · ${data.mood.charAt(0).toUpperCase() + data.mood.slice(1)} Vibes`)
         } catch (err: any) {
             console.error('Failed to analyze mood:', err)
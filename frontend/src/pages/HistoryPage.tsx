@@ -38,11 +38,15 @@ function HistoryContent() {
     const [timelineData, setTimelineData] = useState<any>(null)
     const [loading, setLoading] = useState(true)
     const [chartReady, setChartReady] = useState(false)
+    const [loadingMore, setLoadingMore] = useState(false)
+
+    // Minutes east of UTC, so the server buckets heatmap days on the local calendar
+    const tzOffset = -new Date().getTimezoneOffset()
 
     useEffect(() => {
         const fetchHistory = async () => {
             try {
-                const res = await api.get('/api/history/timeline')
+                const res = await api.get('/api/history/timeline', { params: { tz_offset: tzOffset } })
                 setTimelineData(res.data)
             } catch (err) {
                 console.error(err)
@@ -56,40 +60,33 @@ function HistoryContent() {
         fetchHistory()
     }, [])
 
+    const loadMoreEntries = async () => {
+        if (!timelineData || loadingMore) return
+        setLoadingMore(true)
+        try {
+            const res = await api.get('/api/history/timeline', {
+                params: { tz_offset: tzOffset, cursor: timelineData.next_cursor }
+            })
+            setTimelineData((prev: any) => ({
+                ...prev,
+                recent_entries: [...prev.recent_entries, ...res.data.recent_entries],
+                next_cursor: res.data.next_cursor
+            }))
+        } catch (err) {
+            console.error(err)
+        } finally {
+            setLoadingMore(false)
+        }
+    }
+
     const colors = ['#8b5cf6', '#ec4899', '#3b82f6', '#10b981', '#f59e0b']
 
     const heatmapData = useMemo(() => {
-        if (!timelineData || !timelineData.recent_entries) return []
+        if (!timelineData || !timelineData.heatmap) return []
 
-        const counts: Record<string, { total: number, moods: Record<string, number> }> = {}
-
-        timelineData.recent_entries.forEach((entry: any) => {
-            // Localize backend UTC to exact user machine browser time
-            const d = new Date(entry.timestamp)
-            const year = d.getFullYear()
-            const month = String(d.getMonth() + 1).padStart(2, '0')
-            const day = String(d.getDate()).padStart(2, '0')
-            const localDateStr = `${year}-${month}-${day}`
-
-            if (!counts[localDateStr]) {
-                counts[localDateStr] = { total: 0, moods: {} }
-            }
-            counts[localDateStr].total += 1
-            const mood = entry.mood || 'unknown'
-            counts[localDateStr].moods[mood] = (counts[localDateStr].moods[mood] || 0) + 1
-        })
-
-        // Return exact YYYY-MM-DD string so react-calendar-heatmap can accurately map it against its local SVG Grid
-        return Object.entries(counts).map(([dateStr, data]) => {
-            // Find the most frequent mood for this day
-            let dominantMood = 'unknown'
-            let maxCount = 0
-            Object.entries(data.moods).forEach(([mood, count]) => {
-                if (count > maxCount) {
-                    maxCount = count
-                    dominantMood = mood
-                }
-            })
+        // Days and their dominant mood are aggregated server-side, already in the browser's timezone
+        return timelineData.heatmap.map((day: { date: string; count: number; dominant_mood: string | null }) => {
+            const dominantMood = day.dominant_mood || 'unknown'
 
             // Assign a stable color from our pie chart array based on string length (simple hash)
             // or default to gray if no mood
@@ -97,8 +94,8 @@ function HistoryContent() {
             const hexColor = dominantMood === 'unknown' ? 'rgba(255, 255, 255, 0.4)' : colors[colorIndex]
 
             return {
-                date: dateStr,
-                count: data.total,
+                date: day.date,
+                count: day.count,
                 dominantMood: dominantMood,
                 color: hexColor
             }
@@ -227,6 +224,15 @@ Dominant Mood: ${value.dominantMood}`;
                     {!timelineData?.recent_entries?.length && (
                         <p className="text-slate-500">No playlists generated yet.</p>
                     )}
+                    {timelineData?.next_cursor && (
+                        <button
+                            onClick={loadMoreEntries}
+                            disabled={loadingMore}
+                            className="w-full py-3 rounded-xl glass-card text-sm font-medium text-slate-600 dark:text-slate-300 hover:text-slate-900 dark:hover:text-white disabled:opacity-50"
+                        >
+                            {loadingMore ? 'Loading...' : 'Load more'}
+                        </button>
+                    )}
                 </div>
             </main>
         </div>
@@ -6,6 +6,8 @@ import { Search, UserPlus, CheckCircle2, XCircle } from 'lucide-react'
 
 export default function SocialPage() {
     const [feed, setFeed] = useState<any[]>([])
+    const [nextCursor, setNextCursor] = useState<string | null>(null)
+    const [loadingMore, setLoadingMore] = useState(false)
     const [searchQuery, setSearchQuery] = useState('')
     const [searchResults, setSearchResults] = useState<any[]>([])
     const [loading, setLoading] = useState(true)
@@ -43,6 +45,7 @@ export default function SocialPage() {
         try {
             const res = await api.get('/api/social/feed')
             setFeed(res.data.feed)
+            setNextCursor(res.data.next_cursor)
         } catch (err) {
             console.error(err)
         } finally {
@@ -50,6 +53,20 @@ export default function SocialPage() {
         }
     }
 
+    const loadMoreFeed = async () => {
+        if (!nextCursor || loadingMore) return
+        setLoadingMore(true)
+        try {
+            const res = await api.get('/api/social/feed', { params: { cursor: nextCursor } })
+            setFeed(prev => [...prev, ...res.data.feed])
+            setNextCursor(res.data.next_cursor)
+        } catch (err) {
+            console.error(err)
+        } finally {
+            setLoadingMore(false)
+        }
+    }
+
     const handleSearch = async (e: React.FormEvent) => {
         e.preventDefault()
         if (!searchQuery) return
@@ -140,6 +157,15 @@ export default function SocialPage() {
                                     </div>
                                 </motion.div>
                             ))}
+                            {nextCursor && (
+                                <button
+                                    onClick={loadMoreFeed}
+                                    disabled={loadingMore}
+                                    className="w-full py-3 rounded-2xl glass-card text-sm font-medium text-slate-600 dark:text-slate-300 hover:text-slate-900 dark:hover:text-white disabled:opacity-50"
+                                >
+                                    {loadingMore ? 'Loading...' : 'Load more'}
+                                </button>
+                            )}
                         </div>
                     )}
                 </div>
@@ -6,6 +6,8 @@ import type {
     MoodProfile,
     MoodAnalysisResponse,
     RecommendationResponse,
+    RecommendationStreamEvent,
+    BlendRoomEvent,
     MoodRecommendationRequest,
     PlaylistCreateResponse,
     AuthStatusResponse,
@@ -140,24 +142,163 @@ export const moodAPI = {
     analyzeMood: (text: string) =>
         api.post<MoodAnalysisResponse>('/api/analyze-mood', { text }),
     getMoods: () => api.get<Record<string, MoodProfile>>('/api/moods'),
-    getRecommendations: (mood: string, limit: number = 20) =>
+    getRecommendations: (mood: string, limit: number = 20, reserve: number = 0) =>
         api.get<RecommendationResponse>('/api/recommendations', {
-            params: { mood, limit },
+            params: { mood, limit, reserve },
         }),
     getMoodRecommendations: (data: MoodRecommendationRequest) =>
         api.post<RecommendationResponse>('/api/mood-recommendations', data),
-    submitTrackFeedback: (trackId: string, artistId: string, isLiked: boolean) =>
-        api.post<{ message: string; is_liked: boolean }>('/api/recommendations/feedback', {
-            track_id: trackId,
-            artist_id: artistId,
-            is_liked: isLiked
-        }),
+    // NDJSON stream: calls onUpdate with provisional rankings, resolves with the final one.
+    // Resolves null when the stream can't be opened (e.g. expired token) so callers can
+    // fall back to the regular endpoint, which goes through the refresh interceptor.
+    streamMoodRecommendations: async (
+        data: MoodRecommendationRequest,
+        onUpdate: (update: RecommendationResponse) => void
+    ): Promise<RecommendationResponse | null> => {
+        const token = localStorage.getItem('access_token');
+        const res = await fetch(`${API_BASE_URL}/api/mood-recommendations/stream`, {
+            method: 'POST',
+            credentials: 'include',
+            headers: {
+                'Content-Type': 'application/json',
+                ...(token ? { Authorization: `Bearer ${token}` } : {}),
+            },
+            body: JSON.stringify(data),
+        });
+        if (!res.ok || !res.body) return null;
+
+        const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+        let buffer = '';
+        for (;;) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += value;
+            const lines = buffer.split('\n');
+            buffer = lines.pop() ?? '';
+            for (const line of lines) {
+                if (!line.trim()) continue;
+                const event = JSON.parse(line) as RecommendationStreamEvent;
+                if (event.type === 'error') throw new Error(event.detail || 'Failed to get recommendations');
+                const update = {
+                    mood: event.mood!,
+                    description: event.description!,
+                    tracks: event.tracks ?? [],
+                    reserve: event.reserve ?? [],
+                    seed: event.seed,
+                };
+                if (event.type === 'final') return update;
+                onUpdate(update);
+            }
+        }
+        throw new Error('Recommendation stream ended early');
+    },
+    // `keepalive` lets a flush started as the page is hidden outlive the page
+    submitTrackFeedbackBatch: (events: TrackFeedbackEvent[], keepalive: boolean = false) =>
+        api.post<{ message?: string; received?: number; saved?: number; error?: string }>(
+            '/api/recommendations/feedback/batch',
+            { events: events.map((e) => ({ track_id: e.trackId, artist_id: e.artistId, is_liked: e.isLiked })) },
+            keepalive ? { adapter: 'fetch', fetchOptions: { keepalive: true } } : undefined
+        ),
     searchPlaylists: (mood: string, limit: number = 10) =>
         api.get('/api/playlists/search', { params: { mood, limit } }),
     getPlaylistTracks: (playlistId: string) =>
         api.get<{ tracks: SpotifyTrack[]; total: number }>(`/api/playlists/${playlistId}/tracks`),
 };
 
+// ============================================================
+// Track feedback queue
+// ============================================================
+
+// Thumbs up/down while swiping are queued and sent through the batch endpoint, so a quick run of
+// cards costs one request instead of one each. The queue flushes FEEDBACK_FLUSH_DELAY_MS after the
+// latest event, as soon as FEEDBACK_BATCH_SIZE events are waiting, and when the page is hidden.
+// The server applies a batch in order, so a later event for the same track wins.
+const FEEDBACK_FLUSH_DELAY_MS = 1500;
+const FEEDBACK_BATCH_SIZE = 50;
+
+interface TrackFeedbackEvent {
+    trackId: string;
+    artistId: string;
+    isLiked: boolean;
+}
+
+let pendingFeedback: Array<TrackFeedbackEvent & { resolve: () => void; reject: (err: any) => void }> = [];
+let feedbackTimer: ReturnType<typeof setTimeout> | null = null;
+
+const flushFeedback = async (keepalive: boolean = false) => {
+    if (feedbackTimer) {
+        clearTimeout(feedbackTimer);
+        feedbackTimer = null;
+    }
+    const batch = pendingFeedback;
+    pendingFeedback = [];
+    if (batch.length === 0) return;
+    try {
+        const { data } = await moodAPI.submitTrackFeedbackBatch(batch, keepalive);
+        if (data.error) throw new Error(data.error);
+        batch.forEach((e) => e.resolve());
+    } catch (error) {
+        batch.forEach((e) => e.reject(error));
+    }
+};
+
+document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'hidden') void flushFeedback(true);
+});
+
+export const feedbackQueue = {
+    // Resolves once the event's batch is saved; rejects if that batch fails
+    enqueue: (trackId: string, artistId: string, isLiked: boolean): Promise<void> =>
+        new Promise((resolve, reject) => {
+            pendingFeedback.push({ trackId, artistId, isLiked, resolve, reject });
+            if (pendingFeedback.length >= FEEDBACK_BATCH_SIZE) {
+                void flushFeedback();
+                return;
+            }
+            if (feedbackTimer) clearTimeout(feedbackTimer);
+            feedbackTimer = setTimeout(() => void flushFeedback(), FEEDBACK_FLUSH_DELAY_MS);
+        }),
+};
+
+export const blendAPI = {
+    // Server-sent events for a blend room. Resolves true when the server ends the stream (time to
+    // reconnect) and false when it can't be opened (e.g. expired token), so callers can fall back
+    // to polling GET /api/blend/{code}, which goes through the refresh interceptor.
+    streamRoomEvents: async (
+        code: string,
+        onEvent: (event: BlendRoomEvent) => void,
+        signal?: AbortSignal
+    ): Promise<boolean> => {
+        const token = localStorage.getItem('access_token');
+        const res = await fetch(`${API_BASE_URL}/api/blend/${code}/events`, {
+            credentials: 'include',
+            headers: token ? { Authorization: `Bearer ${token}` } : {},
+            signal,
+        });
+        if (!res.ok || !res.body) return false;
+
+        const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+        let buffer = '';
+        for (;;) {
+            const { value, done } = await reader.read();
+            if (done) return true;
+            buffer += value;
+            const frames = buffer.split('\n\n');
+            buffer = frames.pop() ?? '';
+            for (const frame of frames) {
+                let event = '';
+                let data = '';
+                for (const line of frame.split('\n')) {
+                    if (line.startsWith('event:')) event = line.slice(6).trim();
+                    else if (line.startsWith('data:')) data += line.slice(5).trim();
+                }
+                if (!event || !data) continue; // keep-alive comment
+                onEvent({ event, data: JSON.parse(data) } as BlendRoomEvent);
+            }
+        }
+    },
+};
+
 export const playlistAPI = {
     create: (
         name: string,
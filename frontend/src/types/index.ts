@@ -58,15 +58,37 @@ export interface RecommendationResponse {
     mood: string;
     description: string;
     tracks: SpotifyTrack[];
+    // Next-best tracks, used to replace skipped ones
+    reserve?: SpotifyTrack[];
+    seed?: number;
     detected_from_text?: boolean;
     error?: string;
     details?: string;
 }
 
+export interface RecommendationStreamEvent {
+    type: 'provisional' | 'final' | 'error';
+    mood?: string;
+    description?: string;
+    tracks?: SpotifyTrack[];
+    reserve?: SpotifyTrack[];
+    seed?: number;
+    playlists_scored?: number;
+    detail?: string;
+}
+
+export interface BlendRoomEvent {
+    // 'state' carries the same body as GET /api/blend/{code}; 'closed' a { reason } object
+    event: 'state' | 'closed';
+    data: any;
+}
+
 export interface MoodRecommendationRequest {
     text?: string;
     mood?: string;
     limit?: number;
+    reserve?: number;
+    seed?: number;
 }
 
 export interface PlaylistCreateResponse {